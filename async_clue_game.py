@@ -0,0 +1,369 @@
+"""Module async_clue_game provides an asyncio variant of ClueGame for bots
+that do real work in their callbacks.
+
+AsyncClueGame plays by the same rules and emits the same events as
+ClueGame, but broadcasts observe_suggestion() and observe_accusation() to
+every player concurrently, so a turn takes about as long as the slowest
+player instead of the sum of all players.  The ordering guarantees of
+ClueGame are kept: every player has observed an event before the next
+turn starts, the suggestor receives its result before the broadcast, and
+each player receives its calls in the same order as in ClueGame.
+
+The game itself is a ClueGame with an executor for its broadcasts, run in
+a thread of its own, so both variants share one engine.  Calls to
+AsyncPlayerInterface bots are sent to the event loop, and the game waits
+for them.  PlayerInterface bots are called directly from the game's
+threads.  Threads only overlap while a bot waits or releases the GIL (eg.
+inside NumPy, or while a bot_host.SubprocessPlayer waits on its worker);
+pure python bots still share one core.
+"""
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional, Union
+import asyncio
+
+from clue_game import (CLASSIC_RULES, Accusation, Card, ClueGame,
+                       Counterevidence, Deal, EventSink, GameResult,
+                       PlayerInterface, Rules, Seed, Suggestion)
+
+
+class AsyncPlayerInterface(ABC):
+    """The async version of clue_game.PlayerInterface.  Every method has
+    the same parameters, preconditions and meaning as its synchronous
+    counterpart, and may raise clue_game.PlayerFailure.
+    """
+
+    @abstractmethod
+    async def initialize(self,
+                         player_id: int,
+                         num_players: int,
+                         face_up_cards: list[Card],
+                         face_down_cards: list[Card]) -> None:
+        """See PlayerInterface.initialize()"""
+        raise NotImplemented
+
+    async def reset(self,
+                    player_id: int,
+                    num_players: int,
+                    face_up_cards: list[Card],
+                    face_down_cards: list[Card]) -> None:
+        """See PlayerInterface.reset()"""
+        await self.initialize(player_id, num_players, face_up_cards,
+                              face_down_cards)
+
+    async def receive_rules(self, rules: Rules) -> None:
+        """See PlayerInterface.receive_rules()"""
+        pass
+
+    async def wants_public_knowledge(self) -> bool:
+        """See PlayerInterface.wants_public_knowledge()"""
+        return False
+
+    async def receive_public_knowledge(self, knowledge) -> None:
+        """See PlayerInterface.receive_public_knowledge()"""
+        pass
+
+    @abstractmethod
+    async def name(self) -> str:
+        """See PlayerInterface.name()"""
+        raise NotImplemented
+
+    @abstractmethod
+    async def take_turn(self) -> Union[Suggestion, Accusation]:
+        """See PlayerInterface.take_turn()"""
+        raise NotImplemented
+
+    @abstractmethod
+    async def respond_to_suggestion(self,
+                                    suggestor_id: int,
+                                    suggestion: Suggestion
+                                    ) -> Optional[Card]:
+        """See PlayerInterface.respond_to_suggestion()"""
+        raise NotImplemented
+
+    @abstractmethod
+    async def receive_suggestion_result(self,
+                                        suggestion: Suggestion,
+                                        result: Optional[Counterevidence]
+                                        ) -> None:
+        """See PlayerInterface.receive_suggestion_result()"""
+        raise NotImplemented
+
+    @abstractmethod
+    async def observe_suggestion(self,
+                                 suggestor_id: int,
+                                 suggestion: Suggestion,
+                                 blocker_id: Optional[int]) -> None:
+        """See PlayerInterface.observe_suggestion()"""
+        raise NotImplemented
+
+    @abstractmethod
+    async def observe_accusation(self,
+                                 accusor_id: int,
+                                 accusation: Accusation) -> None:
+        """See PlayerInterface.observe_accusation()"""
+        raise NotImplemented
+
+
+class SyncPlayerAdapter(AsyncPlayerInterface):
+    """Runs a synchronous PlayerInterface in an executor.  The game only
+    sends a player one call at a time, so the bot never sees concurrent
+    calls, even from a pool with several threads.
+    """
+
+    def __init__(self,
+                 player: PlayerInterface,
+                 executor: Optional[Executor] = None) -> None:
+        """Constructs the SyncPlayerAdapter.
+
+        Parameters:
+        player: The bot to run.
+        executor: Runs the calls.  Defaults to the event loop's default
+        executor.
+        """
+        self.player = player
+        self.executor = executor
+
+    async def __call(self, method, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, method, *args)
+
+    async def initialize(self,
+                         player_id: int,
+                         num_players: int,
+                         face_up_cards: list[Card],
+                         face_down_cards: list[Card]) -> None:
+        return await self.__call(self.player.initialize, player_id,
+                                 num_players, face_up_cards,
+                                 face_down_cards)
+
+    async def reset(self,
+                    player_id: int,
+                    num_players: int,
+                    face_up_cards: list[Card],
+                    face_down_cards: list[Card]) -> None:
+        return await self.__call(self.player.reset, player_id, num_players,
+                                 face_up_cards, face_down_cards)
+
+    async def receive_rules(self, rules: Rules) -> None:
+        self.player.receive_rules(rules)
+
+    async def wants_public_knowledge(self) -> bool:
+        return self.player.wants_public_knowledge()
+
+    async def receive_public_knowledge(self, knowledge) -> None:
+        self.player.receive_public_knowledge(knowledge)
+
+    async def name(self) -> str:
+        return self.player.name()
+
+    async def take_turn(self) -> Union[Suggestion, Accusation]:
+        return await self.__call(self.player.take_turn)
+
+    async def respond_to_suggestion(self,
+                                    suggestor_id: int,
+                                    suggestion: Suggestion
+                                    ) -> Optional[Card]:
+        return await self.__call(self.player.respond_to_suggestion,
+                                 suggestor_id, suggestion)
+
+    async def receive_suggestion_result(self,
+                                        suggestion: Suggestion,
+                                        result: Optional[Counterevidence]
+                                        ) -> None:
+        return await self.__call(self.player.receive_suggestion_result,
+                                 suggestion, result)
+
+    async def observe_suggestion(self,
+                                 suggestor_id: int,
+                                 suggestion: Suggestion,
+                                 blocker_id: Optional[int]) -> None:
+        return await self.__call(self.player.observe_suggestion,
+                                 suggestor_id, suggestion, blocker_id)
+
+    async def observe_accusation(self,
+                                 accusor_id: int,
+                                 accusation: Accusation) -> None:
+        return await self.__call(self.player.observe_accusation,
+                                 accusor_id, accusation)
+
+
+class _BlockingPlayer(PlayerInterface):
+    """A PlayerInterface for the game's threads, that runs the calls of an
+    AsyncPlayerInterface on the event loop and waits for them.
+    """
+
+    def __init__(self,
+                 player: AsyncPlayerInterface,
+                 loop: asyncio.AbstractEventLoop) -> None:
+        self.player = player
+        self.loop = loop
+
+    def __run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def initialize(self,
+                   player_id: int,
+                   num_players: int,
+                   face_up_cards: list[Card],
+                   face_down_cards: list[Card]) -> None:
+        return self.__run(self.player.initialize(
+            player_id, num_players, face_up_cards, face_down_cards))
+
+    def reset(self,
+              player_id: int,
+              num_players: int,
+              face_up_cards: list[Card],
+              face_down_cards: list[Card]) -> None:
+        return self.__run(self.player.reset(
+            player_id, num_players, face_up_cards, face_down_cards))
+
+    def receive_rules(self, rules: Rules) -> None:
+        return self.__run(self.player.receive_rules(rules))
+
+    def wants_public_knowledge(self) -> bool:
+        return self.__run(self.player.wants_public_knowledge())
+
+    def receive_public_knowledge(self, knowledge) -> None:
+        return self.__run(self.player.receive_public_knowledge(knowledge))
+
+    def name(self) -> str:
+        return self.__run(self.player.name())
+
+    def take_turn(self) -> Union[Suggestion, Accusation]:
+        return self.__run(self.player.take_turn())
+
+    def respond_to_suggestion(self,
+                              suggestor_id: int,
+                              suggestion: Suggestion) -> Optional[Card]:
+        return self.__run(self.player.respond_to_suggestion(suggestor_id,
+                                                            suggestion))
+
+    def receive_suggestion_result(self,
+                                  suggestion: Suggestion,
+                                  result: Optional[Counterevidence]) -> None:
+        return self.__run(self.player.receive_suggestion_result(suggestion,
+                                                                result))
+
+    def observe_suggestion(self,
+                           suggestor_id: int,
+                           suggestion: Suggestion,
+                           blocker_id: Optional[int]) -> None:
+        return self.__run(self.player.observe_suggestion(
+            suggestor_id, suggestion, blocker_id))
+
+    def observe_accusation(self,
+                           accusor_id: int,
+                           accusation: Accusation) -> None:
+        return self.__run(self.player.observe_accusation(accusor_id,
+                                                         accusation))
+
+
+class AsyncClueGame():
+    """An asyncio version of ClueGame.  Create it, await setup(), then
+    await execute(), and await reset() to play more games with the same
+    players.  The game owns threads until close(), so use it as an async
+    context manager:
+
+        async with AsyncClueGame(players) as game:
+            await game.setup()
+            result = await game.execute()
+
+    run() plays one game from synchronous code.
+
+    Members:
+    game: The underlying ClueGame, once setup() has been awaited.
+    """
+
+    def __init__(self,
+                 players: list[Union[AsyncPlayerInterface, PlayerInterface]],
+                 event_sink: Optional[EventSink] = None,
+                 seed: Seed = None,
+                 deal: Optional[Deal] = None,
+                 timing: bool = False,
+                 call_budget: Optional[float] = None,
+                 game_budget: Optional[float] = None,
+                 rules: Rules = CLASSIC_RULES,
+                 profile=None):
+        """Constructs the AsyncClueGame object.  The cards are dealt, and
+        the players initialized, by setup().
+
+        Preconditions:
+        players: 3 <= len(players) <= rules.max_players
+        deal: None, or len(deal.hands) == len(players)
+
+        Parameters:
+        players: The players that will participate in this game.
+        Other parameters: See ClueGame.
+        """
+        assert 3 <= len(players) <= rules.max_players
+        self.players = players
+        self.game: Optional[ClueGame] = None
+        self.__options = dict(event_sink=event_sink, seed=seed, deal=deal,
+                              timing=timing, call_budget=call_budget,
+                              game_budget=game_budget, rules=rules,
+                              profile=profile)
+        # One thread for the game, and one per player for the broadcasts.
+        self.__executor = ThreadPoolExecutor(len(players) + 1)
+        self.__broadcast_executor = ThreadPoolExecutor(len(players))
+
+    @property
+    def public_knowledge(self):
+        """See ClueGame.public_knowledge."""
+        return None if self.game is None else self.game.public_knowledge
+
+    async def __in_game_thread(self, function, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.__executor, function, *args)
+
+    async def setup(self) -> None:
+        """Deals the cards, initializes every player concurrently, and
+        emits the deal.
+        """
+        loop = asyncio.get_running_loop()
+        players = [_BlockingPlayer(player, loop)
+                   if isinstance(player, AsyncPlayerInterface) else player
+                   for player in self.players]
+        self.game = await self.__in_game_thread(
+            lambda: ClueGame(players, executor=self.__broadcast_executor,
+                             **self.__options))
+
+    async def reset(self,
+                    seed: Seed = None,
+                    deal: Optional[Deal] = None) -> None:
+        """Same as ClueGame.reset().
+
+        Preconditions:
+        self: self.setup() has already been awaited.
+        """
+        await self.__in_game_thread(self.game.reset, seed, deal)
+
+    async def execute(self) -> GameResult:
+        """Plays the game.  Same as ClueGame.execute().
+
+        Preconditions:
+        self: self.setup() or self.reset() has already been awaited.
+        """
+        return await self.__in_game_thread(self.game.execute)
+
+    def close(self) -> None:
+        """Stops the game's threads.  The game can no longer be used."""
+        self.__executor.shutdown(wait=False)
+        self.__broadcast_executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> 'AsyncClueGame':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def run(self) -> GameResult:
+        """Sets up and plays the game in a new event loop, then closes it.
+        """
+        async def play() -> GameResult:
+            await self.setup()
+            return await self.execute()
+        try:
+            return asyncio.run(play())
+        finally:
+            self.close()
@@ -0,0 +1,137 @@
+import asyncio
+import random
+import time
+import unittest
+from async_clue_game import AsyncClueGame, SyncPlayerAdapter
+from clue_game import (BufferedSink, ClueGame, NullSink, PlayerFailure,
+                       PlayerFailureEvent, Rules, Suspect)
+from sample_bot import SampleBot
+
+
+class SlowObserver(SampleBot):
+    def __init__(self):
+        super().__init__()
+        self.observations = 0
+
+    def observe_suggestion(self, suggestor_id, suggestion, blocker_id):
+        self.observations += 1
+        if self.observations <= 3:
+            time.sleep(0.05)
+
+
+class FailingBot(SampleBot):
+    def take_turn(self):
+        raise PlayerFailure("gone")
+
+
+class IllegalBlocker(SyncPlayerAdapter):
+    def __init__(self, card):
+        super().__init__(SampleBot())
+        self.card = card
+
+    async def respond_to_suggestion(self, suggestor_id, suggestion):
+        return self.card
+
+
+class TestAsyncClueGame(unittest.TestCase):
+    def test_same_game_as_clue_game(self):
+        for seed in range(5):
+            random.seed(seed)
+            expected = ClueGame([SampleBot() for _ in range(4)], NullSink(),
+                                seed=seed).execute()
+            random.seed(seed)
+            result = AsyncClueGame([SampleBot() for _ in range(4)],
+                                   NullSink(), seed=seed).run()
+            self.assertEqual(result, expected)
+
+    def test_same_events_as_clue_game(self):
+        random.seed(1)
+        expected = BufferedSink()
+        ClueGame([SampleBot() for _ in range(3)], expected, seed=1).execute()
+        random.seed(1)
+        sink = BufferedSink()
+        AsyncClueGame([SampleBot() for _ in range(3)], sink, seed=1).run()
+        self.assertEqual(sink.events, expected.events)
+
+    def test_observations_are_concurrent(self):
+        players = [SlowObserver() for _ in range(6)]
+        start = time.monotonic()
+        AsyncClueGame(players, NullSink(), seed=2).run()
+        # Serially, the first three broadcasts would take 6 * 0.15s.
+        self.assertLess(time.monotonic() - start, 0.6)
+        self.assertTrue(all(player.observations >= 3 for player in players))
+
+    def test_async_players_are_awaited(self):
+        calls = []
+
+        class Recorder(SyncPlayerAdapter):
+            async def observe_suggestion(self, *args):
+                calls.append(args)
+                await asyncio.sleep(0)
+
+        random.seed(3)
+        players = [Recorder(SampleBot()) for _ in range(3)]
+        result = AsyncClueGame(players, NullSink(), seed=3).run()
+        self.assertEqual(len(calls) % 3, 0)
+        self.assertGreater(result.turns, 0)
+
+    def test_rules_and_reset(self):
+        rules = Rules.generate(5, 7, 4)
+
+        def play(game):
+            results = [game.execute()]
+            for seed in range(6, 8):
+                game.reset(seed)
+                results.append(game.execute())
+            return results
+
+        async def play_async(game):
+            await game.setup()
+            results = [await game.execute()]
+            for seed in range(6, 8):
+                await game.reset(seed)
+                results.append(await game.execute())
+            return results
+
+        random.seed(5)
+        expected = play(ClueGame([SampleBot() for _ in range(5)], NullSink(),
+                                 seed=5, rules=rules))
+        async def play_and_close():
+            async with AsyncClueGame([SampleBot() for _ in range(5)],
+                                     NullSink(), seed=5,
+                                     rules=rules) as game:
+                results = await play_async(game)
+            # The threads have stopped.
+            with self.assertRaises(RuntimeError):
+                await game.execute()
+            return results
+
+        random.seed(5)
+        self.assertEqual(asyncio.run(play_and_close()), expected)
+
+    def test_failed_player_leaves_the_game(self):
+        sink = BufferedSink()
+        AsyncClueGame([FailingBot(), SampleBot(), SampleBot()], sink,
+                      seed=4).run()
+        failures = [event for event in sink.events
+                    if isinstance(event, PlayerFailureEvent)]
+        self.assertEqual(failures,
+                         [PlayerFailureEvent(0, "take_turn", "gone")])
+
+    def test_illegal_blocker_card_is_a_failure(self):
+        for card in (None, Suspect.MISS_SCARLETT):
+            random.seed(6)
+            sink = BufferedSink()
+            AsyncClueGame([IllegalBlocker(card) for _ in range(6)], sink,
+                          seed=6).run()
+            failures = [event for event in sink.events
+                        if isinstance(event, PlayerFailureEvent)]
+            self.assertTrue(failures)
+            for failure in failures:
+                self.assertEqual(failure.method, "respond_to_suggestion")
+                self.assertTrue(failure.message.startswith(
+                    "showed " + repr(card)))
+
+
+if __name__ == '__main__':
+    unittest.main()
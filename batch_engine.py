@@ -0,0 +1,366 @@
+"""Module batch_engine plays many games of Clue at once, holding the state
+of K games in NumPy arrays.  Bots plug in through BatchPlayerInterface,
+which receives and returns arrays with one row per game, so a policy bot
+can decide its turn in every game with a few vectorized operations.
+
+Cards are passed around by their Card.value (1..21), like the IntEnums in
+clue_game.py.  Scenarios are (n, 3) arrays of (who, where, what) values.
+
+Eg. `BatchClueGame([SampleBatchBot() for _ in range(4)], 10000).execute()`
+"""
+from abc import ABC, abstractmethod
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from clue_game import Location, Suspect, Weapon
+
+NUM_CARDS = len(Suspect) + len(Location) + len(Weapon)
+# The columns (Card.value - 1) of each category of card.
+SUSPECT_COLUMNS = np.array([card - 1 for card in Suspect])
+LOCATION_COLUMNS = np.array([card - 1 for card in Location])
+WEAPON_COLUMNS = np.array([card - 1 for card in Weapon])
+
+
+###############################################################################
+# Batched player interface
+###############################################################################
+
+
+class BatchPlayerInterface(ABC):
+    """An interface for bots that play a seat in K games at once.
+    Mirrors clue_game.PlayerInterface.  Each call covers the subset of the
+    K games it applies to: `game_ids` is a 1D int array of game indices,
+    and every other array argument or return value has one row per entry
+    of game_ids.
+    """
+
+    @abstractmethod
+    def initialize(self,
+                   player_id: int,
+                   num_players: int,
+                   face_up_cards: np.ndarray,
+                   face_down_cards: np.ndarray) -> None:
+        """Lazily initializes the bot for K games.
+
+        Parameters:
+        player_id: The seat of self, the same in every game.
+        num_players: The number of players in every game.
+        face_up_cards: (K, 21) bool array, indexed by Card.value - 1.
+        face_down_cards: (K, 21) bool array, indexed by Card.value - 1.
+        """
+        raise NotImplemented
+
+    @abstractmethod
+    def name(self) -> str:
+        """Returns the name of the bot."""
+        raise NotImplemented
+
+    @abstractmethod
+    def take_turns(self,
+                   game_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns a Suggestion or Accusation for every game in game_ids.
+
+        Returns:
+        A (n, 3) int array of scenarios, and a (n,) bool array that is
+        True where the scenario is an Accusation.
+        """
+        raise NotImplemented
+
+    @abstractmethod
+    def respond_to_suggestions(self,
+                               suggestor_id: int,
+                               game_ids: np.ndarray,
+                               suggestions: np.ndarray) -> np.ndarray:
+        """Returns the card to secretly show in every game of game_ids.
+        Self is guaranteed to have at least one of the suggested cards in
+        each of those games.
+
+        Parameters:
+        suggestor_id: The seat of the player who made the suggestions.
+        game_ids: (n,) int array of games.
+        suggestions: (n, 3) int array of scenarios.
+
+        Returns:
+        (n,) int array of card values in the intersection of each
+        suggestion and the facedown cards of self.
+        """
+        raise NotImplemented
+
+    @abstractmethod
+    def receive_suggestion_results(self,
+                                   game_ids: np.ndarray,
+                                   suggestions: np.ndarray,
+                                   blocker_ids: np.ndarray,
+                                   cards: np.ndarray) -> None:
+        """Receives the results of the suggestions made by self.
+
+        Parameters:
+        game_ids: (n,) int array of games.
+        suggestions: (n, 3) int array of scenarios.
+        blocker_ids: (n,) int array of the blocking seat, or -1.
+        cards: (n,) int array of the card values shown, or 0.
+        """
+        raise NotImplemented
+
+    @abstractmethod
+    def observe_suggestions(self,
+                            suggestor_id: int,
+                            game_ids: np.ndarray,
+                            suggestions: np.ndarray,
+                            blocker_ids: np.ndarray) -> None:
+        """Observes the suggestions made by a player.
+
+        Parameters:
+        suggestor_id: The seat of the player who made the suggestions.
+        game_ids: (n,) int array of games.
+        suggestions: (n, 3) int array of scenarios.
+        blocker_ids: (n,) int array of the blocking seat, or -1.
+        """
+        raise NotImplemented
+
+    @abstractmethod
+    def observe_accusations(self,
+                            accusor_id: int,
+                            game_ids: np.ndarray,
+                            accusations: np.ndarray) -> None:
+        """Observes wrong accusations made by a player.
+
+        Parameters:
+        accusor_id: The seat of the player who made the accusations.
+        game_ids: (n,) int array of games.
+        accusations: (n, 3) int array of scenarios.
+        """
+        raise NotImplemented
+
+
+class SampleBatchBot(BatchPlayerInterface):
+    """A vectorized equivalent of sample_bot.SampleBot.  Picks uniformly
+    random scenarios and accuses with a 1 in 20 chance.
+    """
+
+    def __init__(self, seed: Optional[int] = None) -> None:
+        self.rng = np.random.default_rng(seed)
+        self.face_down_cards: Optional[np.ndarray] = None
+
+    def initialize(self,
+                   player_id: int,
+                   num_players: int,
+                   face_up_cards: np.ndarray,
+                   face_down_cards: np.ndarray) -> None:
+        self.face_down_cards = face_down_cards
+
+    def name(self) -> str:
+        return "sample_batch_bot"
+
+    def take_turns(self,
+                   game_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        num_games = len(game_ids)
+        scenarios = np.stack(
+            [self.rng.choice(SUSPECT_COLUMNS, num_games),
+             self.rng.choice(LOCATION_COLUMNS, num_games),
+             self.rng.choice(WEAPON_COLUMNS, num_games)], axis=1) + 1
+        accuse = self.rng.integers(1, 21, num_games) == 20
+        return scenarios, accuse
+
+    def respond_to_suggestions(self,
+                               suggestor_id: int,
+                               game_ids: np.ndarray,
+                               suggestions: np.ndarray) -> np.ndarray:
+        # Like SampleBot, show the first of who, where, what that is held.
+        held = self.face_down_cards[game_ids[:, None], suggestions - 1]
+        first = np.argmax(held, axis=1)
+        return suggestions[np.arange(len(game_ids)), first]
+
+    def receive_suggestion_results(self,
+                                   game_ids: np.ndarray,
+                                   suggestions: np.ndarray,
+                                   blocker_ids: np.ndarray,
+                                   cards: np.ndarray) -> None:
+        pass
+
+    def observe_suggestions(self,
+                            suggestor_id: int,
+                            game_ids: np.ndarray,
+                            suggestions: np.ndarray,
+                            blocker_ids: np.ndarray) -> None:
+        pass
+
+    def observe_accusations(self,
+                            accusor_id: int,
+                            game_ids: np.ndarray,
+                            accusations: np.ndarray) -> None:
+        pass
+
+
+###############################################################################
+# Batch game object
+###############################################################################
+
+
+class BatchResult(NamedTuple):
+    """The outcomes of K games, one row per game, matching the members of
+    clue_game.GameResult.
+
+    Members:
+    winner_ids: (K,) int array of the winning seat, or -1 if no one won.
+    rounds: (K,) int array of the number of rounds started.
+    turns: (K,) int array of the number of turns taken.
+    eliminations: (K,) int array of the number of wrong accusations.
+    """
+    winner_ids: np.ndarray
+    rounds: np.ndarray
+    turns: np.ndarray
+    eliminations: np.ndarray
+
+
+class BatchClueGame():
+    """Plays K games of Clue simultaneously.  Every game is dealt
+    independently, with the same rules as clue_game.ClueGame.  Turns are
+    taken seat by seat, and each turn is resolved for all K games in a few
+    vectorized steps.
+
+    Members:
+    num_games: K, the number of games.
+    num_players: The number of seats in every game.
+    envelopes: (K, 3) int array of the final solutions, as card values.
+    face_up_cards: (K, 21) bool array.
+    hands: (K, num_players, 21) bool array of facedown cards.
+    """
+
+    def __init__(self,
+                 players: list[BatchPlayerInterface],
+                 num_games: int,
+                 seed: Optional[int] = None) -> None:
+        """Constructs the BatchClueGame object.  Shuffles and deals the
+        cards of every game.
+
+        Preconditions:
+        players: 3 <= len(players) <= 6
+
+        Parameters:
+        players: The bot in each seat.
+        num_games: The number of games to play at once.
+        seed: Seeds the NumPy generator used to deal.
+        """
+        self.num_players = len(players)
+        assert 3 <= self.num_players <= 6
+        self.players = players
+        self.num_games = num_games
+        rng = np.random.default_rng(seed)
+        rows = np.arange(num_games)
+
+        envelope_columns = np.stack(
+            [rng.choice(SUSPECT_COLUMNS, num_games),
+             rng.choice(LOCATION_COLUMNS, num_games),
+             rng.choice(WEAPON_COLUMNS, num_games)], axis=1)
+        self.envelopes = envelope_columns + 1
+
+        # Shuffle the remaining 18 cards of every game by sorting random
+        # keys, with the envelope cards forced to the end.
+        keys = rng.random((num_games, NUM_CARDS))
+        keys[rows[:, None], envelope_columns] = 2.0
+        deck = np.argsort(keys, axis=1)[:, :NUM_CARDS - 3]
+        num_face_up = deck.shape[1] % self.num_players
+        cards_per_player = deck.shape[1] // self.num_players
+
+        self.face_up_cards = np.zeros((num_games, NUM_CARDS), dtype=bool)
+        self.face_up_cards[rows[:, None], deck[:, :num_face_up]] = True
+        hand_columns = deck[:, num_face_up:].reshape(
+            num_games, self.num_players, cards_per_player)
+        self.hands = np.zeros((num_games, self.num_players, NUM_CARDS),
+                              dtype=bool)
+        self.hands[rows[:, None, None],
+                   np.arange(self.num_players)[None, :, None],
+                   hand_columns] = True
+
+        for player_id, player in enumerate(players):
+            player.initialize(player_id, self.num_players,
+                              self.face_up_cards.copy(),
+                              self.hands[:, player_id].copy())
+
+    def __handle_suggestions(self,
+                             suggestor_id: int,
+                             game_ids: np.ndarray,
+                             suggestions: np.ndarray) -> None:
+        """Finds the first blocker clockwise of suggestor_id in each of
+        game_ids, asks them for a card, and shares the results.
+        """
+        # (n, num_players): whether each seat holds a suggested card.
+        holds = self.hands[game_ids[:, None], :, suggestions - 1].any(axis=1)
+        order = (suggestor_id + 1 +
+                 np.arange(self.num_players - 1)) % self.num_players
+        holds_in_order = holds[:, order]
+        blocker_ids = np.where(holds_in_order.any(axis=1),
+                               order[np.argmax(holds_in_order, axis=1)], -1)
+
+        cards = np.zeros(len(game_ids), dtype=suggestions.dtype)
+        for blocker_id in order:
+            blocks = blocker_ids == blocker_id
+            if not blocks.any():
+                continue
+            blocked_ids = game_ids[blocks]
+            shown = self.players[blocker_id].respond_to_suggestions(
+                suggestor_id, blocked_ids, suggestions[blocks])
+            # Make sure no one is cheating.
+            assert self.hands[blocked_ids, blocker_id, shown - 1].all()
+            assert (shown[:, None] == suggestions[blocks]).any(axis=1).all()
+            cards[blocks] = shown
+
+        self.players[suggestor_id].receive_suggestion_results(
+            game_ids, suggestions, blocker_ids, cards)
+        for player in self.players:
+            player.observe_suggestions(suggestor_id, game_ids, suggestions,
+                                       blocker_ids)
+
+    def execute(self) -> BatchResult:
+        """Plays every game to the end.  Finished games are dropped from
+        the working set, so the cost of a round is proportional to the
+        number of games still in progress.
+
+        Returns:
+        The results of the games.
+        """
+        number_of_possible_solutions = 324
+        can_take_turns = np.ones((self.num_games, self.num_players),
+                                 dtype=bool)
+        winner_ids = np.full(self.num_games, -1)
+        rounds = np.zeros(self.num_games, dtype=np.int64)
+        turns = np.zeros(self.num_games, dtype=np.int64)
+        eliminations = np.zeros(self.num_games, dtype=np.int64)
+        in_progress = np.arange(self.num_games)
+
+        for i in range(number_of_possible_solutions):
+            if len(in_progress) == 0:
+                break
+            rounds[in_progress] = i + 1
+            for player_id, player in enumerate(self.players):
+                game_ids = in_progress[can_take_turns[in_progress,
+                                                      player_id]]
+                if len(game_ids) == 0:
+                    continue
+                turns[game_ids] += 1
+                scenarios, accuse = player.take_turns(game_ids)
+
+                correct = accuse & (scenarios ==
+                                    self.envelopes[game_ids]).all(axis=1)
+                wrong = accuse & ~correct
+                if correct.any():
+                    winner_ids[game_ids[correct]] = player_id
+                if wrong.any():
+                    wrong_ids = game_ids[wrong]
+                    can_take_turns[wrong_ids, player_id] = False
+                    eliminations[wrong_ids] += 1
+                    for observer in self.players:
+                        observer.observe_accusations(player_id, wrong_ids,
+                                                     scenarios[wrong])
+                if accuse.any():
+                    in_progress = in_progress[
+                        (winner_ids[in_progress] < 0)
+                        & can_take_turns[in_progress].any(axis=1)]
+
+                suggest = ~accuse
+                if suggest.any():
+                    self.__handle_suggestions(player_id, game_ids[suggest],
+                                              scenarios[suggest])
+        return BatchResult(winner_ids, rounds, turns, eliminations)
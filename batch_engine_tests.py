@@ -0,0 +1,34 @@
+import unittest
+import numpy as np
+from batch_engine import BatchClueGame, SampleBatchBot
+from clue_game import derive_seed
+
+
+class TestBatchDeal(unittest.TestCase):
+    def test_every_card_is_dealt_once(self):
+        for num_players in range(3, 7):
+            game = BatchClueGame([SampleBatchBot() for _ in
+                                  range(num_players)], 50, seed=num_players)
+            owned = (game.hands.sum(axis=1) + game.face_up_cards)
+            rows = np.arange(50)[:, None]
+            owned[rows, game.envelopes - 1] += 1
+            self.assertTrue((owned == 1).all())
+            self.assertTrue((game.face_up_cards.sum(axis=1) ==
+                             18 % num_players).all())
+            self.assertTrue((game.hands.sum(axis=2) ==
+                             18 // num_players).all())
+
+
+class TestBatchExecute(unittest.TestCase):
+    def test_results_are_consistent(self):
+        bots = [SampleBatchBot(derive_seed(1, i)) for i in range(4)]
+        result = BatchClueGame(bots, 500, seed=derive_seed(1, 9)).execute()
+        finished = (result.winner_ids >= 0) | (result.eliminations == 4)
+        self.assertTrue(finished.all())
+        self.assertTrue((result.rounds >= 1).all())
+        self.assertTrue((result.turns >= result.rounds).all())
+        self.assertTrue((result.eliminations <= 4).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,5 @@
+"""Benchmarks for the clue framework.
+Each module can be run directly, eg. `python -m benchmarks.event_sinks`.
+`python -m benchmarks` runs the suite that tracks baselines, see
+benchmarks.suite.
+"""
@@ -0,0 +1,50 @@
+"""Compares the NumPy BatchClueGame to the object ClueGame, both in games
+per second and in the statistics of the games they produce, using
+SampleBot and its vectorized equivalent SampleBatchBot.
+"""
+import statistics
+import time
+
+import numpy as np
+
+from batch_engine import BatchClueGame, SampleBatchBot
+from clue_game import ClueGame, NullSink, derive_seed
+from sample_bot import SampleBot
+
+
+def main(num_players: int = 4,
+         object_games: int = 2000,
+         batch_games: int = 20000) -> None:
+    start = time.perf_counter()
+    results = [ClueGame([SampleBot() for _ in range(num_players)],
+                        NullSink(), seed=i).execute()
+               for i in range(object_games)]
+    object_rate = object_games / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    # Each generator needs its own seed, or a bot would replay the deal.
+    bots = [SampleBatchBot(derive_seed(0, i + 1)) for i in range(num_players)]
+    batch = BatchClueGame(bots, batch_games, seed=derive_seed(0, 0)).execute()
+    batch_rate = batch_games / (time.perf_counter() - start)
+
+    print(f"object engine: {object_rate:10.1f} games/sec")
+    print(f"batch engine:  {batch_rate:10.1f} games/sec "
+          f"({batch_rate / object_rate:.1f}x)")
+    print()
+    print("                     object   batch")
+    print("mean rounds        "
+          f"{statistics.mean(r.rounds for r in results):8.2f}"
+          f" {batch.rounds.mean():7.2f}")
+    print("mean turns         "
+          f"{statistics.mean(r.turns for r in results):8.2f}"
+          f" {batch.turns.mean():7.2f}")
+    print("mean eliminations  "
+          f"{statistics.mean(len(r.eliminations) for r in results):8.2f}"
+          f" {batch.eliminations.mean():7.2f}")
+    object_wins = sum(r.winner_id is not None for r in results)
+    print(f"win rate           {object_wins / object_games:8.4f}"
+          f" {np.mean(batch.winner_ids >= 0):7.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Measures samples per second of DealSampler against plain rejection
+sampling (deal the hidden cards at random, keep the deal if it is
+consistent) at several stages of a game.
+"""
+import random
+import time
+
+from clue_game import Location, Suspect, Weapon, deal_cards
+from deal_sampler import (FACE_UP, DealSampler, is_consistent,
+                          observe_random_suggestions)
+from deduction import DeductionEngine
+
+
+def rejection_sample(engine: DeductionEngine,
+                     rng: random.Random,
+                     max_tries: int) -> tuple[int, int]:
+    """Deals the hidden cards uniformly at random until a deal is
+    consistent.
+
+    Returns:
+    (1, tries) on success, or (0, max_tries) if no deal was consistent.
+    """
+    known_hand = engine.known[engine.player_id]
+    hidden = {category: [card for card in category
+                         if not (known_hand | engine.face_up_cards)
+                         >> card & 1]
+              for category in (Suspect, Location, Weapon)}
+    for tries in range(1, max_tries + 1):
+        owners = [FACE_UP] * 22
+        deck = []
+        for cards in hidden.values():
+            cards = cards.copy()
+            rng.shuffle(cards)
+            owners[cards.pop()] = engine.envelope_id
+            deck += cards
+        rng.shuffle(deck)
+        for player_id in range(engine.num_players):
+            if player_id != engine.player_id:
+                for _ in range(engine.hand_sizes[player_id]):
+                    owners[deck.pop()] = player_id
+        for card in range(1, 22):
+            if known_hand >> card & 1:
+                owners[card] = engine.player_id
+        if is_consistent(engine, owners):
+            return 1, tries
+    return 0, max_tries
+
+
+def main(num_players: int = 4, seconds: float = 1.0) -> None:
+    deal = deal_cards(num_players, 3)
+    hands = [set(hand) for hand in deal.hands]
+    print(f"{'suggestions':>11} {'sampler/sec':>12} {'rejection/sec':>14}")
+    for stage in (0, 5, 10, 20, 40):
+        engine = DeductionEngine()
+        engine.initialize(0, num_players, deal.face_up_cards, deal.hands[0])
+        observe_random_suggestions(engine, hands, stage, random.Random(1))
+
+        sampler = DealSampler(engine, 0)
+        start = time.perf_counter()
+        sampler.sample_owners()
+        samples = 1
+        while time.perf_counter() - start < seconds:
+            sampler.sample_owners()
+            samples += 1
+        sampler_rate = samples / (time.perf_counter() - start)
+
+        rng = random.Random(0)
+        accepted = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < seconds:
+            accepted += rejection_sample(engine, rng, 1000)[0]
+        rejection_rate = accepted / (time.perf_counter() - start)
+        print(f"{stage:>11} {sampler_rate:>12.0f} {rejection_rate:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
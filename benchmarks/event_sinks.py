@@ -0,0 +1,57 @@
+"""Measures games per second of ClueGame with each of the event sinks.
+The PrintSink writes to os.devnull, so that the numbers reflect the cost
+of formatting and writing the log rather than of the terminal.
+
+Ratios are relative to PrintSink, the default sink, in this version of
+the engine.  They are not speedups over the original engine, which
+printed directly and is not measured here.
+"""
+import os
+import time
+from typing import Callable
+
+from clue_game import (BufferedSink, ClueGame, EventSink, JsonLinesSink,
+                       NullSink, PrintSink)
+from sample_bot import SampleBot
+
+
+def games_per_second(make_sink: Callable[[], EventSink],
+                     num_games: int,
+                     num_players: int = 4) -> float:
+    """Plays num_games games of SampleBots, each with a fresh sink.
+
+    Parameters:
+    make_sink: Creates the sink used by a single game.
+    num_games: The number of games to play.
+    num_players: The number of players in each game.
+
+    Returns:
+    The number of games played per second.
+    """
+    start = time.perf_counter()
+    for _ in range(num_games):
+        game = ClueGame([SampleBot() for _ in range(num_players)],
+                        make_sink())
+        game.execute()
+    return num_games / (time.perf_counter() - start)
+
+
+def main(num_games: int = 2000) -> None:
+    with open(os.devnull, "w") as devnull:
+        sinks: dict[str, Callable[[], EventSink]] = {
+            "print (default)": lambda: PrintSink(devnull),
+            "json lines": lambda: JsonLinesSink(devnull),
+            "buffered": BufferedSink,
+            "null": NullSink,
+        }
+        baseline = None
+        for name, make_sink in sinks.items():
+            rate = games_per_second(make_sink, num_games)
+            if baseline is None:
+                baseline = rate
+            print(f"{name:32} {rate:10.1f} games/sec "
+                  f"({rate / baseline:.2f}x print)")
+
+
+if __name__ == "__main__":
+    main()
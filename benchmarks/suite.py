@@ -0,0 +1,376 @@
+"""The benchmark suite of the engine and SampleBot, with baselines.
+
+    python -m benchmarks                        run and print the metrics
+    python -m benchmarks --save baseline.json   also save them as a baseline
+    python -m benchmarks --compare baseline.json [--threshold 0.1]
+
+--compare exits with status 1 if any metric is worse than the baseline by
+more than the threshold (a fraction, default 10%).  Baseline metrics
+that the run did not measure, eg. tournament_games_per_second_<cores>w on
+a machine with a different number of cores, are listed but do not fail.
+Each timing is the best of several repeats, and every workload is seeded,
+so runs on the same machine are comparable.
+
+The solver scaling metrics play DeductionBots, compute exact posteriors,
+and sample deals, with generated Rules of growing deck sizes and player
+counts.
+"""
+from typing import Callable, NamedTuple, Optional
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from clue_game import (CLASSIC_RULES, Accusation, ClueGame, Location,
+                       NullSink, Rules, Suggestion, Suspect, Weapon,
+                       deal_cards)
+from deal_sampler import DealSampler
+from deduction_bot import DeductionBot
+from posterior import PosteriorResult
+from sample_bot import SampleBot
+from tournament import run_tournament
+
+
+class Metric(NamedTuple):
+    """One measurement of the suite.
+
+    Members:
+    value: The measured value.
+    unit: The unit of value, for printing.
+    higher_is_better: Whether an increase is an improvement.
+    """
+    value: float
+    unit: str
+    higher_is_better: bool
+
+
+def best_of(repeats: int, run: Callable[[], float]) -> float:
+    """Returns the smallest of repeats calls to run, which returns a time.
+    """
+    return min(run() for _ in range(repeats))
+
+
+def play_games(num_games: int, num_players: int) -> float:
+    """Plays seeded headless games of SampleBots.
+
+    Returns:
+    The seconds taken.
+    """
+    start = time.perf_counter()
+    for seed in range(num_games):
+        random.seed(seed)
+        ClueGame([SampleBot() for _ in range(num_players)], NullSink(),
+                 seed=seed).execute()
+    return time.perf_counter() - start
+
+
+def play_reset_games(num_games: int, num_players: int) -> float:
+    """Same as play_games(), but reuses one ClueGame with reset()."""
+    game = ClueGame([SampleBot() for _ in range(num_players)], NullSink())
+    start = time.perf_counter()
+    for seed in range(num_games):
+        random.seed(seed)
+        game.reset(seed)
+        game.execute()
+    return time.perf_counter() - start
+
+
+def new_game(num_players: int = 4) -> ClueGame:
+    random.seed(0)
+    return ClueGame([SampleBot() for _ in range(num_players)], NullSink(),
+                    seed=0)
+
+
+def time_calls(method: Callable, args: tuple, count: int) -> float:
+    """Returns the seconds per call of method(*args)."""
+    start = time.perf_counter()
+    for _ in range(count):
+        method(*args)
+    return (time.perf_counter() - start) / count
+
+
+def handle_suggestion_overhead(count: int) -> float:
+    """Returns the seconds per ClueGame.__handleSuggestion call, for a
+    suggestion that the next player blocks.
+    """
+    game = new_game()
+    blocker = game.player_infos[1].face_down_cards[0]
+    cards = {type(card): card
+             for card in (Suspect.MRS_WHITE, Location.KITCHEN, Weapon.ROPE)}
+    cards[type(blocker)] = blocker
+    suggestion = Suggestion(cards[Suspect], cards[Location], cards[Weapon])
+    return time_calls(game._ClueGame__handleSuggestion, (0, suggestion),
+                      count)
+
+
+def handle_accusation_overhead(count: int) -> float:
+    """Returns the seconds per ClueGame.__handleAccusation call, for a wrong
+    accusation.
+    """
+    game = new_game()
+    envelope = game.envelope
+    who = next(card for card in Suspect if card != envelope.who)
+    accusation = Accusation(who, envelope.where, envelope.what)
+    return time_calls(game._ClueGame__handleAccusation, (0, accusation),
+                      count)
+
+
+def deal_time(count: int) -> float:
+    """Returns the seconds per ClueGame construction (shuffle, deal and
+    initialize the players), with the players created beforehand.
+    """
+    tables = [[SampleBot() for _ in range(4)] for _ in range(count)]
+    start = time.perf_counter()
+    for seed, players in enumerate(tables):
+        ClueGame(players, NullSink(), seed=seed)
+    return (time.perf_counter() - start) / count
+
+
+def peak_memory_per_game(reuse: bool, num_players: int = 4) -> int:
+    """Returns the peak bytes allocated while creating and playing one
+    game, or while resetting and playing a game if reuse, measured with
+    tracemalloc.
+    """
+    game = ClueGame([SampleBot() for _ in range(num_players)], NullSink())
+    random.seed(0)
+    tracemalloc.start()
+    try:
+        if reuse:
+            game.reset(0)
+            game.execute()
+        else:
+            ClueGame([SampleBot() for _ in range(num_players)], NullSink(),
+                     seed=0).execute()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# The decks of the solver scaling metrics, as category sizes: the classic
+# deck, and twice and four times as many cards.
+SCALING_DECKS = [(6, 9, 6), (12, 18, 12), (24, 36, 24)]
+SCALING_PLAYERS = [3, 6, 12, 24]
+# The exact posterior, and the deal sampler that is built on its counts,
+# grow much faster, so they get a smaller grid.
+POSTERIOR_SCALING = [((6, 9, 6), 3), ((6, 9, 6), 6), ((9, 14, 9), 3),
+                     ((9, 14, 9), 6), ((12, 18, 12), 3)]
+
+
+def scaling_rules(sizes: tuple[int, int, int]) -> Rules:
+    return (CLASSIC_RULES if sizes == (6, 9, 6)
+            else Rules.generate(*sizes))
+
+
+def deduction_game_time(rules: Rules, num_players: int,
+                        num_games: int) -> float:
+    """Returns the seconds per seeded headless game of DeductionBots."""
+    start = time.perf_counter()
+    for seed in range(num_games):
+        random.seed(seed)
+        ClueGame([DeductionBot() for _ in range(num_players)], NullSink(),
+                 seed=seed, rules=rules).execute()
+    return (time.perf_counter() - start) / num_games
+
+
+def posterior_time(rules: Rules, num_players: int) -> float:
+    """Returns the seconds to compute the exact posterior of player 0 right
+    after the deal, bypassing the posterior caches.
+    """
+    game = ClueGame([DeductionBot() for _ in range(num_players)],
+                    NullSink(), seed=0, rules=rules)
+    engine = game.player_infos[0].player.engine
+    start = time.perf_counter()
+    PosteriorResult(engine)
+    return time.perf_counter() - start
+
+
+def sampler_time(rules: Rules, num_players: int, count: int) -> float:
+    """Returns the seconds per fresh deal sampled for player 0 right after
+    the deal, including building the sampler's model.
+    """
+    game = ClueGame([DeductionBot() for _ in range(num_players)],
+                    NullSink(), seed=0, rules=rules)
+    sampler = DealSampler(game.player_infos[0].player.engine, 0)
+    start = time.perf_counter()
+    for _ in range(count):
+        sampler.sample_owners()
+    return (time.perf_counter() - start) / count
+
+
+def run(quick: bool = False,
+        log: Callable[[str], None] = print) -> dict[str, Metric]:
+    """Runs the suite.
+
+    Parameters:
+    quick: Whether to use small workloads, eg. as a smoke test.
+    log: Receives a line per metric as it is measured.
+
+    Returns:
+    The metrics by name.
+    """
+    scale = 0.05 if quick else 1.0
+    repeats = 1 if quick else 3
+    metrics: dict[str, Metric] = {}
+
+    def record(name: str, metric: Metric) -> None:
+        metrics[name] = metric
+        log(f"{name:36} {metric.value:14.2f} {metric.unit}")
+
+    num_games = max(10, int(400 * scale))
+    for num_players in range(3, 7):
+        seconds = best_of(repeats, lambda: play_games(num_games, num_players))
+        record("games_per_second_" + str(num_players) + "p",
+               Metric(num_games / seconds, "games/s", True))
+    seconds = best_of(repeats, lambda: play_reset_games(num_games, 4))
+    record("games_per_second_reset_4p",
+           Metric(num_games / seconds, "games/s", True))
+    count = max(100, int(20000 * scale))
+    record("handle_suggestion_us",
+           Metric(best_of(repeats, lambda: handle_suggestion_overhead(count))
+                  * 1e6, "us/call", False))
+    record("handle_accusation_us",
+           Metric(best_of(repeats, lambda: handle_accusation_overhead(count))
+                  * 1e6, "us/call", False))
+    record("deal_cards_us",
+           Metric(best_of(repeats,
+                          lambda: time_calls(deal_cards, (4,), count))
+                  * 1e6, "us/call", False))
+    record("clue_game_init_us",
+           Metric(best_of(repeats, lambda: deal_time(count // 4)) * 1e6,
+                  "us/call", False))
+    record("peak_memory_per_game_kib",
+           Metric(peak_memory_per_game(False) / 1024, "KiB", False))
+    record("peak_memory_per_reset_game_kib",
+           Metric(peak_memory_per_game(True) / 1024, "KiB", False))
+
+    num_games = max(2, int(10 * scale))
+    for sizes in SCALING_DECKS:
+        rules = scaling_rules(sizes)
+        for num_players in SCALING_PLAYERS:
+            if num_players > rules.max_players:
+                continue
+            record("deduction_game_ms_" + str(len(rules.all_cards)) + "c_" +
+                   str(num_players) + "p",
+                   Metric(best_of(repeats, lambda: deduction_game_time(
+                       rules, num_players, num_games)) * 1e3,
+                          "ms/game", False))
+    for sizes, num_players in POSTERIOR_SCALING:
+        rules = scaling_rules(sizes)
+        record("posterior_ms_" + str(len(rules.all_cards)) + "c_" +
+               str(num_players) + "p",
+               Metric(best_of(repeats, lambda: posterior_time(
+                   rules, num_players)) * 1e3, "ms/call", False))
+    num_samples = max(10, int(1000 * scale))
+    for sizes, num_players in POSTERIOR_SCALING:
+        rules = scaling_rules(sizes)
+        record("sampler_us_" + str(len(rules.all_cards)) + "c_" +
+               str(num_players) + "p",
+               Metric(best_of(repeats, lambda: sampler_time(
+                   rules, num_players, num_samples)) * 1e6,
+                      "us/sample", False))
+
+    num_games = max(40, int(4000 * scale))
+    cores = os.cpu_count() or 1
+    workers = sorted({1, 2, cores})
+    for max_workers in workers:
+        start = time.perf_counter()
+        run_tournament([SampleBot] * 4, num_games, max_workers=max_workers,
+                       seed=0)
+        record("tournament_games_per_second_" + str(max_workers) + "w",
+               Metric(num_games / (time.perf_counter() - start),
+                      "games/s", True))
+    return metrics
+
+
+def save(metrics: dict[str, Metric], path: str) -> None:
+    """Writes metrics to a JSON baseline file."""
+    with open(path, "w") as file:
+        json.dump({name: metric._asdict()
+                   for name, metric in metrics.items()}, file, indent=2)
+        file.write("\n")
+
+
+def load(path: str) -> dict[str, Metric]:
+    """Reads a JSON baseline file written by save()."""
+    with open(path) as file:
+        return {name: Metric(**fields)
+                for name, fields in json.load(file).items()}
+
+
+class Comparison(NamedTuple):
+    """The outcome of compare().
+
+    Members:
+    regressions: A report line for each metric that got worse by more than
+    the threshold.
+    missing: The names of the baseline metrics that were not measured.
+    """
+    regressions: list[str]
+    missing: list[str]
+
+
+def compare(metrics: dict[str, Metric],
+            baseline: dict[str, Metric],
+            threshold: float) -> Comparison:
+    """Compares metrics against a baseline.
+
+    Parameters:
+    threshold: The fraction by which a metric may get worse.
+    """
+    regressions = []
+    missing = []
+    for name, old in baseline.items():
+        new = metrics.get(name)
+        if new is None:
+            missing.append(name)
+            continue
+        if old.value == 0:
+            continue
+        change = (new.value - old.value) / old.value
+        if not old.higher_is_better:
+            change = -change
+        if change < -threshold:
+            regressions.append(f"{name}: {old.value:.2f} -> "
+                               f"{new.value:.2f} {new.unit} "
+                               f"({-change:.1%} worse)")
+    return Comparison(regressions, missing)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description=__doc__.splitlines()[0])
+    parser.add_argument("--save", metavar="PATH",
+                        help="write the metrics to a baseline file")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="flag regressions against a baseline file")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="allowed fraction of regression "
+                        "(default 0.1)")
+    parser.add_argument("--quick", action="store_true",
+                        help="use small workloads")
+    args = parser.parse_args(argv)
+
+    metrics = run(args.quick)
+    if args.save:
+        save(metrics, args.save)
+    if args.compare:
+        regressions, missing = compare(metrics, load(args.compare),
+                                       args.threshold)
+        if missing:
+            print("Not measured in this run: " + ", ".join(missing))
+        if regressions:
+            print("Regressions beyond " + format(args.threshold, ".0%") +
+                  ":")
+            for line in regressions:
+                print("   " + line)
+            return 1
+        print("No regressions beyond " + format(args.threshold, ".0%") +
+              ".")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import os
+import tempfile
+import unittest
+from benchmarks.suite import Metric, compare, load, save
+
+BASELINE = {"games_per_second_4p": Metric(1000.0, "games/s", True),
+            "peak_bytes_per_game": Metric(2000.0, "bytes", False),
+            "tournament_games_per_second_8w": Metric(500.0, "games/s",
+                                                     True)}
+
+
+class TestCompare(unittest.TestCase):
+    def test_regressions(self):
+        metrics = {"games_per_second_4p": Metric(850.0, "games/s", True),
+                   "peak_bytes_per_game": Metric(2500.0, "bytes", False),
+                   "tournament_games_per_second_8w": Metric(480.0,
+                                                            "games/s", True)}
+        regressions, missing = compare(metrics, BASELINE, 0.1)
+        self.assertEqual(regressions, [
+            "games_per_second_4p: 1000.00 -> 850.00 games/s (15.0% worse)",
+            "peak_bytes_per_game: 2000.00 -> 2500.00 bytes (25.0% worse)"])
+        self.assertEqual(missing, [])
+
+    def test_improvements_are_not_regressions(self):
+        metrics = {"games_per_second_4p": Metric(2000.0, "games/s", True),
+                   "peak_bytes_per_game": Metric(1000.0, "bytes", False),
+                   "tournament_games_per_second_8w": Metric(500.0,
+                                                            "games/s", True)}
+        self.assertEqual(compare(metrics, BASELINE, 0.1), ([], []))
+
+    def test_missing_metrics_are_reported(self):
+        # Eg. a machine with 4 cores instead of 8.
+        metrics = {"games_per_second_4p": Metric(500.0, "games/s", True),
+                   "peak_bytes_per_game": Metric(2000.0, "bytes", False),
+                   "tournament_games_per_second_4w": Metric(300.0,
+                                                            "games/s", True)}
+        regressions, missing = compare(metrics, BASELINE, 0.1)
+        self.assertEqual(len(regressions), 1)
+        self.assertEqual(missing, ["tournament_games_per_second_8w"])
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            save(BASELINE, path)
+            self.assertEqual(load(path), BASELINE)
+
+
+if __name__ == '__main__':
+    unittest.main()
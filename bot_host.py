@@ -0,0 +1,376 @@
+"""Module bot_host runs a bot in a worker subprocess, so that a slow or
+crashing bot cannot stall or kill the game, and CPU heavy bots run in
+parallel with the rest of the table.
+
+SubprocessPlayer is a PlayerInterface proxy for the bot.  It talks to the
+worker with one JSON array per line over the worker's stdin and stdout:
+
+    ["receive_rules", null] or
+    ["receive_rules", [num_suspects, num_locations, num_weapons],
+     max_players]
+    ["initialize", player_id, num_players, [face_up...], [face_down...]]
+    ["reset", player_id, num_players, [face_up...], [face_down...]]
+    ["wants_public_knowledge"]
+    ["receive_public_knowledge"]
+    ["name"]
+    ["take_turn"]
+    ["respond_to_suggestion", suggestor_id, [who, where, what]]
+    ["receive_suggestion_result", [who, where, what], [refuter_id, card]]
+    ["observe_suggestion", suggestor_id, [who, where, what], blocker_id]
+    ["observe_accusation", accusor_id, [who, where, what]]
+
+Cards are sent as their values, and missing values as null.  The rules
+are null for the classic cards, or the arguments of Rules.generate().
+Only wants_public_knowledge, name, take_turn and respond_to_suggestion are
+answered, with ["ok", value] or ["error", message].  take_turn answers
+[is_accusation, who, where, what].  The other calls are queued and sent in
+batches ahead of the next call that is answered, so they never cost a
+round trip.
+
+The game's public knowledge cannot be shared with another process, so the
+worker keeps its own copy, updated from the observations it receives.
+
+Eg. `SubprocessPlayer("sample_bot:SampleBot")` hosts a SampleBot.
+"""
+from typing import Optional, Union
+import importlib
+import json
+import os
+import select
+import subprocess
+import sys
+import time
+import traceback
+
+from clue_game import (CLASSIC_RULES, Accusation, Card, Counterevidence,
+                       PlayerFailure, PlayerInterface, Rules, Suggestion,
+                       card_from_value)
+from deduction import DeductionEngine
+
+# Calls that the worker answers.  Every other call is fire-and-forget.
+_ANSWERED = ("wants_public_knowledge", "name", "take_turn",
+             "respond_to_suggestion")
+
+
+class SubprocessPlayer(PlayerInterface):
+    """Hosts a bot in a worker subprocess.
+
+    If the worker crashes, raises an exception, or does not answer within
+    the timeout, the worker is killed and every following call raises
+    clue_game.PlayerFailure, which ClueGame handles by removing the player
+    from the game.
+    """
+
+    def __init__(self,
+                 bot: str,
+                 timeout: Optional[float] = None,
+                 batch_size: int = 16,
+                 python: str = sys.executable) -> None:
+        """Starts the worker process.
+
+        Parameters:
+        bot: "module:Class" of the bot.  The class is constructed without
+        arguments in the worker.  The module must be importable from the
+        directory of this file or from PYTHONPATH.
+        timeout: Seconds to wait for each answer.  None waits forever.
+        The time the worker spends catching up with queued calls counts
+        towards the timeout of the next answer.
+        batch_size: The number of fire-and-forget calls that are queued
+        before they are sent without waiting for an answered call.
+        python: The interpreter that runs the worker.
+        """
+        self.bot = bot
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.__name: Optional[str] = None
+        self.__wants_public_knowledge: Optional[bool] = None
+        self.__failure: Optional[str] = None
+        self.__pending: list[str] = []
+        self.__buffer = b""
+        self.__process = subprocess.Popen(
+            [python, os.path.abspath(__file__), bot],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+
+    def close(self) -> None:
+        """Stops the worker process.  The player can no longer be used."""
+        # The pipes must be closed even if __fail() already killed the
+        # worker.
+        try:
+            self.__process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.__process.wait(1)
+        except subprocess.TimeoutExpired:
+            self.__process.kill()
+            self.__process.wait()
+        self.__process.stdout.close()
+        if self.__failure is None:
+            self.__failure = "closed"
+
+    def __enter__(self) -> 'SubprocessPlayer':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        if hasattr(self, "_SubprocessPlayer__process"):
+            self.close()
+
+    ###########################################################################
+    # Protocol
+    ###########################################################################
+
+    def __fail(self, message: str) -> PlayerFailure:
+        """Kills the worker and returns the exception to raise."""
+        self.__failure = self.bot + ": " + message
+        if self.__process.poll() is None:
+            self.__process.kill()
+            self.__process.wait()
+        return PlayerFailure(self.__failure)
+
+    def __write(self) -> None:
+        """Sends the queued calls."""
+        data = "".join(self.__pending).encode()
+        self.__pending = []
+        try:
+            self.__process.stdin.write(data)
+            self.__process.stdin.flush()
+        except OSError:
+            raise self.__fail("worker exited") from None
+
+    def __send(self, *message) -> None:
+        """Queues a fire-and-forget call."""
+        if self.__failure is not None:
+            raise PlayerFailure(self.__failure)
+        self.__pending.append(json.dumps(message) + "\n")
+        if len(self.__pending) >= self.batch_size:
+            self.__write()
+
+    def __request(self, *message):
+        """Sends a call along with the queued calls, and returns the answer.
+        """
+        self.__send(*message)
+        self.__write()
+        deadline = (None if self.timeout is None
+                    else time.monotonic() + self.timeout)
+        stdout = self.__process.stdout.fileno()
+        while b"\n" not in self.__buffer:
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if (remaining <= 0
+                        or not select.select([stdout], [], [], remaining)[0]):
+                    raise self.__fail("no answer to " + message[0] +
+                                      " within " + str(self.timeout) + "s")
+            chunk = os.read(stdout, 65536)
+            if not chunk:
+                raise self.__fail("worker exited with code " +
+                                  str(self.__process.wait()))
+            self.__buffer += chunk
+        line, self.__buffer = self.__buffer.split(b"\n", 1)
+        status, value = json.loads(line)
+        if status != "ok":
+            raise self.__fail(value)
+        return value
+
+    ###########################################################################
+    # PlayerInterface
+    ###########################################################################
+
+    def receive_rules(self, rules: Rules) -> None:
+        if rules is CLASSIC_RULES:
+            self.__send("receive_rules", None)
+            return
+        sizes = [len(category) for category in rules.categories]
+        if Rules.generate(*sizes, rules.max_players) is not rules:
+            raise self.__fail("only the classic and generated rules can be "
+                              "sent to a worker")
+        self.__send("receive_rules", sizes, rules.max_players)
+
+    def initialize(self,
+                   player_id: int,
+                   num_players: int,
+                   face_up_cards: list[Card],
+                   face_down_cards: list[Card]) -> None:
+        self.__send("initialize", player_id, num_players,
+                    [int(card) for card in face_up_cards],
+                    [int(card) for card in face_down_cards])
+
+    def reset(self,
+              player_id: int,
+              num_players: int,
+              face_up_cards: list[Card],
+              face_down_cards: list[Card]) -> None:
+        self.__send("reset", player_id, num_players,
+                    [int(card) for card in face_up_cards],
+                    [int(card) for card in face_down_cards])
+
+    def wants_public_knowledge(self) -> bool:
+        if self.__wants_public_knowledge is None:
+            try:
+                self.__wants_public_knowledge = bool(
+                    self.__request("wants_public_knowledge"))
+            except PlayerFailure:
+                # The failure is raised again by the next call.
+                return False
+        return self.__wants_public_knowledge
+
+    def receive_public_knowledge(self, knowledge) -> None:
+        self.__send("receive_public_knowledge")
+
+    def name(self) -> str:
+        if self.__name is None:
+            self.__name = self.__request("name")
+        return self.__name
+
+    def take_turn(self) -> Union[Suggestion, Accusation]:
+        is_accusation, who, where, what = self.__request("take_turn")
+        scenario_type = Accusation if is_accusation else Suggestion
+        return scenario_type(card_from_value(who), card_from_value(where),
+                             card_from_value(what))
+
+    def respond_to_suggestion(self,
+                              suggestor_id: int,
+                              suggestion: Suggestion) -> Optional[Card]:
+        card = self.__request("respond_to_suggestion", suggestor_id,
+                              list(suggestion))
+        return None if card is None else card_from_value(card)
+
+    def receive_suggestion_result(self,
+                                  suggestion: Suggestion,
+                                  result: Optional[Counterevidence]) -> None:
+        self.__send("receive_suggestion_result", list(suggestion),
+                    None if result is None else list(result))
+
+    def observe_suggestion(self,
+                           suggestor_id: int,
+                           suggestion: Suggestion,
+                           blocker_id: Optional[int]) -> None:
+        self.__send("observe_suggestion", suggestor_id, list(suggestion),
+                    blocker_id)
+
+    def observe_accusation(self,
+                           accusor_id: int,
+                           accusation: Accusation) -> None:
+        self.__send("observe_accusation", accusor_id, list(accusation))
+
+
+###############################################################################
+# Worker
+###############################################################################
+
+
+def _scenario(values: list[int], scenario_type: type):
+    return scenario_type(*(card_from_value(value) for value in values))
+
+
+class _Worker():
+    """The bot of a worker process, and the state of its game.
+
+    Members:
+    bot: The hosted bot.
+    rules: The rules of the current game.
+    face_up_cards: The face up cards of the current game.
+    num_players: The number of players of the current game.
+    public_knowledge: The worker's copy of the public knowledge, or None
+    if the bot did not ask for it.
+    """
+
+    def __init__(self, bot: PlayerInterface) -> None:
+        self.bot = bot
+        self.rules = CLASSIC_RULES
+        self.face_up_cards: list[Card] = []
+        self.num_players = 0
+        self.public_knowledge: Optional[DeductionEngine] = None
+
+    def dispatch(self, method: str, args: list):
+        """Calls the bot for one message and returns the value to answer.
+        """
+        if method == "receive_rules":
+            self.rules = (CLASSIC_RULES if args[0] is None
+                          else Rules.generate(*args[0], args[1]))
+            self.bot.receive_rules(self.rules)
+        elif method in ("initialize", "reset"):
+            player_id, num_players, face_up, face_down = args
+            self.num_players = num_players
+            self.face_up_cards = [card_from_value(value)
+                                  for value in face_up]
+            self.public_knowledge = None
+            getattr(self.bot, method)(
+                player_id, num_players, list(self.face_up_cards),
+                [card_from_value(value) for value in face_down])
+        elif method == "wants_public_knowledge":
+            return self.bot.wants_public_knowledge()
+        elif method == "receive_public_knowledge":
+            self.public_knowledge = DeductionEngine(self.rules)
+            self.public_knowledge.initialize(None, self.num_players,
+                                             self.face_up_cards, [])
+            self.bot.receive_public_knowledge(self.public_knowledge)
+        else:
+            if self.public_knowledge is not None:
+                if method == "observe_suggestion":
+                    self.public_knowledge.observe_suggestion(
+                        args[0], _scenario(args[1], Suggestion), args[2])
+                elif method == "observe_accusation":
+                    self.public_knowledge.observe_accusation(
+                        args[0], _scenario(args[1], Accusation))
+            return _dispatch(self.bot, method, args)
+        return None
+
+
+def _dispatch(bot: PlayerInterface, method: str, args: list):
+    """Calls the bot for one of the calls of a game's turns, and returns
+    the value to answer.
+    """
+    if method == "name":
+        return bot.name()
+    elif method == "take_turn":
+        scenario = bot.take_turn()
+        return [isinstance(scenario, Accusation)] + [int(card) for card
+                                                     in scenario]
+    elif method == "respond_to_suggestion":
+        card = bot.respond_to_suggestion(args[0],
+                                         _scenario(args[1], Suggestion))
+        return None if card is None else int(card)
+    elif method == "receive_suggestion_result":
+        result = args[1]
+        if result is not None:
+            result = Counterevidence(result[0], card_from_value(result[1]))
+        bot.receive_suggestion_result(_scenario(args[0], Suggestion), result)
+    elif method == "observe_suggestion":
+        bot.observe_suggestion(args[0], _scenario(args[1], Suggestion),
+                               args[2])
+    elif method == "observe_accusation":
+        bot.observe_accusation(args[0], _scenario(args[1], Accusation))
+    else:
+        raise ValueError("unknown method " + repr(method))
+    return None
+
+
+def worker_main(bot: str) -> None:
+    """Runs the bot "module:Class", answering calls on stdin and stdout
+    until stdin is closed.  Anything the bot prints goes to stderr.
+    """
+    protocol = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    try:
+        module_name, class_name = bot.split(":")
+        worker = _Worker(getattr(importlib.import_module(module_name),
+                                 class_name)())
+        for line in sys.stdin:
+            method, *args = json.loads(line)
+            value = worker.dispatch(method, args)
+            if method in _ANSWERED:
+                protocol.write(json.dumps(["ok", value]) + "\n")
+                protocol.flush()
+    except Exception:
+        # The error is read as the answer to the next answered call.
+        protocol.write(json.dumps(["error", traceback.format_exc(limit=-1)
+                                   .strip().splitlines()[-1]]) + "\n")
+        protocol.flush()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    worker_main(sys.argv[1])
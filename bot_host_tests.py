@@ -0,0 +1,152 @@
+import time
+import unittest
+import warnings
+from bot_host import SubprocessPlayer
+from clue_game import (Accusation, BufferedSink, ClueGame, Location, NullSink,
+                       PlayerFailure, PlayerFailureEvent, Rules, Suggestion,
+                       SuggestionEvent, Suspect, Weapon, WinEvent,
+                       deal_cards)
+from deduction_bot import DeductionBot
+from sample_bot import SampleBot
+
+
+# Bots hosted by the tests, loaded by the worker as "bot_host_tests:...".
+class CrashingBot(SampleBot):
+    def take_turn(self):
+        raise RuntimeError("crashed")
+
+
+class SleepyBot(SampleBot):
+    def take_turn(self):
+        time.sleep(10)
+
+
+class ChattyBot(SampleBot):
+    def observe_suggestion(self, suggestor_id, suggestion, blocker_id):
+        print("observed", suggestion)
+
+
+class RulesBot(SampleBot):
+    def name(self):
+        return str(self.rules)
+
+
+class SharedKnowledgeBot(DeductionBot):
+    def __init__(self):
+        super().__init__(shared_knowledge=True)
+
+    def take_turn(self):
+        assert self.public is not None
+        return super().take_turn()
+
+
+class TestSubprocessPlayer(unittest.TestCase):
+    def setUp(self):
+        self.players = []
+
+    def tearDown(self):
+        for player in self.players:
+            player.close()
+
+    def host(self, bot, **kwargs):
+        player = SubprocessPlayer(bot, **kwargs)
+        self.players.append(player)
+        return player
+
+    def test_answers_like_the_bot(self):
+        player = self.host("sample_bot:SampleBot", timeout=10)
+        deal = deal_cards(3, seed=1)
+        player.initialize(0, 3, deal.face_up_cards, deal.hands[0])
+        self.assertEqual(player.name(), "sample_bot")
+        # The worker's random module is not seeded, so it may accuse.
+        self.assertIsInstance(player.take_turn(), (Suggestion, Accusation))
+        hand = deal.hands[0]
+        suggestion = Suggestion(Suspect.MRS_PEACOCK, Location.BALLROOM,
+                                Weapon.LEAD_PIPE)
+        suggestion = suggestion._replace(**{
+            field: card for card in hand
+            for field, category in (("who", Suspect), ("where", Location),
+                                    ("what", Weapon))
+            if isinstance(card, category)})
+        card = player.respond_to_suggestion(1, suggestion)
+        self.assertIn(card, hand)
+        self.assertIn(card, suggestion)
+
+    def test_plays_a_game(self):
+        players = [self.host("sample_bot:SampleBot", timeout=10)
+                   for _ in range(3)]
+        result = ClueGame(players, NullSink(), seed=2).execute()
+        self.assertGreater(result.turns, 0)
+
+    def test_forwards_rules(self):
+        rules = Rules.generate(4, 5, 4)
+        player = self.host("bot_host_tests:RulesBot", timeout=10)
+        deal = deal_cards(5, 1, rules)
+        player.receive_rules(rules)
+        player.initialize(0, 5, deal.face_up_cards, deal.hands[0])
+        self.assertEqual(player.name(), str(rules))
+        self.assertIn(player.take_turn().who, rules.suspects)
+
+    def test_reset_and_public_knowledge(self):
+        rules = Rules.generate(4, 5, 4)
+        players = [self.host("bot_host_tests:SharedKnowledgeBot", timeout=10)
+                   for _ in range(4)]
+        sink = BufferedSink()
+        game = ClueGame(players, sink, seed=4, rules=rules)
+        for seed in range(3):
+            if seed:
+                game.reset(seed)
+            game.execute()
+        self.assertFalse(any(isinstance(event, PlayerFailureEvent)
+                             for event in sink.events))
+        self.assertEqual(sum(isinstance(event, WinEvent)
+                             for event in sink.events), 3)
+
+    def test_printing_does_not_break_the_protocol(self):
+        players = [self.host("bot_host_tests:ChattyBot", timeout=10)
+                   for _ in range(3)]
+        result = ClueGame(players, NullSink(), seed=2).execute()
+        self.assertGreater(result.turns, 0)
+
+    def test_crash_removes_player(self):
+        sink = BufferedSink()
+        players = [self.host("bot_host_tests:CrashingBot", timeout=10),
+                   self.host("sample_bot:SampleBot", timeout=10),
+                   self.host("sample_bot:SampleBot", timeout=10)]
+        ClueGame(players, sink, seed=3).execute()
+        failures = [event for event in sink.events
+                    if isinstance(event, PlayerFailureEvent)]
+        self.assertEqual(len(failures), 1)
+        self.assertEqual(failures[0].player_id, 0)
+        self.assertIn("crashed", failures[0].message)
+        self.assertFalse(any(isinstance(event, SuggestionEvent)
+                             and event.suggestor_id == 0
+                             for event in sink.events))
+        with self.assertRaises(PlayerFailure):
+            players[0].take_turn()
+
+    def test_timeout_kills_worker(self):
+        player = self.host("bot_host_tests:SleepyBot", timeout=0.5)
+        deal = deal_cards(3, seed=1)
+        player.initialize(0, 3, deal.face_up_cards, deal.hands[0])
+        start = time.monotonic()
+        with self.assertRaises(PlayerFailure):
+            player.take_turn()
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_close_after_failure_releases_pipes(self):
+        player = SubprocessPlayer("bot_host_tests:CrashingBot", timeout=10)
+        deal = deal_cards(3, seed=1)
+        player.initialize(0, 3, deal.face_up_cards, deal.hands[0])
+        with self.assertRaises(PlayerFailure):
+            player.take_turn()
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", ResourceWarning)
+            player.close()
+            del player
+        self.assertEqual([warning for warning in caught
+                          if warning.category is ResourceWarning], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,9 +3,14 @@ Users will have to create their own Player objects that fulfill
 the PlayerInterface
 """
 from abc import ABC, abstractmethod
+from concurrent.futures import Executor
 from enum import IntEnum
-from typing import NamedTuple, Optional, Union
+from typing import (Callable, Iterable, Iterator, NamedTuple, Optional,
+                    TextIO, Union)
+import hashlib
+import json
 import random
+import time
 
 
 ###############################################################################
@@ -48,6 +53,143 @@ class Weapon(IntEnum):
 
 Card = Union[Suspect, Weapon, Location]
 
+ALL_CARDS: list[Card] = list(Suspect) + list(Location) + list(Weapon)
+
+# The cards of Rules.generate().  Each category has a fixed band of values
+# above the classic cards, so that a generated card has the same value in
+# every process, whatever rules were generated before.
+MAX_GENERATED_CATEGORY = 64
+GeneratedSuspect = IntEnum(
+    "GeneratedSuspect",
+    [("SUSPECT_" + str(i + 1), max(ALL_CARDS) + 1 + i)
+     for i in range(MAX_GENERATED_CATEGORY)],
+    module=__name__)
+GeneratedLocation = IntEnum(
+    "GeneratedLocation",
+    [("LOCATION_" + str(i + 1), max(GeneratedSuspect) + 1 + i)
+     for i in range(MAX_GENERATED_CATEGORY)],
+    module=__name__)
+GeneratedWeapon = IntEnum(
+    "GeneratedWeapon",
+    [("WEAPON_" + str(i + 1), max(GeneratedLocation) + 1 + i)
+     for i in range(MAX_GENERATED_CATEGORY)],
+    module=__name__)
+
+# Maps Card.value to its card.  Index 0 is unused.
+_CARDS_BY_VALUE: list[Optional[Card]] = ([None] + ALL_CARDS +
+                                         list(GeneratedSuspect) +
+                                         list(GeneratedLocation) +
+                                         list(GeneratedWeapon))
+_SUSPECTS: list[Card] = list(Suspect)
+_LOCATIONS: list[Card] = list(Location)
+_WEAPONS: list[Card] = list(Weapon)
+
+
+###############################################################################
+# Card sets
+###############################################################################
+
+
+class CardSet():
+    """An immutable set of cards, stored as an integer bitmask where bit
+    `card.value` is set for each card in the set.  Union, intersection,
+    difference and size are single integer operations, which makes it
+    suitable for hands, face up cards, scenarios, and for bots to track
+    what they know.
+
+    Eg. `CardSet(hand) & CardSet(suggestion)` is the set of cards in the
+    hand that could disprove the suggestion.
+
+    Members:
+    mask: The bitmask.  Should be treated as read only.
+    """
+    __slots__ = ("mask",)
+
+    def __init__(self, cards: Iterable[Card] = ()) -> None:
+        mask = 0
+        for card in cards:
+            mask |= 1 << card
+        self.mask: int = mask
+
+    @classmethod
+    def from_mask(cls, mask: int) -> 'CardSet':
+        """Returns the CardSet with the given bitmask."""
+        card_set = cls.__new__(cls)
+        card_set.mask = mask
+        return card_set
+
+    def __contains__(self, card: Card) -> bool:
+        return bool(self.mask >> card & 1)
+
+    def __iter__(self) -> Iterator[Card]:
+        mask = self.mask
+        while mask:
+            low_bit = mask & -mask
+            yield _CARDS_BY_VALUE[low_bit.bit_length() - 1]
+            mask ^= low_bit
+
+    def __len__(self) -> int:
+        return self.mask.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.mask != 0
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CardSet):
+            return NotImplemented
+        return self.mask == other.mask
+
+    def __hash__(self) -> int:
+        return hash(self.mask)
+
+    def __or__(self, other: 'CardSet') -> 'CardSet':
+        return CardSet.from_mask(self.mask | other.mask)
+
+    def __and__(self, other: 'CardSet') -> 'CardSet':
+        return CardSet.from_mask(self.mask & other.mask)
+
+    def __sub__(self, other: 'CardSet') -> 'CardSet':
+        return CardSet.from_mask(self.mask & ~other.mask)
+
+    def __xor__(self, other: 'CardSet') -> 'CardSet':
+        return CardSet.from_mask(self.mask ^ other.mask)
+
+    def __le__(self, other: 'CardSet') -> bool:
+        return self.mask & ~other.mask == 0
+
+    def __repr__(self) -> str:
+        return "CardSet([" + ", ".join(card.name for card in self) + "])"
+
+    def isdisjoint(self, other: 'CardSet') -> bool:
+        """Returns whether self and other have no cards in common."""
+        return self.mask & other.mask == 0
+
+    def with_card(self, card: Card) -> 'CardSet':
+        """Returns a copy of self with card added."""
+        return CardSet.from_mask(self.mask | 1 << card)
+
+    def without_card(self, card: Card) -> 'CardSet':
+        """Returns a copy of self with card removed."""
+        return CardSet.from_mask(self.mask & ~(1 << card))
+
+
+def card_mask(cards: Iterable[Card]) -> int:
+    """Returns the bitmask of a group of cards, as used by CardSet.mask"""
+    mask = 0
+    for card in cards:
+        mask |= 1 << card
+    return mask
+
+
+def card_from_value(value: int) -> Card:
+    """Returns the card with Card.value == value, eg. to decode cards that
+    were stored as integers.
+    """
+    card = _CARDS_BY_VALUE[value]
+    if card is None or value < 0:
+        raise ValueError("no card has value " + repr(value))
+    return card
+
 
 ###############################################################################
 # Scenario definitions
@@ -67,6 +209,9 @@ class Scenario(NamedTuple):
     what: Weapon
 
     def __str__(self) -> str:
+        index = scenario_index(self)
+        if 0 <= index < NUM_SCENARIOS:
+            return _SCENARIO_STRINGS[index]
         return (self.who.name + " in the " +
                 self.where.name + " with the "
                 + self.what.name)
@@ -80,6 +225,67 @@ class Accusation(Scenario):
     """An accusation"""
 
 
+# There is one scenario for each combination of a Suspect, a Location and
+# a Weapon.  They are numbered densely from 0 in that order, so that
+# per-scenario data can be kept in lists or arrays instead of dicts.
+NUM_SCENARIOS: int = len(Suspect) * len(Location) * len(Weapon)
+_FIRST_SUSPECT: int = min(Suspect)
+_FIRST_LOCATION: int = min(Location)
+_FIRST_WEAPON: int = min(Weapon)
+_NUM_WEAPONS: int = len(Weapon)
+_SCENARIOS_PER_SUSPECT: int = len(Location) * len(Weapon)
+
+
+def scenario_index(scenario: Iterable[Card]) -> int:
+    """Returns the dense index (0 <= index < NUM_SCENARIOS) of a scenario.
+
+    Parameters:
+    scenario: Any (who, where, what) triple, eg. a Scenario.
+    """
+    who, where, what = scenario
+    return ((who - _FIRST_SUSPECT) * _SCENARIOS_PER_SUSPECT +
+            (where - _FIRST_LOCATION) * _NUM_WEAPONS +
+            (what - _FIRST_WEAPON))
+
+
+# Every Suggestion and every Accusation, indexed by scenario_index().
+# Returning these instead of new objects saves an allocation per turn,
+# and lets them be compared by identity.
+SUGGESTIONS: list[Suggestion] = [Suggestion(who, where, what)
+                                 for who in Suspect
+                                 for where in Location
+                                 for what in Weapon]
+ACCUSATIONS: list[Accusation] = [Accusation(*suggestion)
+                                 for suggestion in SUGGESTIONS]
+_SCENARIO_STRINGS: list[str] = [who.name + " in the " + where.name +
+                                " with the " + what.name
+                                for who, where, what in SUGGESTIONS]
+
+
+def interned_suggestion(who: Suspect,
+                        where: Location,
+                        what: Weapon) -> Suggestion:
+    """Returns the Suggestion(who, where, what) from SUGGESTIONS, or a new
+    one for cards of generated Rules.
+    """
+    index = scenario_index((who, where, what))
+    if index < NUM_SCENARIOS:
+        return SUGGESTIONS[index]
+    return Suggestion(who, where, what)
+
+
+def interned_accusation(who: Suspect,
+                        where: Location,
+                        what: Weapon) -> Accusation:
+    """Returns the Accusation(who, where, what) from ACCUSATIONS, or a new
+    one for cards of generated Rules.
+    """
+    index = scenario_index((who, where, what))
+    if index < NUM_SCENARIOS:
+        return ACCUSATIONS[index]
+    return Accusation(who, where, what)
+
+
 class Counterevidence(NamedTuple):
     """Information that disproves a Suggestion.
 
@@ -91,6 +297,142 @@ class Counterevidence(NamedTuple):
     evidence: Card
 
 
+def _counterevidence_table(cards: list[Card], num_players: int
+                           ) -> list[list[Optional[Counterevidence]]]:
+    """Returns every possible Counterevidence, indexed by
+    [refuter_id][card.value], so that the game does not allocate one per
+    suggestion.
+    """
+    table = []
+    for refuter_id in range(num_players):
+        row: list[Optional[Counterevidence]] = [None] * (max(cards) + 1)
+        for card in cards:
+            row[card] = Counterevidence(refuter_id, card)
+        table.append(row)
+    return table
+
+
+_COUNTEREVIDENCE = _counterevidence_table(ALL_CARDS, 6)
+
+
+###############################################################################
+# Rules
+###############################################################################
+
+
+class Rules():
+    """The deck and the table size of a game.  CLASSIC_RULES is the deck of
+    Suspect, Location and Weapon cards for 3 to 6 players.  Rules.generate()
+    makes larger or smaller decks, eg. to measure how bots scale.
+
+    A scenario is still one card of each of the three categories.  Cards of
+    generated rules are members of GeneratedSuspect, GeneratedLocation and
+    GeneratedWeapon, with values above the classic cards, so they work with
+    CardSet, card_mask(), card_from_value() and pickle.
+
+    Members:
+    suspects, locations, weapons: The cards of each category.
+    categories: The three lists above, in that order.
+    all_cards: Every card, in category order.
+    category_masks: The bitmask of each category.
+    all_cards_mask: The bitmask of every card.
+    max_players: The largest number of players.  At least 3.
+    num_scenarios: The number of possible envelopes.
+    max_rounds: The number of rounds before the game times out, which is
+    the number of scenarios.
+    """
+
+    def __init__(self,
+                 suspects: list[Card],
+                 locations: list[Card],
+                 weapons: list[Card],
+                 max_players: int = 6) -> None:
+        """Constructs the Rules.
+
+        Preconditions:
+        suspects, locations, weapons: Not empty, and every card of a
+        category has a lower value than every card of the next category.
+        max_players: 3 <= max_players <= number of cards - 3, so that every
+        player gets a card.
+        """
+        self.suspects: list[Card] = list(suspects)
+        self.locations: list[Card] = list(locations)
+        self.weapons: list[Card] = list(weapons)
+        self.categories: tuple[list[Card], ...] = (
+            self.suspects, self.locations, self.weapons)
+        self.all_cards: list[Card] = (self.suspects + self.locations +
+                                      self.weapons)
+        assert all(self.categories)
+        assert (max(self.suspects) < min(self.locations)
+                and max(self.locations) < min(self.weapons))
+        self.category_masks: list[int] = [card_mask(category)
+                                          for category in self.categories]
+        self.all_cards_mask: int = card_mask(self.all_cards)
+        self.max_players = max_players
+        assert 3 <= max_players <= len(self.all_cards) - 3
+        self.num_scenarios: int = (len(self.suspects) * len(self.locations)
+                                   * len(self.weapons))
+        self.max_rounds: int = self.num_scenarios
+        self.__categories: dict[Card, int] = {
+            card: index
+            for index, category in enumerate(self.categories)
+            for card in category}
+
+    def category_of(self, card: Card) -> int:
+        """Returns the index in self.categories of card's category."""
+        return self.__categories[card]
+
+    def __reduce_ex__(self, protocol):
+        # Unpickle to the same objects, so that rules can be sent to worker
+        # processes and compared by identity there.
+        if self is CLASSIC_RULES:
+            return "CLASSIC_RULES"
+        for key, rules in _generated_rules.items():
+            if rules is self:
+                return (Rules.generate, key)
+        return super().__reduce_ex__(protocol)
+
+    def __repr__(self) -> str:
+        return ("Rules(" + "x".join(str(len(category))
+                                    for category in self.categories) +
+                " cards, " + str(self.max_players) + " players)")
+
+    @staticmethod
+    def generate(num_suspects: int,
+                 num_locations: int,
+                 num_weapons: int,
+                 max_players: Optional[int] = None) -> 'Rules':
+        """Returns rules with the first cards of each generated category,
+        eg. SUSPECT_1 to SUSPECT_<num_suspects>.  The same arguments always
+        return the same Rules object.
+
+        Preconditions:
+        num_suspects, num_locations, num_weapons:
+        1 <= size <= MAX_GENERATED_CATEGORY
+
+        Parameters:
+        num_suspects, num_locations, num_weapons: The size of each category.
+        max_players: Defaults to every player getting at least one card.
+        """
+        num_cards = num_suspects + num_locations + num_weapons
+        if max_players is None:
+            max_players = num_cards - 3
+        key = (num_suspects, num_locations, num_weapons, max_players)
+        rules = _generated_rules.get(key)
+        if rules is None:
+            assert max(key[:3]) <= MAX_GENERATED_CATEGORY
+            rules = _generated_rules[key] = Rules(
+                list(GeneratedSuspect)[:num_suspects],
+                list(GeneratedLocation)[:num_locations],
+                list(GeneratedWeapon)[:num_weapons],
+                max_players)
+        return rules
+
+
+CLASSIC_RULES = Rules(_SUSPECTS, _LOCATIONS, _WEAPONS)
+_generated_rules: dict[tuple[int, ...], Rules] = {}
+
+
 ###############################################################################
 # Player Interface
 ###############################################################################
@@ -118,7 +460,8 @@ class PlayerInterface(ABC):
 
         Preconditions:
         player_id: 0<=player_id<num_players
-        num_players: 3<=num_players<=6
+        num_players: 3<=num_players<=6, or up to the max_players of the
+        game's Rules
 
         Parameters:
         player_id: The absolete position of self in the game.
@@ -128,6 +471,56 @@ class PlayerInterface(ABC):
         """
         raise NotImplemented
 
+    def reset(self,
+              player_id: int,
+              num_players: int,
+              face_up_cards: list[Card],
+              face_down_cards: list[Card]) -> None:
+        """Called instead of initialize() when a ClueGame is reset to play
+        another game with the same players.  Override it to keep allocated
+        state between games.  By default it calls initialize().
+
+        The card lists are reused by the game between games, so copy them
+        if they are needed after the next reset.
+
+        Parameters:
+        Same as initialize().
+        """
+        self.initialize(player_id, num_players, face_up_cards,
+                        face_down_cards)
+
+    def receive_rules(self, rules: Rules) -> None:
+        """Optional hook, called before initialize() or reset() with the
+        Rules of the game.  Bots that only play with the classic cards can
+        ignore it, which is the default.
+
+        Parameters:
+        rules: The cards and table size of the game.
+        """
+        pass
+
+    def wants_public_knowledge(self) -> bool:
+        """Optional hook.  Return True to receive the game's shared
+        public knowledge through receive_public_knowledge().  The game only
+        keeps it up to date if a player wants it.  Defaults to False.
+        """
+        return False
+
+    def receive_public_knowledge(self, knowledge) -> None:
+        """Optional hook, called after initialize() or reset() if
+        wants_public_knowledge() returned True.
+
+        The knowledge is a deduction.DeductionEngine in public mode, shared
+        by every player and updated by the game before each
+        observe_suggestion() and observe_accusation() call.  It must not be
+        changed: use knowledge.fork(player_id, face_down_cards) to get an
+        engine to add private information to.
+
+        Parameters:
+        knowledge: The public knowledge of the game.
+        """
+        pass
+
     @abstractmethod
     def name(self) -> str:
         """Returns the name of the current player.
@@ -232,16 +625,653 @@ class PlayerInterface(ABC):
         """
         raise NotImplemented
 
+
+class PlayerFailure(Exception):
+    """Raised by a player (eg. a proxy for a bot hosted in another process)
+    that can no longer play, because the bot crashed or did not answer in
+    time.  ClueGame removes the player from the game instead of crashing:
+    they take no more turns, receive no more calls, and their suggestions
+    are answered on their behalf.
+    """
+
+###############################################################################
+# Call timing
+###############################################################################
+
+
+class CallStats():
+    """Latency statistics of the calls to one PlayerInterface method.
+    Latencies are kept in a sparse histogram with 4 buckets per power of 2
+    nanoseconds, so quantiles are accurate to about 12%, and statistics of
+    many games can be merged by adding buckets.
+
+    Members:
+    count: The number of calls.
+    total_ns: The total time spent in the calls, in nanoseconds.
+    max_ns: The slowest call, in nanoseconds.
+    buckets: Maps a bucket index to the number of calls in it.
+    """
+    __slots__ = ("count", "total_ns", "max_ns", "buckets")
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.total_ns: int = 0
+        self.max_ns: int = 0
+        self.buckets: dict[int, int] = {}
+
+    @staticmethod
+    def bucket(ns: int) -> int:
+        """Returns the histogram bucket of a latency in nanoseconds."""
+        bits = ns.bit_length()
+        if bits <= 3:
+            return ns
+        return bits * 4 + ((ns >> (bits - 3)) & 3)
+
+    @staticmethod
+    def bucket_value(index: int) -> float:
+        """Returns the middle of a histogram bucket, in nanoseconds."""
+        if index < 8:
+            return float(index)
+        bits, quarter = divmod(index, 4)
+        return (4 + quarter + 0.5) * 2.0 ** (bits - 3)
+
+    def record(self, ns: int) -> None:
+        """Adds a call that took ns nanoseconds."""
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+        index = self.bucket(ns)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other: 'CallStats') -> None:
+        """Adds the calls recorded by other into self."""
+        self.count += other.count
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+
+    def quantile(self, q: float) -> float:
+        """Returns the approximate q quantile of the latency, in seconds.
+
+        Preconditions:
+        q: 0 <= q <= 1
+        """
+        if self.count == 0:
+            return 0.0
+        if q >= 1:
+            return self.max_ns / 1e9
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                ns = min(self.bucket_value(index), self.max_ns)
+                return ns / 1e9
+        return self.max_ns / 1e9
+
+    def summary(self) -> str:
+        """Returns the count, p50, p99 and max latency as a string."""
+        return (str(self.count) + " calls, p50 " +
+                format(self.quantile(0.5) * 1e6, ".1f") + "us, p99 " +
+                format(self.quantile(0.99) * 1e6, ".1f") + "us, max " +
+                format(self.max_ns / 1e3, ".1f") + "us")
+
+
+class _TimedPlayer(PlayerInterface):
+    """Wraps a player and records the latency of every call to it.
+
+    Members:
+    player: The wrapped player.
+    stats: Maps a method name to its CallStats.
+    total_ns: The time spent in all calls, in nanoseconds.
+    last_ns: The time spent in the most recent call, in nanoseconds.
+    """
+
+    def __init__(self, player: PlayerInterface) -> None:
+        self.player = player
+        self.stats: dict[str, CallStats] = {}
+        self.total_ns: int = 0
+        self.last_ns: int = 0
+
+    def __timed(self, method: str, *args):
+        start = time.perf_counter_ns()
+        try:
+            return getattr(self.player, method)(*args)
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            self.last_ns = elapsed
+            self.total_ns += elapsed
+            stats = self.stats.get(method)
+            if stats is None:
+                stats = self.stats[method] = CallStats()
+            stats.record(elapsed)
+
+    def initialize(self,
+                   player_id: int,
+                   num_players: int,
+                   face_up_cards: list[Card],
+                   face_down_cards: list[Card]) -> None:
+        return self.__timed("initialize", player_id, num_players,
+                            face_up_cards, face_down_cards)
+
+    def reset(self,
+              player_id: int,
+              num_players: int,
+              face_up_cards: list[Card],
+              face_down_cards: list[Card]) -> None:
+        return self.__timed("reset", player_id, num_players, face_up_cards,
+                            face_down_cards)
+
+    def receive_rules(self, rules: Rules) -> None:
+        return self.player.receive_rules(rules)
+
+    def wants_public_knowledge(self) -> bool:
+        return self.player.wants_public_knowledge()
+
+    def receive_public_knowledge(self, knowledge) -> None:
+        return self.__timed("receive_public_knowledge", knowledge)
+
+    def name(self) -> str:
+        return self.__timed("name")
+
+    def take_turn(self) -> Union[Suggestion, Accusation]:
+        return self.__timed("take_turn")
+
+    def respond_to_suggestion(self,
+                              suggestor_id: int,
+                              suggestion: Suggestion) -> Optional[Card]:
+        return self.__timed("respond_to_suggestion", suggestor_id,
+                            suggestion)
+
+    def receive_suggestion_result(self,
+                                  suggestion: Suggestion,
+                                  result: Optional[Counterevidence]) -> None:
+        return self.__timed("receive_suggestion_result", suggestion, result)
+
+    def observe_suggestion(self,
+                           suggestor_id: int,
+                           suggestion: Suggestion,
+                           blocker_id: Optional[int]) -> None:
+        return self.__timed("observe_suggestion", suggestor_id, suggestion,
+                            blocker_id)
+
+    def observe_accusation(self,
+                           accusor_id: int,
+                           accusation: Accusation) -> None:
+        return self.__timed("observe_accusation", accusor_id, accusation)
+
+###############################################################################
+# Dealing
+###############################################################################
+
+
+class Deal(NamedTuple):
+    """A complete deal of the cards for one game.
+
+    Members:
+    envelope: The final solution.
+    face_up_cards: The cards that are face up and known to all players.
+    hands: The facedown cards of each player, indexed by player id.
+    """
+    envelope: Scenario
+    face_up_cards: list[Card]
+    hands: list[list[Card]]
+
+
+Seed = Union[None, int, random.Random]
+
+
+def make_rng(seed: Seed = None) -> random.Random:
+    """Returns a random number generator for the given seed.
+
+    Parameters:
+    seed: An existing Random object (which is returned as is), an integer
+    seed, or None for a generator seeded from the operating system.
+    """
+    if isinstance(seed, random.Random):
+        return seed
+    return random.Random(seed)
+
+
+def derive_seed(seed: int, *indices: int) -> int:
+    """Derives an independent 64 bit seed from a base seed and a path of
+    indices, eg. derive_seed(tournament_seed, game_index).  The result only
+    depends on the arguments, so work can be split over any number of
+    processes and still be reproduced exactly.
+    """
+    key = ",".join(str(value) for value in (seed,) + indices)
+    digest = hashlib.blake2b(key.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _deal_into(rng: random.Random,
+               rules: Rules,
+               suspects: list[Card],
+               locations: list[Card],
+               weapons: list[Card],
+               deck: list[Card],
+               face_up_cards: list[Card],
+               hands: list[list[Card]]) -> Scenario:
+    """Shuffles and deals the cards into existing lists, so that games can
+    be dealt without allocating new ones.  The contents of every list are
+    replaced.
+
+    Parameters:
+    rng: Used to shuffle the cards.
+    rules: The cards to deal.
+    suspects, locations, weapons, deck: Scratch lists.
+    face_up_cards: Receives the face up cards.
+    hands: Receives the facedown cards, one list per player.
+
+    Returns:
+    The envelope.
+    """
+    # divide up the card types
+    suspects[:] = rules.suspects
+    rng.shuffle(suspects)
+    locations[:] = rules.locations
+    rng.shuffle(locations)
+    weapons[:] = rules.weapons
+    rng.shuffle(weapons)
+
+    # populate the mystery envelope with a random card of each type
+    envelope = Scenario(suspects.pop(), locations.pop(), weapons.pop())
+
+    # now create the deck with the remainder
+    deck[:] = suspects
+    deck += locations
+    deck += weapons
+    assert len(deck) == len(rules.all_cards) - 3
+    rng.shuffle(deck)
+
+    num_players = len(hands)
+    face_up_cards.clear()
+    for i in range(len(deck) % num_players):
+        face_up_cards.append(deck.pop())
+
+    assert len(deck) % num_players == 0
+
+    num_cards_per_player = len(deck) // num_players
+    for hand in hands:
+        hand.clear()
+        for i in range(num_cards_per_player):
+            hand.append(deck.pop())
+    return envelope
+
+
+def deal_cards(num_players: int,
+               seed: Seed = None,
+               rules: Rules = CLASSIC_RULES) -> Deal:
+    """Shuffles and deals the cards for a game.
+
+    Preconditions:
+    num_players: 3 <= num_players <= rules.max_players
+
+    Parameters:
+    num_players: The number of players in the game.
+    seed: See make_rng().
+    rules: The cards to deal.
+
+    Returns:
+    The deal.
+    """
+    face_up_cards: list[Card] = []
+    hands: list[list[Card]] = [[] for _ in range(num_players)]
+    envelope = _deal_into(make_rng(seed), rules, [], [], [], [],
+                          face_up_cards, hands)
+    return Deal(envelope, face_up_cards, hands)
+
+
+def sample_deals(num_players: int,
+                 seed: int,
+                 count: int,
+                 start: int = 0,
+                 rules: Rules = CLASSIC_RULES) -> Iterator[Deal]:
+    """Yields the deals for games start..start+count-1 of a run with the
+    given base seed.  Game i is always dealt with derive_seed(seed, i), so
+    the same deals can be replayed with different bots for paired
+    comparisons.
+    """
+    for game_index in range(start, start + count):
+        yield deal_cards(num_players, derive_seed(seed, game_index), rules)
+
+###############################################################################
+# Game events
+###############################################################################
+
+
+class DealEvent(NamedTuple):
+    """The cards have been shuffled and dealt.
+
+    Members:
+    envelope: The final solution.
+    player_names: The name of each player, indexed by player id.
+    hands: The facedown cards of each player, indexed by player id.
+    face_up_cards: The cards that are face up and known to all players.
+    """
+    envelope: Scenario
+    player_names: list[str]
+    hands: list[list[Card]]
+    face_up_cards: list[Card]
+
+
+class RoundEvent(NamedTuple):
+    """A new round of turns is starting.
+
+    Members:
+    round_number: The index of the round, starting at 0.
+    """
+    round_number: int
+
+
+class SuggestionEvent(NamedTuple):
+    """A player has made a suggestion.
+
+    Members:
+    suggestor_id: The id of the player who made the suggestion.
+    suggestion: The Suggestion made by the player.
+    """
+    suggestor_id: int
+    suggestion: Suggestion
+
+
+class BlockEvent(NamedTuple):
+    """The result of going around the table with a suggestion.
+
+    Members:
+    suggestor_id: The id of the player who made the suggestion.
+    suggestion: The Suggestion made by the player.
+    blocker_id: The id of the player who disproved the suggestion, or None
+    if no other player had any of the cards.
+    card: The card that was secretly shown, or None.
+    """
+    suggestor_id: int
+    suggestion: Suggestion
+    blocker_id: Optional[int]
+    card: Optional[Card]
+
+
+class AccusationEvent(NamedTuple):
+    """A player has made an accusation.
+
+    Members:
+    accusor_id: The id of the player who made the accusation.
+    accusation: The Accusation made by the player.
+    """
+    accusor_id: int
+    accusation: Accusation
+
+
+class WinEvent(NamedTuple):
+    """A player has made a correct accusation and won the game.
+
+    Members:
+    winner_id: The id of the winning player.
+    """
+    winner_id: int
+
+
+class EliminationEvent(NamedTuple):
+    """A player has made an incorrect accusation and can no longer take
+    turns.
+
+    Members:
+    player_id: The id of the eliminated player.
+    players_remaining: The number of players that can still take turns.
+    """
+    player_id: int
+    players_remaining: int
+
+
+class BudgetEvent(NamedTuple):
+    """A player went over their time budget.
+
+    Members:
+    player_id: The id of the player.
+    method: The PlayerInterface method that was being timed.
+    seconds: The time taken by the call, or by the whole game so far.
+    eliminated: False if the player forfeits one turn for a slow
+    take_turn(), True if they went over their budget for the game and can
+    no longer take turns.
+    """
+    player_id: int
+    method: str
+    seconds: float
+    eliminated: bool
+
+
+class PlayerFailureEvent(NamedTuple):
+    """A player raised PlayerFailure and was removed from the game.
+
+    Members:
+    player_id: The id of the player.
+    method: The PlayerInterface method that failed.
+    message: The reason given by the player.
+    """
+    player_id: int
+    method: str
+    message: str
+
+
+class TimeoutEvent(NamedTuple):
+    """The game ran out of rounds without a winner.
+
+    Members:
+    rounds: The number of rounds that were played.
+    """
+    rounds: int
+
+
+GameEvent = Union[DealEvent, RoundEvent, SuggestionEvent, BlockEvent,
+                  AccusationEvent, WinEvent, EliminationEvent, BudgetEvent,
+                  PlayerFailureEvent, TimeoutEvent]
+
+
+class EventSink(ABC):
+    """An interface for objects that receive the events of a ClueGame.
+
+    Members:
+    enabled: Whether the game should build and emit events at all.  When
+    False, the game skips creating event objects entirely.
+    """
+    enabled: bool = True
+
+    @abstractmethod
+    def emit(self, event: GameEvent) -> None:
+        """Receives a single game event.
+
+        Parameters:
+        event: One of the event types defined in this module.
+        """
+        raise NotImplemented
+
+
+class NullSink(EventSink):
+    """Discards every event.  Used to run games headless with no logging
+    overhead.
+    """
+    enabled = False
+
+    def emit(self, event: GameEvent) -> None:
+        pass
+
+
+class PrintSink(EventSink):
+    """Prints a human readable log of the game, so that humans can watch.
+    """
+
+    def __init__(self, file: Optional[TextIO] = None) -> None:
+        """Constructs the PrintSink.
+
+        Parameters:
+        file: The stream to print to.  Defaults to stdout.
+        """
+        self.file = file
+        self.player_names: list[str] = []
+
+    def __print(self, text: str = "") -> None:
+        print(text, file=self.file)
+
+    def __player_name(self, player_id: int) -> str:
+        if player_id >= len(self.player_names):
+            # Players can fail before the deal is announced.
+            return str(player_id)
+        return str(player_id) + ": " + self.player_names[player_id]
+
+    def emit(self, event: GameEvent) -> None:
+        if isinstance(event, DealEvent):
+            self.player_names = event.player_names
+            self.__print("\nStarting a game of Clue with " +
+                         str(len(event.player_names)) + " players.\n")
+            self.__print("The final solution is: " +
+                         str(event.envelope) + "\n")
+            self.__print("The players are:")
+            for player_id, hand in enumerate(event.hands):
+                player_cards = ', '.join([card.name for card in hand])
+                self.__print("   " + self.__player_name(player_id) +
+                             "(" + player_cards + ")")
+            self.__print()
+            if len(event.face_up_cards) == 0:
+                self.__print("There are no face up cards.\n")
+            else:
+                self.__print("The face up cards are:")
+                for card in event.face_up_cards:
+                    self.__print("   " + card.name)
+                self.__print()
+        elif isinstance(event, RoundEvent):
+            self.__print("===============================================" +
+                         "===============================================")
+            self.__print("Round #" + str(event.round_number))
+            self.__print("===============================================" +
+                         "===============================================")
+        elif isinstance(event, SuggestionEvent):
+            self.__print(self.__player_name(event.suggestor_id) +
+                         " is making a suggestion: \"" +
+                         str(event.suggestion) + ".\"")
+        elif isinstance(event, BlockEvent):
+            if event.blocker_id is None:
+                self.__print("    No other player had any of those cards.")
+            else:
+                self.__print("    " + self.__player_name(event.blocker_id) +
+                             " disproved this by secretly showing " +
+                             event.card.name + ".")
+        elif isinstance(event, AccusationEvent):
+            self.__print(self.__player_name(event.accusor_id) +
+                         " is making an accusation: \"" +
+                         str(event.accusation) + ".\"")
+        elif isinstance(event, WinEvent):
+            self.__print("    " + self.__player_name(event.winner_id) +
+                         " has won!")
+        elif isinstance(event, EliminationEvent):
+            self.__print("    " + self.__player_name(event.player_id) +
+                         " was wrong.")
+            if event.players_remaining == 0:
+                self.__print("All players were eliminated.")
+        elif isinstance(event, BudgetEvent):
+            if event.eliminated:
+                self.__print("    " + self.__player_name(event.player_id) +
+                             " used " + format(event.seconds, ".3f") +
+                             "s and is over the time budget for the game.")
+            else:
+                self.__print("    " + self.__player_name(event.player_id) +
+                             " took " + format(event.seconds, ".3f") +
+                             "s in " + event.method +
+                             " and forfeits the turn.")
+        elif isinstance(event, PlayerFailureEvent):
+            self.__print("    " + self.__player_name(event.player_id) +
+                         " failed in " + event.method + " (" +
+                         event.message + ") and left the game.")
+        else:
+            assert isinstance(event, TimeoutEvent)
+            self.__print("Time's up. No one wins.")
+
+
+class BufferedSink(EventSink):
+    """Keeps every event in memory, in order, for later inspection.
+
+    Members:
+    events: The events received so far.
+    """
+
+    def __init__(self) -> None:
+        self.events: list[GameEvent] = []
+
+    def emit(self, event: GameEvent) -> None:
+        self.events.append(event)
+
+    def clear(self) -> None:
+        """Forgets all of the events received so far."""
+        self.events.clear()
+
+
+def _json_value(value):
+    """Converts a field of a game event into a JSON compatible value.
+    Cards are written by name, scenarios as objects keyed by field name.
+    """
+    if isinstance(value, Scenario):
+        return {"who": value.who.name,
+                "where": value.where.name,
+                "what": value.what.name}
+    if isinstance(value, IntEnum):
+        return value.name
+    if isinstance(value, list):
+        return [_json_value(item) for item in value]
+    return value
+
+
+class JsonLinesSink(EventSink):
+    """Writes each event as a single line of JSON.  Each object has an
+    "event" key with the name of the event type, and one key per event
+    member.
+    """
+
+    def __init__(self, file: TextIO) -> None:
+        """Constructs the JsonLinesSink.
+
+        Parameters:
+        file: A writable text stream.
+        """
+        self.file = file
+
+    def emit(self, event: GameEvent) -> None:
+        record = {"event": type(event).__name__}
+        for field, value in zip(event._fields, event):
+            record[field] = _json_value(value)
+        self.file.write(json.dumps(record) + "\n")
+
 ###############################################################################
 # Game object
 ###############################################################################
 
 
+class GameResult(NamedTuple):
+    """The outcome of a game of Clue.
+
+    Members:
+    winner_id: The id of the player who made a correct accusation, or None
+    if no one won.
+    rounds: The number of rounds that were started.
+    turns: The number of turns that were taken across all rounds.
+    eliminations: The ids of the players who made incorrect accusations,
+    in the order they were made.
+    call_stats: If the game was timed, maps each method name to its
+    CallStats, for each player id.  Otherwise None.
+    """
+    winner_id: Optional[int]
+    rounds: int
+    turns: int
+    eliminations: list[int]
+    call_stats: Optional[list[dict[str, CallStats]]] = None
+
+
 class ClueGame():
     """An object to manage a game of Clue.  It will shuffle and distribute
     cards, ensure everyone gets their cards, confirm no one is cheating,
     and make sure information is shared when appropriate.  It will also
-    document the game by logging relevant information to the output.
+    document the game by emitting events to an EventSink.  By default they
+    are printed to the output.
     """
 
     class __PlayerInfo():
@@ -252,95 +1282,229 @@ class ClueGame():
         Members:
         player: A player object.
         face_down_cards: A copy of the facedown cards that the player has.
+        face_down_mask: The facedown cards as a CardSet bitmask.
         can_take_turns: Whether the current player can continue to take turns,
         or whether they have made an incorrect accusation and can only sit and
         respond to suggestions.
+        failed: Whether the player raised PlayerFailure.  Failed players
+        receive no more calls.
         """
+        __slots__ = ("player", "face_down_cards", "face_down_mask",
+                     "can_take_turns", "failed")
 
         def __init__(self,
-                     player: PlayerInterface,
-                     face_down_cards: list[Card]):
+                     player: PlayerInterface):
             self.player = player
-            self.face_down_cards = face_down_cards
+            self.face_down_cards: list[Card] = []
+            self.face_down_mask: int = 0
             self.can_take_turns: bool = True
+            self.failed: bool = False
 
     def __init__(self,
-                 players: list[PlayerInterface]):
+                 players: list[PlayerInterface],
+                 event_sink: Optional[EventSink] = None,
+                 seed: Seed = None,
+                 deal: Optional[Deal] = None,
+                 timing: bool = False,
+                 call_budget: Optional[float] = None,
+                 game_budget: Optional[float] = None,
+                 rules: Rules = CLASSIC_RULES,
+                 profile=None,
+                 executor: Optional[Executor] = None):
         """Constructs the ClueGame object.  Shuffles and deals the cards.
 
         Preconditions:
-        players: 3 <= len(players) <= 6
+        players: 3 <= len(players) <= rules.max_players
+        deal: None, or len(deal.hands) == len(players)
 
         Parameters:
         players: The players that will participate in this game.
+        event_sink: Receives the events of the game.  Defaults to a
+        PrintSink.  Use a NullSink to run the game headless.
+        seed: Used to shuffle the cards.  See make_rng().
+        deal: Plays this deal instead of shuffling.
+        timing: Whether to record the latency of every call to the players.
+        The statistics are returned in GameResult.call_stats.  Implied by
+        either budget.
+        call_budget: Seconds a player may spend in one take_turn() call.
+        Slower turns are forfeited.  Only take_turn() has a per call
+        budget: the other calls have no penalty of their own, and only
+        count towards game_budget.
+        game_budget: Seconds a player may spend in all calls of the game.
+        A player over budget can no longer take turns.  Neither budget
+        interrupts a call, so a bot that never returns stalls the game; host
+        it with a bot_host.SubprocessPlayer timeout to bound every call.
+        rules: The cards, and the number of rounds before the game times
+        out.  Players receive them through PlayerInterface.receive_rules().
+        profile: A profiling.Profile that execute() adds stack samples to,
+        attributed to the bot method that was running.  Off by default.
+        executor: Runs the calls that go to every player (the start of a
+        game, observe_suggestion() and observe_accusation()) concurrently,
+        with at least one worker per player.  The game still waits for
+        every call before it goes on, so each player receives its calls in
+        the same order.  Defaults to calling the players one by one.  See
+        async_clue_game.
         """
         self.num_players: int = len(players)
-        assert(self.num_players >= 3 and self.num_players <= 6)
-        print("\nStarting a game of Clue with " +
-              str(self.num_players) + " players.\n")
-
-        random.seed()
-
-        # divide up the card types
-        suspects: list[Suspect] = [suspect for suspect in Suspect]
-        random.shuffle(suspects)
-
-        locations: list[Location] = [location for location in Location]
-        random.shuffle(locations)
-
-        weapons: list[Weapon] = [weapon for weapon in Weapon]
-        random.shuffle(weapons)
-
-        # populate the mystery envelope with a random card of each type
-        self.envelope = Scenario(suspects.pop(),
-                                 locations.pop(),
-                                 weapons.pop())
-
-        print("The final solution is: " +
-              str(self.envelope) + "\n")
-
-        # now create the deck with the remainder
-        deck: list[Card] = suspects + locations + weapons
-        assert len(deck) == 18
-        random.shuffle(deck)
-
+        self.rules: Rules = rules
+        assert(self.num_players >= 3 and
+               self.num_players <= rules.max_players)
+        self.__counterevidence = (
+            _COUNTEREVIDENCE if rules is CLASSIC_RULES
+            else _counterevidence_table(rules.all_cards, self.num_players))
+        self.event_sink: EventSink = (PrintSink() if event_sink is None
+                                      else event_sink)
+        self.__logging: bool = self.event_sink.enabled
+        self.__eliminations: list[int] = []
+        self.__winner_id: Optional[int] = None
+        self.__call_budget_ns: Optional[int] = (
+            None if call_budget is None else int(call_budget * 1e9))
+        self.__game_budget_ns: Optional[int] = (
+            None if game_budget is None else int(game_budget * 1e9))
+        self.__timed_players: Optional[list[_TimedPlayer]] = None
+        self.__profile = profile
+        self.__executor = executor
+        # The shared public knowledge, if any player wants it.
+        self.public_knowledge = None
+        if timing or call_budget is not None or game_budget is not None:
+            self.__timed_players = [_TimedPlayer(player)
+                                    for player in players]
+            players = self.__timed_players
+
+        # The lists and generator that every deal is shuffled into.
+        self.__rng: Optional[random.Random] = None
+        self.__scratch: tuple[list[Card], ...] = ([], [], [], [])
+        self.envelope: Scenario = None
         self.face_up_cards: list[Card] = []
-        num_faceup_cards = int(len(deck) % self.num_players)
+        self.player_infos: list[self.__PlayerInfo] = [
+            self.__PlayerInfo(player) for player in players]
+        self.__hands: list[list[Card]] = [
+            player_info.face_down_cards for player_info in self.player_infos]
+        self.__start(seed, deal, "initialize")
+
+    def reset(self,
+              seed: Seed = None,
+              deal: Optional[Deal] = None) -> None:
+        """Prepares the same players for another game, reusing the game's
+        internal structures.  Players receive PlayerInterface.reset()
+        instead of initialize().
 
-        for i in range(num_faceup_cards):
-            self.face_up_cards.append(deck.pop())
-
-        assert len(deck) % self.num_players == 0
+        Parameters:
+        seed: Used to shuffle the cards.  See make_rng().
+        deal: Plays this deal instead of shuffling.
+        """
+        self.__eliminations = []
+        self.__winner_id = None
+        if self.__timed_players is not None:
+            for player in self.__timed_players:
+                player.stats = {}
+                player.total_ns = 0
+        self.__start(seed, deal, "reset")
+
+    def __start(self,
+                seed: Seed,
+                deal: Optional[Deal],
+                method: str) -> None:
+        """Deals the cards, and calls method ("initialize" or "reset") of
+        every player with their cards.
+        """
+        if deal is None:
+            if isinstance(seed, random.Random):
+                rng = seed
+            elif self.__rng is None:
+                rng = self.__rng = random.Random(seed)
+            else:
+                rng = self.__rng
+                rng.seed(seed)
+            self.envelope = _deal_into(rng, self.rules, *self.__scratch,
+                                       self.face_up_cards, self.__hands)
+        else:
+            assert len(deal.hands) == self.num_players
+            self.envelope = deal.envelope
+            self.face_up_cards[:] = deal.face_up_cards
+            for hand, dealt in zip(self.__hands, deal.hands):
+                hand[:] = dealt
 
-        # Deal cards and initialize each player.
+        # Initialize each player with their cards.
         # Also, remember what each player has.
-        print("The players are:")
-        num_cards_per_player = int(len(deck)/self.num_players)
-        self.player_infos: list[self.__PlayerInfo] = []
-        for i in range(self.num_players):
-            player_id: int = len(self.player_infos)
-            face_down_cards: list[Card] = []
-            for _ in range(num_cards_per_player):
-                face_down_cards.append(deck.pop())
-            self.player_infos.append(self.__PlayerInfo(players[i],
-                                                       face_down_cards))
-            player_info = self.player_infos[player_id]
-            player_info.player.initialize(player_id, self.num_players,
-                                          self.face_up_cards,
-                                          player_info.face_down_cards)
-            player_name: str = (str(player_id) + ": " +
-                                player_info.player.name())
-            player_cards: str = (', '.join([card.name for card
-                                            in face_down_cards]))
-            print("   " + player_name + "(" + player_cards + ")")
-        print()
-        if len(self.face_up_cards) == 0:
-            print("There are no face up cards.\n")
-        else:
-            print("The face up cards are:")
-            for card in self.face_up_cards:
-                print("   " + card.name)
-            print()
+        calls = []
+        for player_id, player_info in enumerate(self.player_infos):
+            player_info.face_down_mask = card_mask(
+                player_info.face_down_cards)
+            player_info.can_take_turns = True
+            player_info.failed = False
+            calls.append((player_id, self.__startPlayer,
+                          (player_info.player, method, player_id)))
+        self.__callAll(method, calls)
+        self.__shareKnowledge()
+        if self.__logging:
+            self.event_sink.emit(DealEvent(
+                self.envelope,
+                [self.__playerName(player_id)
+                 for player_id in range(self.num_players)],
+                [list(info.face_down_cards) for info in self.player_infos],
+                list(self.face_up_cards)))
+
+    def __startPlayer(self,
+                      player: PlayerInterface,
+                      method: str,
+                      player_id: int) -> None:
+        player.receive_rules(self.rules)
+        getattr(player, method)(player_id, self.num_players,
+                                self.face_up_cards,
+                                self.player_infos[player_id].face_down_cards)
+
+    def __callAll(self,
+                  method: str,
+                  calls: list[tuple[int, Callable, tuple]]) -> None:
+        """Makes calls, concurrently if the game has an executor, and
+        removes the players whose call raised PlayerFailure.
+
+        Parameters:
+        method: The PlayerInterface method that the calls make.
+        calls: (player_id, function, args) of each call.
+        """
+        if self.__executor is None:
+            for player_id, function, args in calls:
+                try:
+                    function(*args)
+                except PlayerFailure as failure:
+                    self.__playerFailed(player_id, method, failure)
+            return
+        futures = [(player_id, self.__executor.submit(function, *args))
+                   for player_id, function, args in calls]
+        for player_id, future in futures:
+            try:
+                future.result()
+            except PlayerFailure as failure:
+                self.__playerFailed(player_id, method, failure)
+
+    def __broadcast(self, method: str, *args) -> None:
+        """Calls method of every player that has not failed."""
+        self.__callAll(method, [
+            (player_id, getattr(player_info.player, method), args)
+            for player_id, player_info in enumerate(self.player_infos)
+            if not player_info.failed])
+
+    def __shareKnowledge(self) -> None:
+        """Starts tracking the public knowledge of the game, and shares it
+        with the players that want it.
+        """
+        wanting = [player_info for player_info in self.player_infos
+                   if not player_info.failed
+                   and player_info.player.wants_public_knowledge()]
+        if not wanting:
+            self.public_knowledge = None
+            return
+        if self.public_knowledge is None:
+            # Imported here, as the deduction module depends on this one.
+            from deduction import DeductionEngine
+            self.public_knowledge = DeductionEngine(self.rules)
+        self.public_knowledge.initialize(None, self.num_players,
+                                         self.face_up_cards, [])
+        for player_info in wanting:
+            player_info.player.receive_public_knowledge(
+                self.public_knowledge)
 
     def __handleSuggestion(self,
                            suggestor_id: int,
@@ -355,42 +1519,77 @@ class ClueGame():
         suggestion: The Suggestion made by the player.
         """
         suggestor = self.player_infos[suggestor_id].player
-        suggestor_name = (str(suggestor_id) + ": " + suggestor.name())
-        print(suggestor_name + " is making a suggestion: \"" +
-              str(suggestion) + ".\"")
+        if self.__logging:
+            self.event_sink.emit(SuggestionEvent(suggestor_id, suggestion))
 
         # Go around the table and see if any of the other players
         # can block this suggestion.
+        suggestion_mask = (1 << suggestion.who | 1 << suggestion.where |
+                           1 << suggestion.what)
         blocker_id: int = None
+        card: Optional[Card] = None
         for i in range(self.num_players-1):
             maybe_blocker_id: int = (suggestor_id + i + 1) % self.num_players
             maybe_blocker_info = self.player_infos[maybe_blocker_id]
-            maybe_blocker = maybe_blocker_info.player
-            maybe_blockers_cards = maybe_blocker_info.face_down_cards
 
-            if (suggestion.who in maybe_blockers_cards
-                    or suggestion.where in maybe_blockers_cards
-                    or suggestion.what in maybe_blockers_cards):
+            if maybe_blocker_info.face_down_mask & suggestion_mask:
                 blocker_id = maybe_blocker_id
-                blocker = maybe_blocker
+                blocker = maybe_blocker_info.player
                 # Blocker has at least one card.
                 # Ask them which they'd like to show.
-                card = blocker.respond_to_suggestion(suggestor_id, suggestion)
+                card = None
+                if not maybe_blocker_info.failed:
+                    try:
+                        card = blocker.respond_to_suggestion(suggestor_id,
+                                                             suggestion)
+                    except PlayerFailure as failure:
+                        self.__playerFailed(blocker_id,
+                                            "respond_to_suggestion", failure)
+                    else:
+                        if (card not in maybe_blocker_info.face_down_cards
+                                or card not in suggestion):
+                            self.__playerFailed(
+                                blocker_id, "respond_to_suggestion",
+                                PlayerFailure(
+                                    "showed " + repr(card) + ", which is "
+                                    "not a card of both their hand and the "
+                                    "suggestion"))
+                if maybe_blocker_info.failed:
+                    # Show a matching card on behalf of the failed player.
+                    card = next(card for card
+                                in maybe_blocker_info.face_down_cards
+                                if card in suggestion)
                 assert card is not None
-                result = Counterevidence(blocker_id, card)
-                suggestor.receive_suggestion_result(suggestion, result)
-                print("    " + str(blocker_id) + ": " + blocker.name() +
-                      " disproved this by secretly showing " + card.name +
-                      ".")
                 break
-        if blocker_id is None:
-            print("    No other player had any of those cards.")
-            suggestor.receive_suggestion_result(suggestion, None)
-
-        for player_info in self.player_infos:
-            player_info.player.observe_suggestion(suggestor_id,
-                                                  suggestion,
-                                                  blocker_id)
+        if not self.player_infos[suggestor_id].failed:
+            result = (None if blocker_id is None
+                      else self.__counterevidence[blocker_id][card])
+            try:
+                suggestor.receive_suggestion_result(suggestion, result)
+            except PlayerFailure as failure:
+                self.__playerFailed(suggestor_id,
+                                    "receive_suggestion_result", failure)
+        if self.__logging:
+            self.event_sink.emit(BlockEvent(suggestor_id, suggestion,
+                                            blocker_id, card))
+
+        if self.public_knowledge is not None:
+            self.public_knowledge.observe_suggestion(suggestor_id,
+                                                     suggestion, blocker_id)
+        if self.__executor is not None:
+            self.__broadcast("observe_suggestion", suggestor_id, suggestion,
+                             blocker_id)
+            return
+        # Once per suggestion, so without the overhead of __broadcast().
+        for player_id, player_info in enumerate(self.player_infos):
+            if player_info.failed:
+                continue
+            try:
+                player_info.player.observe_suggestion(suggestor_id,
+                                                      suggestion,
+                                                      blocker_id)
+            except PlayerFailure as failure:
+                self.__playerFailed(player_id, "observe_suggestion", failure)
 
     def __handleAccusation(self,
                            accusor_id: int,
@@ -408,26 +1607,29 @@ class ClueGame():
         Returns:
         Returns whether the game is over.
         """
-        accusor = self.player_infos[accusor_id].player
-        accusor_name = (str(accusor_id) + ": " + accusor.name())
-        print(accusor_name + " is making an accusation: \"" +
-              str(accusation) + ".\"")
+        if self.__logging:
+            self.event_sink.emit(AccusationEvent(accusor_id, accusation))
         if(accusation.who is self.envelope.who
            and accusation.where is self.envelope.where
            and accusation.what is self.envelope.what):
-            print("    " + accusor_name + " has won!")
+            if self.__logging:
+                self.event_sink.emit(WinEvent(accusor_id))
+            self.__winner_id = accusor_id
             return True
         else:
-            print("    " + accusor_name + " was wrong.")
             self.player_infos[accusor_id].can_take_turns = False
-            active_player_exists = False
-            for player_info in self.player_infos:
-                player_info.player.observe_accusation(accusor_id, accusation)
-                if player_info.can_take_turns:
-                    active_player_exists = True
-            if active_player_exists:
-                return False
-            print("All players were eliminated.")
+            players_remaining = sum(1 for player_info in self.player_infos
+                                    if player_info.can_take_turns)
+            if self.__logging:
+                self.event_sink.emit(EliminationEvent(accusor_id,
+                                                      players_remaining))
+            if self.public_knowledge is not None:
+                self.public_knowledge.observe_accusation(accusor_id,
+                                                         accusation)
+            self.__broadcast("observe_accusation", accusor_id, accusation)
+            self.__eliminations.append(accusor_id)
+            return not any(player_info.can_take_turns
+                           for player_info in self.player_infos)
 
     def __giveTurn(self,
                    player_id: int) -> bool:
@@ -448,7 +1650,19 @@ class ClueGame():
 
         player = self.player_infos[player_id].player
 
-        scenario = player.take_turn()
+        try:
+            scenario = player.take_turn()
+        except PlayerFailure as failure:
+            self.__playerFailed(player_id, "take_turn", failure)
+            return not any(player_info.can_take_turns
+                           for player_info in self.player_infos)
+        if (self.__call_budget_ns is not None
+                and player.last_ns > self.__call_budget_ns):
+            if self.__logging:
+                self.event_sink.emit(BudgetEvent(player_id, "take_turn",
+                                                 player.last_ns / 1e9,
+                                                 False))
+            return False
         if isinstance(scenario, Suggestion):
             self.__handleSuggestion(player_id, scenario)
             return False
@@ -456,21 +1670,88 @@ class ClueGame():
             assert isinstance(scenario, Accusation)
             return self.__handleAccusation(player_id, scenario)
 
-    def execute(self) -> None:
+    def __playerFailed(self,
+                       player_id: int,
+                       method: str,
+                       failure: PlayerFailure) -> None:
+        """Removes the player at player_id from the game after they raised
+        failure from method.
+        """
+        player_info = self.player_infos[player_id]
+        player_info.failed = True
+        player_info.can_take_turns = False
+        if self.__logging:
+            self.event_sink.emit(PlayerFailureEvent(player_id, method,
+                                                    str(failure)))
+
+    def __playerName(self,
+                     player_id: int) -> str:
+        player_info = self.player_infos[player_id]
+        if not player_info.failed:
+            try:
+                return player_info.player.name()
+            except PlayerFailure as failure:
+                self.__playerFailed(player_id, "name", failure)
+        return "player " + str(player_id)
+
+    def __checkGameBudget(self,
+                          player_id: int) -> bool:
+        """Eliminates the player at player_id if they have used more than
+        their time budget for the game.
+
+        Returns:
+        Returns whether the game is over, because no players are left.
+        """
+        player = self.player_infos[player_id].player
+        if player.total_ns <= self.__game_budget_ns:
+            return False
+        self.player_infos[player_id].can_take_turns = False
+        if self.__logging:
+            self.event_sink.emit(BudgetEvent(player_id, "game",
+                                             player.total_ns / 1e9, True))
+        return not any(player_info.can_take_turns
+                       for player_info in self.player_infos)
+
+    def __result(self, rounds: int, turns: int) -> GameResult:
+        call_stats = None
+        if self.__timed_players is not None:
+            call_stats = [player.stats for player in self.__timed_players]
+        return GameResult(self.__winner_id, rounds, turns,
+                          self.__eliminations, call_stats)
+
+    def execute(self) -> GameResult:
         """The main method of the ClueGame class.
         This method gets all of the players to take turns and share relevant
         information.
+
+        Returns:
+        The result of the game.
         """
-        number_of_possible_solutions: int = 324
+        if self.__profile is not None:
+            # Imported here, as the profiling module depends on this one.
+            from profiling import SamplingProfiler
+            with SamplingProfiler(self.__profile.interval, self.__profile):
+                return self.__play()
+        return self.__play()
+
+    def __play(self) -> GameResult:
+        number_of_possible_solutions: int = self.rules.max_rounds
+        turns = 0
         for i in range(number_of_possible_solutions):
-            print("===============================================" +
-                  "===============================================")
-            print("Round #" + str(i))
-            print("===============================================" +
-                  "===============================================")
+            if self.__logging:
+                self.event_sink.emit(RoundEvent(i))
             for player_id in range(self.num_players):
-                if self.player_infos[player_id].can_take_turns:
-                    gameIsOver = self.__giveTurn(player_id)
-                    if gameIsOver:
-                        exit()
-        print("Time's up. No one wins.")
+                if not self.player_infos[player_id].can_take_turns:
+                    continue
+                if self.__game_budget_ns is not None:
+                    if self.__checkGameBudget(player_id):
+                        return self.__result(i + 1, turns)
+                    if not self.player_infos[player_id].can_take_turns:
+                        continue
+                turns += 1
+                gameIsOver = self.__giveTurn(player_id)
+                if gameIsOver:
+                    return self.__result(i + 1, turns)
+        if self.__logging:
+            self.event_sink.emit(TimeoutEvent(number_of_possible_solutions))
+        return self.__result(number_of_possible_solutions, turns)
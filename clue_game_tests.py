@@ -0,0 +1,413 @@
+import io
+import json
+import os
+import pickle
+import random
+import subprocess
+import sys
+import time
+import unittest
+from clue_game import (ACCUSATIONS, CLASSIC_RULES, NUM_SCENARIOS, SUGGESTIONS,
+                       Accusation, AccusationEvent, BlockEvent, BudgetEvent,
+                       BufferedSink, CallStats, CardSet, ClueGame, DealEvent,
+                       JsonLinesSink, Location, NullSink, PlayerFailure,
+                       PlayerFailureEvent, PrintSink, Rules, Suggestion,
+                       SuggestionEvent, Suspect, Weapon, card_from_value,
+                       deal_cards, derive_seed, interned_accusation,
+                       interned_suggestion, sample_deals, scenario_index)
+from deduction_bot import DeductionBot
+from sample_bot import SampleBot
+
+
+class SlowBot(SampleBot):
+    def take_turn(self):
+        time.sleep(0.002)
+        return super().take_turn()
+
+
+class TestEventSinks(unittest.TestCase):
+    def test_buffered_sink_receives_deal_first(self):
+        sink = BufferedSink()
+        ClueGame([SampleBot(), SampleBot(), SampleBot()], sink)
+        self.assertEqual(len(sink.events), 1)
+        deal = sink.events[0]
+        self.assertIsInstance(deal, DealEvent)
+        self.assertEqual(deal.player_names, ['sample_bot'] * 3)
+        self.assertEqual(sum(len(hand) for hand in deal.hands), 18)
+
+    def test_null_sink_is_disabled(self):
+        self.assertFalse(NullSink().enabled)
+        ClueGame([SampleBot(), SampleBot(), SampleBot()], NullSink())
+
+    def test_print_sink_format(self):
+        output = io.StringIO()
+        sink = PrintSink(output)
+        sink.player_names = ['a', 'b', 'c']
+        suggestion = Suggestion(Suspect.MRS_PEACOCK,
+                                Location.BALLROOM,
+                                Weapon.LEAD_PIPE)
+        sink.emit(SuggestionEvent(0, suggestion))
+        sink.emit(BlockEvent(0, suggestion, 1, Weapon.LEAD_PIPE))
+        sink.emit(BlockEvent(0, suggestion, None, None))
+        self.assertEqual(
+            output.getvalue(),
+            '0: a is making a suggestion: '
+            '"MRS_PEACOCK in the BALLROOM with the LEAD_PIPE."\n'
+            '    1: b disproved this by secretly showing LEAD_PIPE.\n'
+            '    No other player had any of those cards.\n')
+
+    def test_json_lines_sink(self):
+        output = io.StringIO()
+        sink = JsonLinesSink(output)
+        sink.emit(AccusationEvent(2, Suggestion(Suspect.MRS_WHITE,
+                                                Location.HALL,
+                                                Weapon.ROPE)))
+        record = json.loads(output.getvalue())
+        self.assertEqual(record, {'event': 'AccusationEvent',
+                                  'accusor_id': 2,
+                                  'accusation': {'who': 'MRS_WHITE',
+                                                 'where': 'HALL',
+                                                 'what': 'ROPE'}})
+
+
+class TestDealing(unittest.TestCase):
+    def test_deal_sizes(self):
+        for num_players in range(3, 7):
+            deal = deal_cards(num_players, 0)
+            self.assertEqual(len(deal.hands), num_players)
+            self.assertEqual(len(deal.face_up_cards), 18 % num_players)
+            cards = (list(deal.envelope) + deal.face_up_cards +
+                     [card for hand in deal.hands for card in hand])
+            self.assertEqual(len(set(cards)), 21)
+
+    def test_seeded_deals_are_reproducible(self):
+        self.assertEqual(deal_cards(5, 42), deal_cards(5, 42))
+        self.assertEqual(deal_cards(5, 42), deal_cards(5, random.Random(42)))
+        self.assertEqual(list(sample_deals(4, 9, 3, start=2)),
+                         [deal_cards(4, derive_seed(9, i)) for i in (2, 3, 4)])
+
+    def test_derive_seed(self):
+        self.assertEqual(derive_seed(1, 2), derive_seed(1, 2))
+        self.assertNotEqual(derive_seed(1, 2), derive_seed(2, 1))
+        self.assertNotEqual(derive_seed(1, 2), derive_seed(1, 2, 0))
+
+    def test_game_plays_given_deal(self):
+        deal = deal_cards(3, 5)
+        game = ClueGame([SampleBot(), SampleBot(), SampleBot()], NullSink(),
+                        deal=deal)
+        self.assertEqual(game.envelope, deal.envelope)
+        self.assertEqual(game.face_up_cards, deal.face_up_cards)
+
+
+class FailingBot(SampleBot):
+    def respond_to_suggestion(self, suggestor_id, suggestion):
+        raise PlayerFailure("gone")
+
+
+class LyingBot(SampleBot):
+    def respond_to_suggestion(self, suggestor_id, suggestion):
+        return next(card for card in self.face_down_cards
+                    if card not in suggestion)
+
+
+class TestPlayerFailure(unittest.TestCase):
+    def test_failed_player_is_answered_for(self):
+        random.seed(4)
+        sink = BufferedSink()
+        game = ClueGame([SampleBot(), FailingBot(), SampleBot()], sink,
+                        seed=4)
+        game.execute()
+        failures = [event for event in sink.events
+                    if isinstance(event, PlayerFailureEvent)]
+        self.assertEqual(failures, [PlayerFailureEvent(
+            1, "respond_to_suggestion", "gone")])
+        blocks = [event for event in sink.events
+                  if isinstance(event, BlockEvent) and event.blocker_id == 1]
+        self.assertTrue(blocks)
+        for block in blocks:
+            self.assertIn(block.card, block.suggestion)
+            self.assertIn(block.card, game.player_infos[1].face_down_cards)
+        self.assertFalse(any(isinstance(event, SuggestionEvent)
+                             and event.suggestor_id == 1
+                             for event in sink.events[sink.events.index(
+                                 failures[0]):]))
+
+    def test_invalid_response_is_a_failure(self):
+        random.seed(5)
+        sink = BufferedSink()
+        game = ClueGame([SampleBot(), LyingBot(), SampleBot()], sink,
+                        seed=5)
+        game.execute()
+        failures = [event for event in sink.events
+                    if isinstance(event, PlayerFailureEvent)]
+        self.assertEqual([(event.player_id, event.method)
+                          for event in failures],
+                         [(1, "respond_to_suggestion")])
+        for event in sink.events:
+            if isinstance(event, BlockEvent) and event.blocker_id == 1:
+                self.assertIn(event.card, event.suggestion)
+
+
+class TestCallTiming(unittest.TestCase):
+    def test_call_stats_quantiles(self):
+        stats = CallStats()
+        for ns in range(1, 1001):
+            stats.record(ns * 1000)
+        self.assertEqual(stats.count, 1000)
+        self.assertEqual(stats.max_ns, 1000000)
+        self.assertAlmostEqual(stats.quantile(0.5), 500e-6, delta=65e-6)
+        self.assertAlmostEqual(stats.quantile(0.99), 990e-6, delta=125e-6)
+        other = CallStats()
+        other.record(5000000)
+        stats.merge(other)
+        self.assertEqual(stats.count, 1001)
+        self.assertEqual(stats.quantile(1.0), 5e-3)
+
+    def test_untimed_game_has_no_stats(self):
+        game = ClueGame([SampleBot(), SampleBot(), SampleBot()], NullSink(),
+                        seed=1)
+        self.assertIsNone(game.execute().call_stats)
+
+    def test_timed_game_records_every_method(self):
+        random.seed(1)
+        game = ClueGame([SampleBot(), SampleBot(), SampleBot()], NullSink(),
+                        seed=1, timing=True)
+        result = game.execute()
+        self.assertEqual(len(result.call_stats), 3)
+        for stats in result.call_stats:
+            self.assertEqual(stats["initialize"].count, 1)
+            self.assertIn("observe_suggestion", stats)
+        self.assertEqual(sum(stats["take_turn"].count
+                             for stats in result.call_stats), result.turns)
+
+    def test_slow_turns_are_forfeited(self):
+        random.seed(1)
+        sink = BufferedSink()
+        game = ClueGame([SlowBot(), SampleBot(), SampleBot()], sink, seed=1,
+                        call_budget=0.001)
+        result = game.execute()
+        self.assertNotEqual(result.winner_id, 0)
+        forfeits = [event for event in sink.events
+                    if isinstance(event, BudgetEvent)
+                    and event.player_id == 0]
+        self.assertTrue(forfeits)
+        self.assertFalse(any(event.eliminated for event in forfeits))
+        self.assertFalse(any(isinstance(event, SuggestionEvent)
+                             and event.suggestor_id == 0
+                             for event in sink.events))
+
+    def test_game_budget_eliminates(self):
+        random.seed(1)
+        sink = BufferedSink()
+        game = ClueGame([SlowBot(), SlowBot(), SlowBot()], sink, seed=1,
+                        game_budget=0.005)
+        result = game.execute()
+        self.assertIsNone(result.winner_id)
+        eliminated = [event.player_id for event in sink.events
+                      if isinstance(event, BudgetEvent)]
+        self.assertEqual(sorted(eliminated), [0, 1, 2])
+
+
+class ResettingBot(SampleBot):
+    def __init__(self):
+        super().__init__()
+        self.initializations = 0
+        self.resets = 0
+
+    def initialize(self, *args):
+        self.initializations += 1
+        super().initialize(*args)
+
+    def reset(self, *args):
+        self.resets += 1
+        super().initialize(*args)
+
+
+class TestReset(unittest.TestCase):
+    def test_reset_deals_like_a_new_game(self):
+        game = ClueGame([SampleBot(), SampleBot(), SampleBot(), SampleBot()],
+                        NullSink(), seed=0)
+        for seed in range(5):
+            game.reset(seed)
+            expected = deal_cards(4, seed)
+            self.assertEqual(game.envelope, expected.envelope)
+            self.assertEqual(game.face_up_cards, expected.face_up_cards)
+            self.assertEqual([info.face_down_cards
+                              for info in game.player_infos],
+                             expected.hands)
+
+    def test_reset_plays_like_a_new_game(self):
+        game = ClueGame([SampleBot() for _ in range(4)], NullSink())
+        for seed in range(10):
+            random.seed(seed)
+            expected = ClueGame([SampleBot() for _ in range(4)], NullSink(),
+                                seed=seed).execute()
+            random.seed(seed)
+            game.reset(seed)
+            self.assertEqual(game.execute(), expected)
+
+    def test_results_survive_reset(self):
+        game = ClueGame([SampleBot() for _ in range(3)], NullSink(),
+                        timing=True)
+        results = []
+        for seed in range(10):
+            random.seed(seed)
+            game.reset(seed)
+            results.append(game.execute())
+        eliminations = [list(result.eliminations) for result in results]
+        game.reset(0)
+        game.execute()
+        self.assertEqual([result.eliminations for result in results],
+                         eliminations)
+        self.assertEqual(results[0].call_stats[0]["reset"].count, 1)
+
+    def test_players_are_reset(self):
+        players = [ResettingBot() for _ in range(3)]
+        game = ClueGame(players, NullSink(), seed=1)
+        game.reset(2)
+        game.reset(deal=deal_cards(3, seed=3))
+        for player in players:
+            self.assertEqual(player.initializations, 1)
+            self.assertEqual(player.resets, 2)
+
+
+class TestScenarioTable(unittest.TestCase):
+    def test_dense_index(self):
+        self.assertEqual(NUM_SCENARIOS, 324)
+        self.assertEqual(len(SUGGESTIONS), NUM_SCENARIOS)
+        for index, suggestion in enumerate(SUGGESTIONS):
+            self.assertEqual(scenario_index(suggestion), index)
+            self.assertEqual(ACCUSATIONS[index], suggestion)
+            self.assertIsInstance(ACCUSATIONS[index], Accusation)
+        self.assertEqual(len(set(SUGGESTIONS)), NUM_SCENARIOS)
+
+    def test_interned(self):
+        suggestion = interned_suggestion(Suspect.MRS_PEACOCK,
+                                         Location.BALLROOM, Weapon.ROPE)
+        self.assertIs(suggestion,
+                      interned_suggestion(Suspect.MRS_PEACOCK,
+                                          Location.BALLROOM, Weapon.ROPE))
+        self.assertEqual(suggestion, Suggestion(Suspect.MRS_PEACOCK,
+                                                Location.BALLROOM,
+                                                Weapon.ROPE))
+        self.assertIs(interned_accusation(*suggestion),
+                      ACCUSATIONS[scenario_index(suggestion)])
+
+    def test_cached_string(self):
+        suggestion = Suggestion(Suspect.MRS_PEACOCK, Location.BALLROOM,
+                                Weapon.LEAD_PIPE)
+        self.assertEqual(str(suggestion),
+                         "MRS_PEACOCK in the BALLROOM with the LEAD_PIPE")
+        self.assertEqual(str(ACCUSATIONS[0]),
+                         "COLONEL_MUSTARD in the BALLROOM with the "
+                         "CANDLESTICK")
+
+    def test_sample_bot_returns_interned_scenarios(self):
+        bot = SampleBot()
+        bot.initialize(0, 3, [], [])
+        for _ in range(50):
+            scenario = bot.take_turn()
+            table = (ACCUSATIONS if isinstance(scenario, Accusation)
+                     else SUGGESTIONS)
+            self.assertIs(scenario, table[scenario_index(scenario)])
+
+
+class TestCardSet(unittest.TestCase):
+    def test_set_operations(self):
+        hand = CardSet([Suspect.MRS_WHITE, Location.HALL, Weapon.ROPE])
+        suggestion = CardSet(Suggestion(Suspect.MRS_WHITE,
+                                        Location.STUDY,
+                                        Weapon.ROPE))
+        self.assertEqual(len(hand), 3)
+        self.assertIn(Location.HALL, hand)
+        self.assertNotIn(Location.STUDY, hand)
+        self.assertEqual(list(hand & suggestion),
+                         [Suspect.MRS_WHITE, Weapon.ROPE])
+        self.assertEqual(hand - suggestion, CardSet([Location.HALL]))
+        self.assertEqual(len(hand | suggestion), 4)
+        self.assertTrue(CardSet([Weapon.ROPE]) <= hand)
+        self.assertTrue(hand.isdisjoint(CardSet([Weapon.DAGGER])))
+        self.assertEqual(hand.without_card(Weapon.ROPE).with_card(Weapon.ROPE),
+                         hand)
+        self.assertFalse(CardSet())
+
+    def test_iteration_returns_cards(self):
+        cards = list(CardSet([Weapon.SPANNER, Suspect.COLONEL_MUSTARD]))
+        self.assertEqual(cards, [Suspect.COLONEL_MUSTARD, Weapon.SPANNER])
+        self.assertIsInstance(cards[1], Weapon)
+
+
+class TestRules(unittest.TestCase):
+    def test_generated_cards(self):
+        rules = Rules.generate(8, 10, 7)
+        self.assertIs(Rules.generate(8, 10, 7), rules)
+        self.assertEqual(len(rules.all_cards), 25)
+        self.assertEqual(rules.num_scenarios, 560)
+        self.assertEqual(rules.max_players, 22)
+        self.assertTrue(min(rules.all_cards) > max(CLASSIC_RULES.all_cards))
+        for card in rules.all_cards:
+            self.assertIs(card_from_value(card.value), card)
+        self.assertEqual(list(CardSet(rules.weapons)), rules.weapons)
+        self.assertEqual(rules.category_of(rules.locations[3]), 1)
+
+    def test_pickle(self):
+        rules = Rules.generate(4, 5, 4)
+        Rules.generate(3, 3, 3)
+        self.assertIs(pickle.loads(pickle.dumps(rules)), rules)
+        self.assertIs(pickle.loads(pickle.dumps(CLASSIC_RULES)),
+                      CLASSIC_RULES)
+        deal = deal_cards(5, 1, rules)
+        self.assertEqual(pickle.loads(pickle.dumps(deal)), deal)
+        # A fresh process decodes the same cards, whatever it generated.
+        output = subprocess.run(
+            [sys.executable, "-c",
+             "import pickle, sys\n"
+             "from clue_game import Rules\n"
+             "Rules.generate(9, 9, 9)\n"
+             "rules, deal = pickle.load(sys.stdin.buffer)\n"
+             "print(rules, deal.envelope)"],
+            input=pickle.dumps((rules, deal)), capture_output=True,
+            check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+        self.assertEqual(output.stdout.decode().strip(),
+                         str(rules) + " " + str(deal.envelope))
+
+    def test_deal(self):
+        rules = Rules.generate(5, 7, 5)
+        deal = deal_cards(10, 3, rules)
+        self.assertEqual(len(deal.face_up_cards), 4)
+        self.assertEqual({len(hand) for hand in deal.hands}, {1})
+        cards = (list(deal.envelope) + deal.face_up_cards +
+                 [card for hand in deal.hands for card in hand])
+        self.assertEqual(sorted(cards), rules.all_cards)
+
+    def test_classic_rules_are_the_default(self):
+        self.assertEqual(deal_cards(4, 9), deal_cards(4, 9, CLASSIC_RULES))
+
+    def test_many_players(self):
+        rules = Rules.generate(10, 15, 10)
+        random.seed(0)
+        sink = BufferedSink()
+        result = ClueGame([DeductionBot() for _ in range(12)], sink, seed=0,
+                          rules=rules).execute()
+        self.assertIsNotNone(result.winner_id)
+        self.assertEqual(sink.events[0].envelope,
+                         sink.events[-2].accusation)
+        self.assertIn("SUSPECT_", str(sink.events[0].envelope))
+
+    def test_round_limit_is_the_scenario_count(self):
+        rules = Rules.generate(2, 2, 2, max_players=3)
+        sink = BufferedSink()
+
+        class Suggester(SampleBot):
+            def take_turn(self):
+                return Suggestion(*(category[0]
+                                    for category in self.rules.categories))
+
+        result = ClueGame([Suggester() for _ in range(3)], sink, seed=0,
+                          rules=rules).execute()
+        self.assertIsNone(result.winner_id)
+        self.assertEqual(result.rounds, 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,445 @@
+"""Module conformance_fuzzer checks that a PlayerInterface implementation
+keeps the contracts of the PlayerInterface docstrings, by driving it with
+many random, legal call sequences before it meets other bots in a
+tournament.
+
+A case is a real deal, the seat of the tested bot, and a list of turns.
+The turns of the other players are generated up front: suggestions whose
+cards are drawn from the envelope, from the hands or at random, so that
+every blocker pattern occurs, and wrong accusations.  The turns of the
+tested bot call take_turn(), and the case continues from its answer.
+Blocks are computed from the deal, so every call is one that ClueGame
+could make.  The checks are:
+
+    - No call raises.
+    - name() returns a str.
+    - take_turn() returns a Suggestion or an Accusation of a Suspect, a
+      Location and a Weapon.
+    - respond_to_suggestion() returns a card that is in both the hand and
+      the suggestion.
+
+A failing case is shrunk by delta debugging over its turns, to a case that
+still fails the same check, but with no turn that can be removed.  Replay
+it with run_case().
+
+Eg. `python conformance_fuzzer.py my_bot:MyBot 100000` fuzzes MyBot on
+every core.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+from typing import Callable, Iterator, NamedTuple, Optional, Union
+import os
+import random
+
+from clue_game import (CLASSIC_RULES, Accusation, Card, Counterevidence,
+                       Deal, Location, PlayerInterface, Suggestion, Suspect,
+                       Weapon, deal_cards, derive_seed)
+
+PlayerFactory = Callable[[], PlayerInterface]
+
+
+class Turn(NamedTuple):
+    """One turn of a case.
+
+    Members:
+    player_id: The player taking the turn.
+    scenario: The Suggestion or Accusation of another player, or None for
+    a turn of the tested bot.
+    """
+    player_id: int
+    scenario: Union[Suggestion, Accusation, None]
+
+
+class Case(NamedTuple):
+    """A call sequence for the tested bot.
+
+    Members:
+    seed: Deals the cards with deal_cards(num_players, seed), and seeds the
+    global random module before the bot is created.
+    num_players: The number of players.
+    player_id: The seat of the tested bot.
+    turns: The turns, in order.
+    """
+    seed: int
+    num_players: int
+    player_id: int
+    turns: list[Turn]
+
+
+class Violation(NamedTuple):
+    """A broken contract.
+
+    Members:
+    turn_index: The turn of the call, or -1 before the first turn.
+    method: The PlayerInterface method that was called.
+    kind: "raised" if the call raised, or "returned" if it returned an
+    illegal value.
+    message: What went wrong.
+    """
+    turn_index: int
+    method: str
+    kind: str
+    message: str
+
+
+class FuzzFailure(NamedTuple):
+    """A failing case, after shrinking.
+
+    Members:
+    case: The shrunk case.
+    violation: The violation of the shrunk case.
+    original_turns: The number of turns of the case before shrinking.
+    """
+    case: Case
+    violation: Violation
+    original_turns: int
+
+
+class _Failed(Exception):
+    def __init__(self, violation: Violation) -> None:
+        self.violation = violation
+
+
+###############################################################################
+# Cases
+###############################################################################
+
+
+def _random_card(rng: Random, category: type, deal: Deal) -> Card:
+    """Returns a card of category, from the envelope, from a hand, or
+    uniformly at random.
+    """
+    source = rng.randrange(3)
+    if source == 0:
+        return next(card for card in deal.envelope
+                    if isinstance(card, category))
+    if source == 1:
+        hand = [card for card in rng.choice(deal.hands)
+                if isinstance(card, category)]
+        if hand:
+            return rng.choice(hand)
+    return rng.choice(list(category))
+
+
+def generate_case(seed: int, max_turns: int = 60) -> Case:
+    """Returns a random legal case.  The same seed returns the same case.
+    """
+    rng = Random(seed)
+    num_players = rng.randint(3, 6)
+    player_id = rng.randrange(num_players)
+    deal = deal_cards(num_players, seed)
+    eliminated = set()
+    turns = []
+    for turn_index in range(rng.randint(1, max_turns)):
+        actor_id = turn_index % num_players
+        if actor_id in eliminated:
+            continue
+        if actor_id == player_id:
+            turns.append(Turn(actor_id, None))
+            continue
+        who, where, what = (_random_card(rng, category, deal)
+                            for category in (Suspect, Location, Weapon))
+        if rng.randrange(30) == 0:
+            if (who, where, what) == tuple(deal.envelope):
+                continue
+            eliminated.add(actor_id)
+            turns.append(Turn(actor_id, Accusation(who, where, what)))
+        else:
+            turns.append(Turn(actor_id, Suggestion(who, where, what)))
+    return Case(seed, num_players, player_id, turns)
+
+
+def _block(deal: Deal,
+           suggestor_id: int,
+           suggestion: Suggestion) -> Optional[int]:
+    """Returns the player that blocks suggestion, or None."""
+    num_players = len(deal.hands)
+    for i in range(1, num_players):
+        blocker_id = (suggestor_id + i) % num_players
+        if any(card in suggestion for card in deal.hands[blocker_id]):
+            return blocker_id
+    return None
+
+
+def run_case(make_player: PlayerFactory, case: Case) -> Optional[Violation]:
+    """Plays case with a new player from make_player.
+
+    Returns:
+    The first violation, or None if every contract was kept.
+    """
+    random.seed(case.seed)
+    deal = deal_cards(case.num_players, case.seed)
+    player_id = case.player_id
+    hand = deal.hands[player_id]
+    turn_index = -1
+
+    def call(method: str, *args):
+        try:
+            if method == "__init__":
+                return make_player()
+            return getattr(player, method)(*args)
+        except Exception as exception:
+            raise _Failed(Violation(turn_index, method, "raised",
+                                    type(exception).__name__ + ": " +
+                                    str(exception)))
+
+    def illegal(method: str, message: str) -> _Failed:
+        return _Failed(Violation(turn_index, method, "returned", message))
+
+    try:
+        player = call("__init__")
+        call("receive_rules", CLASSIC_RULES)
+        call("initialize", player_id, case.num_players,
+             list(deal.face_up_cards), list(hand))
+        name = call("name")
+        if not isinstance(name, str):
+            raise illegal("name", "returned " + repr(name))
+        can_take_turns = True
+        for turn_index, turn in enumerate(case.turns):
+            scenario = turn.scenario
+            if scenario is None:
+                if not can_take_turns:
+                    continue
+                scenario = call("take_turn")
+                if (not isinstance(scenario, (Suggestion, Accusation))
+                        or not isinstance(scenario.who, Suspect)
+                        or not isinstance(scenario.where, Location)
+                        or not isinstance(scenario.what, Weapon)):
+                    raise illegal("take_turn", "returned " + repr(scenario))
+                if isinstance(scenario, Accusation):
+                    if tuple(scenario) == tuple(deal.envelope):
+                        return None
+                    can_take_turns = False
+            if isinstance(scenario, Accusation):
+                call("observe_accusation", turn.player_id, scenario)
+                continue
+            blocker_id = _block(deal, turn.player_id, scenario)
+            if blocker_id == player_id:
+                card = call("respond_to_suggestion", turn.player_id,
+                            scenario)
+                if card not in hand or card not in scenario:
+                    raise illegal("respond_to_suggestion",
+                                  "showed " + repr(card) + " for " +
+                                  repr(scenario) + " from hand " +
+                                  repr(hand))
+            if turn.player_id == player_id:
+                result = None
+                if blocker_id is not None:
+                    card = next(card for card in deal.hands[blocker_id]
+                                if card in scenario)
+                    result = Counterevidence(blocker_id, card)
+                call("receive_suggestion_result", scenario, result)
+            call("observe_suggestion", turn.player_id, scenario,
+                 blocker_id)
+    except _Failed as failed:
+        return failed.violation
+    return None
+
+
+###############################################################################
+# Shrinking
+###############################################################################
+
+
+def shrink(make_player: PlayerFactory,
+           case: Case,
+           violation: Violation) -> tuple[Case, Violation]:
+    """Removes turns from a failing case while it still fails with the
+    same kind of violation of the same method (ddmin).
+
+    Returns:
+    The shrunk case, and its violation.
+    """
+    def failure(turns: list[Turn]) -> Optional[Violation]:
+        found = run_case(make_player, case._replace(turns=turns))
+        if (found is not None and found.method == violation.method
+                and found.kind == violation.kind):
+            return found
+        return None
+
+    # Turns after the violation cannot matter.
+    turns = case.turns[:violation.turn_index + 1]
+    found = failure([])
+    if found is not None:
+        return case._replace(turns=[]), found
+    granularity = 2
+    while len(turns) >= 2:
+        size = -(-len(turns) // granularity)
+        subsets = [turns[start:start + size]
+                   for start in range(0, len(turns), size)]
+        reduced = False
+        for subset in subsets:
+            found = failure(subset)
+            if found is not None:
+                turns, violation = subset, found
+                granularity = 2
+                reduced = True
+                break
+        if not reduced:
+            for index in range(len(subsets)):
+                complement = [turn for other, subset in enumerate(subsets)
+                              if other != index for turn in subset]
+                found = failure(complement)
+                if found is not None:
+                    turns, violation = complement, found
+                    granularity = max(granularity - 1, 2)
+                    reduced = True
+                    break
+        if not reduced:
+            if granularity >= len(turns):
+                break
+            granularity = min(granularity * 2, len(turns))
+    case = case._replace(turns=turns)
+    return case, run_case(make_player, case) or violation
+
+
+###############################################################################
+# Fuzzing
+###############################################################################
+
+
+class FuzzResult():
+    """The results of fuzz().  Results of separate chunks can be combined
+    with merge().
+
+    Members:
+    seed: The base seed.  Case i is generate_case(derive_seed(seed, i)).
+    cases: The number of cases run.
+    failing_cases: The number of cases that failed.
+    failures: One shrunk failure per method and kind of violation.
+    """
+
+    def __init__(self, seed: int) -> None:
+        self.seed = seed
+        self.cases = 0
+        self.failing_cases = 0
+        self.failures: list[FuzzFailure] = []
+
+    def add_failure(self, failure: FuzzFailure) -> bool:
+        """Keeps failure unless one of the same method and kind is kept.
+
+        Returns:
+        Whether failure was kept.
+        """
+        key = (failure.violation.method, failure.violation.kind)
+        if any((kept.violation.method, kept.violation.kind) == key
+               for kept in self.failures):
+            return False
+        self.failures.append(failure)
+        return True
+
+    def merge(self, other: 'FuzzResult') -> None:
+        """Adds the results of other into self."""
+        assert other.seed == self.seed
+        self.cases += other.cases
+        self.failing_cases += other.failing_cases
+        for failure in other.failures:
+            self.add_failure(failure)
+
+    def report(self) -> str:
+        """Returns a human readable summary, with each shrunk case."""
+        lines = [str(self.cases) + " cases, " + str(self.failing_cases) +
+                 " failed (seed " + str(self.seed) + ")."]
+        for failure in self.failures:
+            violation = failure.violation
+            case = failure.case
+            lines.append(violation.method + " " + violation.kind + ": " +
+                         violation.message)
+            lines.append("   seed " + str(case.seed) + ", " +
+                         str(case.num_players) + " players, seat " +
+                         str(case.player_id) + ", " + str(len(case.turns)) +
+                         " of " + str(failure.original_turns) + " turns:")
+            for turn in case.turns:
+                lines.append("      " + str(turn.player_id) + ": " +
+                             ("take_turn()" if turn.scenario is None
+                              else type(turn.scenario).__name__ + " " +
+                              str(turn.scenario)))
+        return "\n".join(lines)
+
+
+def _fuzz_cases(make_player: PlayerFactory,
+                seed: int,
+                case_indices: range,
+                max_turns: int) -> FuzzResult:
+    """Runs and shrinks a chunk of the cases of fuzz().
+    Runs inside of a worker process.
+    """
+    result = FuzzResult(seed)
+    for case_index in case_indices:
+        case = generate_case(derive_seed(seed, case_index), max_turns)
+        violation = run_case(make_player, case)
+        result.cases += 1
+        if violation is None:
+            continue
+        result.failing_cases += 1
+        key = (violation.method, violation.kind)
+        if any((kept.violation.method, kept.violation.kind) == key
+               for kept in result.failures):
+            continue
+        shrunk, shrunk_violation = shrink(make_player, case, violation)
+        result.add_failure(FuzzFailure(shrunk, shrunk_violation,
+                                       len(case.turns)))
+    return result
+
+
+def _chunks(num_cases: int, chunk_size: int) -> Iterator[range]:
+    for start in range(0, num_cases, chunk_size):
+        yield range(start, min(start + chunk_size, num_cases))
+
+
+def fuzz(make_player: PlayerFactory,
+         num_cases: int,
+         seed: Optional[int] = None,
+         max_workers: Optional[int] = None,
+         chunk_size: Optional[int] = None,
+         max_turns: int = 60) -> FuzzResult:
+    """Runs num_cases random cases, and shrinks the first failure of each
+    method and kind of violation.
+
+    Preconditions:
+    make_player: Must be picklable, eg. a class, if max_workers > 1.
+
+    Parameters:
+    make_player: Creates the bot under test.
+    num_cases: The number of cases to run.
+    seed: The base seed.  Defaults to a random seed, which is recorded in
+    the result.
+    max_workers: The number of worker processes.  Defaults to the number of
+    cores.  With 1 worker, cases are run in the current process.
+    chunk_size: The number of cases per task.  Defaults to splitting the
+    cases into 4 chunks per worker, of at most 10000 cases.
+    max_turns: The most turns of a case.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = min(max(1, -(-num_cases // (max_workers * 4))), 10000)
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    result = FuzzResult(seed)
+    if max_workers == 1:
+        for chunk in _chunks(num_cases, chunk_size):
+            result.merge(_fuzz_cases(make_player, seed, chunk, max_turns))
+        return result
+    with ProcessPoolExecutor(max_workers) as executor:
+        for chunk_result in executor.map(
+                _fuzz_cases, *zip(*((make_player, seed, chunk, max_turns)
+                                    for chunk in _chunks(num_cases,
+                                                         chunk_size)))):
+            result.merge(chunk_result)
+    return result
+
+
+def main():
+    import importlib
+    import sys
+    module_name, class_name = sys.argv[1].split(":")
+    make_player = getattr(importlib.import_module(module_name), class_name)
+    num_cases = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    result = fuzz(make_player, num_cases)
+    print(result.report())
+    sys.exit(1 if result.failures else 0)
+
+
+if __name__ == "__main__":
+    main()
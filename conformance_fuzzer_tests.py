@@ -0,0 +1,81 @@
+import unittest
+from clue_game import Accusation
+from conformance_fuzzer import Case, Turn, fuzz, generate_case, run_case
+from deduction_bot import DeductionBot
+from sample_bot import SampleBot
+
+
+class WrongCardBot(SampleBot):
+    def respond_to_suggestion(self, suggestor_id, suggestion):
+        return self.face_down_cards[0]
+
+
+class CrashingBot(SampleBot):
+    def observe_accusation(self, accusor_id, accusation):
+        raise ValueError("unexpected accusation")
+
+
+class NoneBot(SampleBot):
+    def take_turn(self):
+        return None
+
+
+class TestConformanceFuzzer(unittest.TestCase):
+    def test_conforming_bots_pass(self):
+        for bot in (SampleBot, DeductionBot):
+            result = fuzz(bot, 200, seed=1, max_workers=1)
+            self.assertEqual(result.cases, 200)
+            self.assertEqual(result.failures, [], result.report())
+
+    def test_generated_cases_are_legal(self):
+        for seed in range(200):
+            case = generate_case(seed)
+            self.assertEqual(case, generate_case(seed))
+            self.assertTrue(3 <= case.num_players <= 6)
+            accused = set()
+            for turn in case.turns:
+                self.assertNotIn(turn.player_id, accused)
+                self.assertEqual(turn.scenario is None,
+                                 turn.player_id == case.player_id)
+                if isinstance(turn.scenario, Accusation):
+                    accused.add(turn.player_id)
+
+    def test_illegal_response_is_shrunk(self):
+        result = fuzz(WrongCardBot, 100, seed=2, max_workers=1)
+        self.assertGreater(result.failing_cases, 0)
+        [failure] = result.failures
+        self.assertEqual((failure.violation.method, failure.violation.kind),
+                         ("respond_to_suggestion", "returned"))
+        # No turn but the suggestion that is answered is needed.
+        self.assertEqual(len(failure.case.turns), 1)
+        self.assertLessEqual(len(failure.case.turns),
+                             failure.original_turns)
+        self.assertEqual(run_case(WrongCardBot, failure.case),
+                         failure.violation)
+        self.assertIn("respond_to_suggestion returned", result.report())
+
+    def test_exception_is_a_violation(self):
+        result = fuzz(CrashingBot, 100, seed=3, max_workers=1)
+        [failure] = result.failures
+        self.assertEqual((failure.violation.method, failure.violation.kind),
+                         ("observe_accusation", "raised"))
+        self.assertIn("ValueError", failure.violation.message)
+        self.assertIsInstance(failure.case.turns[-1].scenario, Accusation)
+
+    def test_illegal_turn_is_a_violation(self):
+        case = Case(4, 3, 0, [Turn(0, None)])
+        violation = run_case(NoneBot, case)
+        self.assertEqual((violation.turn_index, violation.method,
+                          violation.kind), (0, "take_turn", "returned"))
+        self.assertIsNone(run_case(SampleBot, case))
+
+    def test_results_do_not_depend_on_workers(self):
+        serial = fuzz(WrongCardBot, 60, seed=6, max_workers=1, chunk_size=7)
+        parallel = fuzz(WrongCardBot, 60, seed=6, max_workers=2,
+                        chunk_size=7)
+        self.assertEqual(serial.failing_cases, parallel.failing_cases)
+        self.assertEqual(serial.failures, parallel.failures)
+
+
+if __name__ == '__main__':
+    unittest.main()
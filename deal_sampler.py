@@ -0,0 +1,187 @@
+"""Module deal_sampler draws full deals of the cards (hands and envelope)
+uniformly at random from the deals that are consistent with what a
+DeductionEngine knows.
+
+Samples are drawn card by card, weighting each owner by the number of
+consistent ways to deal the remaining cards (see posterior.DealModel), so
+no sample is ever rejected for breaking a blocker clause or a hand size.
+Between turns, samples that are still consistent with the new knowledge
+are reused, and only the shortfall is drawn fresh.
+"""
+from typing import Optional
+import random
+
+from clue_game import (Card, CardSet, Counterevidence, Deal, Scenario, Seed,
+                       Suggestion, card_mask, make_rng)
+from deduction import DeductionEngine
+from posterior import DealModel, deal_model
+
+# The owner of face up cards in a sample.
+FACE_UP = -1
+
+
+def is_consistent(engine: DeductionEngine, owners: list[int]) -> bool:
+    """Returns whether a deal is consistent with the knowledge of engine.
+
+    Parameters:
+    owners: The owner id of every card, indexed by Card.value.  The
+    envelope is engine.envelope_id, face up cards are FACE_UP.
+    """
+    held = [0] * (engine.num_players + 1)
+    for card in engine.rules.all_cards:
+        owner_id = owners[card]
+        if owner_id != FACE_UP:
+            held[owner_id] |= 1 << card
+    for owner_id, cards in enumerate(held):
+        if cards & ~engine.possible[owner_id]:
+            return False
+        if engine.known[owner_id] & ~cards:
+            return False
+    for clause in engine.clauses:
+        if not held[clause.player_id] & clause.mask:
+            return False
+    envelope = held[engine.envelope_id]
+    return all(card_mask(accusation) != envelope
+               for accusation in engine.wrong_accusations)
+
+
+class DealSampler():
+    """Draws consistent deals for the current knowledge of a
+    DeductionEngine.  The sampler follows the engine as it receives events.
+    """
+
+    def __init__(self, engine: DeductionEngine, seed: Seed = None) -> None:
+        """Constructs the DealSampler.
+
+        Parameters:
+        engine: The knowledge to sample deals for.
+        seed: See clue_game.make_rng().
+        """
+        self.engine = engine
+        self.rng = make_rng(seed)
+        self.__version: Optional[int] = None
+        self.__initializations: Optional[int] = None
+        self.__model: Optional[DealModel] = None
+        self.__base: list[int] = []
+        self.__wrong_envelopes: set[int] = set()
+        self.__pool: list[list[int]] = []
+        self.__num_values = max(engine.rules.all_cards) + 1
+
+    def __update(self) -> None:
+        """Catches up with the engine, if it learnt something new or
+        started a new game.
+        """
+        engine = self.engine
+        if self.__version == engine.version:
+            return
+        self.__version = engine.version
+        if self.__initializations != engine.initializations:
+            # Deals of the previous game may not even have the same owners.
+            self.__initializations = engine.initializations
+            self.__pool = []
+        self.__model = deal_model(engine)
+        assert self.__model.total > 0, \
+            "inconsistent observations: no possible deal"
+        base = [FACE_UP] * self.__num_values
+        for owner_id, known in enumerate(engine.known):
+            for card in CardSet.from_mask(known):
+                base[card] = owner_id
+        self.__base = base
+        self.__wrong_envelopes = {card_mask(accusation) for accusation
+                                  in engine.wrong_accusations}
+        self.__pool = [owners for owners in self.__pool
+                       if is_consistent(engine, owners)]
+
+    def __draw(self) -> list[int]:
+        model = self.__model
+        envelope_id = self.engine.envelope_id
+        while True:
+            owners = self.__base.copy()
+            for card, owner_id in zip(model.cards, model.sample(self.rng)):
+                owners[card] = owner_id
+            if not self.__wrong_envelopes:
+                return owners
+            envelope = 0
+            for card in self.engine.rules.all_cards:
+                if owners[card] == envelope_id:
+                    envelope |= 1 << card
+            if envelope not in self.__wrong_envelopes:
+                return owners
+
+    def sample_owners(self) -> list[int]:
+        """Returns one fresh consistent deal, as the owner id of every card
+        indexed by Card.value.  The envelope is engine.envelope_id, face up
+        cards are FACE_UP.
+        """
+        self.__update()
+        return self.__draw()
+
+    def draw(self, count: int) -> list[list[int]]:
+        """Returns count consistent deals, in the format of sample_owners().
+        Deals returned by the previous call that are still consistent are
+        returned again, and the rest are drawn fresh.  Every deal is
+        uniformly distributed over the consistent deals.
+        """
+        self.__update()
+        samples = self.__pool[:count]
+        while len(samples) < count:
+            samples.append(self.__draw())
+        self.__pool = samples
+        return samples
+
+    def sample(self) -> Deal:
+        """Returns one fresh consistent deal."""
+        return owners_to_deal(self.engine, self.sample_owners())
+
+
+def owners_to_deal(engine: DeductionEngine, owners: list[int]) -> Deal:
+    """Converts a deal in the format of DealSampler.sample_owners() into a
+    clue_game.Deal.
+    """
+    hands: list[list[Card]] = [[] for _ in range(engine.num_players)]
+    envelope: list[Card] = []
+    face_up_cards: list[Card] = []
+    for card in engine.rules.all_cards:
+        owner_id = owners[card]
+        if owner_id == FACE_UP:
+            face_up_cards.append(card)
+        elif owner_id == engine.envelope_id:
+            envelope.append(card)
+        else:
+            hands[owner_id].append(card)
+    return Deal(Scenario(*envelope), face_up_cards, hands)
+
+
+def observe_random_suggestions(engine: DeductionEngine,
+                               hands: list[set],
+                               count: int,
+                               rng: random.Random) -> None:
+    """Feeds engine count random suggestions, resolved against hands, to
+    bring it to a later stage of a game for tests and benchmarks.
+
+    Preconditions:
+    engine: engine.initialize() has been called with hands[player_id].
+
+    Parameters:
+    hands: The hand of each player of the game.
+    count: The number of suggestions.  The players take turns in order.
+    rng: Picks the suggestions.
+    """
+    num_players = len(hands)
+    for turn in range(count):
+        suggestor_id = turn % num_players
+        suggestion = Suggestion(*(rng.choice(category)
+                                  for category in engine.rules.categories))
+        blocker_id = None
+        for i in range(1, num_players):
+            if hands[(suggestor_id + i) % num_players] & set(suggestion):
+                blocker_id = (suggestor_id + i) % num_players
+                break
+        if suggestor_id == engine.player_id:
+            result = None
+            if blocker_id is not None:
+                shown = [card for card in suggestion
+                         if card in hands[blocker_id]][0]
+                result = Counterevidence(blocker_id, shown)
+            engine.receive_suggestion_result(suggestion, result)
+        engine.observe_suggestion(suggestor_id, suggestion, blocker_id)
@@ -0,0 +1,90 @@
+import random
+import unittest
+from collections import Counter
+from clue_game import ALL_CARDS, Accusation, Rules, deal_cards
+from deal_sampler import (DealSampler, is_consistent,
+                          observe_random_suggestions, owners_to_deal)
+from deduction import DeductionEngine
+from posterior import PosteriorResult
+
+
+class TestDealSampler(unittest.TestCase):
+    def setUp(self):
+        deal = deal_cards(4, 8)
+        self.deal = deal
+        self.engine = DeductionEngine()
+        self.engine.initialize(0, 4, deal.face_up_cards, deal.hands[0])
+        observe_random_suggestions(self.engine,
+                                   [set(hand) for hand in deal.hands], 8,
+                                   random.Random(2))
+
+    def test_samples_are_consistent(self):
+        sampler = DealSampler(self.engine, 1)
+        for owners in sampler.draw(200):
+            self.assertTrue(is_consistent(self.engine, owners))
+        deal = sampler.sample()
+        self.assertEqual(set(deal.hands[0]), set(self.deal.hands[0]))
+        self.assertEqual(set(deal.face_up_cards),
+                         set(self.deal.face_up_cards))
+
+    def test_samples_are_uniform(self):
+        sampler = DealSampler(self.engine, 2)
+        num_samples = 4000
+        envelope = self.engine.envelope_id
+        counts = Counter()
+        for owners in sampler.draw(num_samples):
+            for card in ALL_CARDS:
+                counts[card, owners[card]] += 1
+        exact = PosteriorResult(self.engine).cards
+        for card in ALL_CARDS:
+            for owner in range(envelope + 1):
+                # Well within 5 standard deviations of a binomial.
+                p = exact[card][owner]
+                tolerance = 5 * (p * (1 - p) / num_samples) ** 0.5 + 1e-9
+                self.assertAlmostEqual(counts[card, owner] / num_samples, p,
+                                       delta=tolerance)
+
+    def test_draw_reuses_consistent_samples(self):
+        sampler = DealSampler(self.engine, 3)
+        first = sampler.draw(50)
+        self.assertEqual(sampler.draw(50), first)
+        wrong = owners_to_deal(self.engine, first[0]).envelope
+        self.engine.observe_accusation(2, Accusation(*wrong))
+        second = sampler.draw(50)
+        self.assertTrue(all(is_consistent(self.engine, owners)
+                            for owners in second))
+        self.assertNotIn(first[0], second)
+
+    def test_reused_engine_is_followed(self):
+        sampler = DealSampler(self.engine, 4)
+        sampler.draw(50)
+        # A new game on the same engine, as after ClueGame.reset().
+        deal = deal_cards(3, 9)
+        self.engine.initialize(1, 3, deal.face_up_cards, deal.hands[1])
+        for owners in sampler.draw(50):
+            self.assertTrue(is_consistent(self.engine, owners))
+            sample = owners_to_deal(self.engine, owners)
+            self.assertEqual(len(sample.hands), 3)
+            self.assertEqual(set(sample.hands[1]), set(deal.hands[1]))
+            self.assertEqual(set(sample.face_up_cards),
+                             set(deal.face_up_cards))
+
+    def test_generated_rules(self):
+        rules = Rules.generate(4, 5, 4)
+        deal = deal_cards(5, 1, rules)
+        engine = DeductionEngine(rules)
+        engine.initialize(2, 5, deal.face_up_cards, deal.hands[2])
+        observe_random_suggestions(engine, [set(hand) for hand in deal.hands],
+                                   10, random.Random(3))
+        for owners in DealSampler(engine, 4).draw(20):
+            self.assertTrue(is_consistent(engine, owners))
+            sample = owners_to_deal(engine, owners)
+            self.assertEqual(sorted(sample.hands[2]), sorted(deal.hands[2]))
+            self.assertEqual(sorted(list(sample.envelope) +
+                                    sample.face_up_cards +
+                                    sum(sample.hands, [])),
+                             rules.all_cards)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,379 @@
+"""Module deduction provides the "DeductionEngine" class, which keeps track
+of what can be deduced about where every card is from the events that a
+PlayerInterface receives.
+
+Knowledge is kept as CardSet style bitmasks (bit `card.value`): for each
+owner (every player, plus the envelope) the cards it might hold, and the
+cards it definitely holds.  Suggestions that were blocked by another
+player add a clause "the blocker holds at least one of these cards".
+Every event only adds facts, so the engine propagates from its current
+state instead of re-solving from scratch.
+
+ClueGame can keep one engine in public mode for the whole table (see
+PlayerInterface.wants_public_knowledge()).  Bots read it, and fork() it
+to add their private cards without repeating the public deduction.
+"""
+from typing import NamedTuple, Optional
+
+from clue_game import (CLASSIC_RULES, Accusation, Card, CardSet,
+                       Counterevidence, Rules, Scenario, Suggestion,
+                       card_mask, interned_accusation)
+
+
+class Clause(NamedTuple):
+    """A player holds at least one of a group of cards.
+
+    Members:
+    player_id: The player that holds the card.
+    mask: The cards, as a CardSet bitmask.
+    """
+    player_id: int
+    mask: int
+
+
+class DeductionEngine():
+    """Incrementally deduces where the cards are.  Feed it the same calls
+    that a PlayerInterface receives, and query it at any time.
+
+    Owners are numbered like players, and the envelope is the owner with id
+    `envelope_id` (== num_players).
+
+    Members:
+    rules: The cards of the game.
+    num_players: The number of players in the game.
+    player_id: The player whose private information is known, or None if
+    the engine only tracks public information.
+    envelope_id: The owner id used for the envelope.
+    hand_sizes: The number of facedown cards of each owner.  The envelope
+    holds 3.
+    face_up_cards: The face up cards as a bitmask.  They have no owner.
+    possible: For each owner, a bitmask of the cards it might hold.
+    known: For each owner, a bitmask of the cards it definitely holds.
+    clauses: Blocked suggestions that are not yet resolved.
+    wrong_accusations: The scenarios that are known to be wrong.
+    version: Increases whenever the knowledge changes, including when a new
+    game is initialized, so it never repeats.  Useful as a cache key.
+    initializations: The number of calls to initialize(), so that caches
+    can tell a new game from new knowledge.
+
+    Forks share their lists with the engine they were forked from until
+    either of them receives an event, so the lists must be treated as
+    read-only outside of the engine.
+    """
+
+    def __init__(self, rules: Rules = CLASSIC_RULES) -> None:
+        """Constructor is essentially a no-op.
+        Initialization is delayed to the self.initialize() method.
+
+        Parameters:
+        rules: The cards of the games to track.
+        """
+        self.rules: Rules = rules
+        self.num_players: int = 0
+        self.player_id: Optional[int] = None
+        self.envelope_id: int = 0
+        self.hand_sizes: list[int] = []
+        self.face_up_cards: int = 0
+        self.possible: list[int] = []
+        self.known: list[int] = []
+        self.clauses: list[Clause] = []
+        self.wrong_accusations: list[Scenario] = []
+        self.version: int = 0
+        self.initializations: int = 0
+        # Whether the lists are shared with a fork.
+        self.__shared: bool = False
+
+    def initialize(self,
+                   player_id: Optional[int],
+                   num_players: int,
+                   face_up_cards: list[Card],
+                   face_down_cards: list[Card]) -> None:
+        """Starts tracking a new game.  Has the same parameters as
+        PlayerInterface.initialize().  If player_id is None, only public
+        information is tracked and face_down_cards must be empty.
+        """
+        self.num_players = num_players
+        self.player_id = player_id
+        self.envelope_id = num_players
+        self.face_up_cards = card_mask(face_up_cards)
+        unknown = self.rules.all_cards_mask & ~self.face_up_cards
+        cards_per_player = (unknown.bit_count() - 3) // num_players
+        self.hand_sizes = [cards_per_player] * num_players + [3]
+        self.possible = [unknown] * (num_players + 1)
+        self.known = [0] * (num_players + 1)
+        self.clauses = []
+        self.wrong_accusations = []
+        # Never restart the version: caches of the previous game would match.
+        self.version += 1
+        self.initializations += 1
+        self.__shared = False
+        if player_id is not None:
+            hand = card_mask(face_down_cards)
+            self.hand_sizes[player_id] = len(face_down_cards)
+            self.known[player_id] = hand
+            self.possible[player_id] = hand
+        else:
+            assert len(face_down_cards) == 0
+        self.__propagate()
+
+    def fork(self,
+             player_id: Optional[int] = None,
+             face_down_cards: list[Card] = ()) -> 'DeductionEngine':
+        """Returns a copy of self that is updated independently.  The copy
+        is cheap: the two engines share their lists until either of them
+        changes.
+
+        Preconditions:
+        player_id: None, or self.player_id is None.
+
+        Parameters:
+        player_id: Adds the private information of this player to the copy.
+        face_down_cards: The cards of player_id.
+        """
+        engine = DeductionEngine(self.rules)
+        engine.num_players = self.num_players
+        engine.envelope_id = self.envelope_id
+        engine.face_up_cards = self.face_up_cards
+        engine.player_id = self.player_id
+        engine.hand_sizes = self.hand_sizes
+        engine.possible = self.possible
+        engine.known = self.known
+        engine.clauses = self.clauses
+        engine.wrong_accusations = self.wrong_accusations
+        engine.version = self.version
+        engine.initializations = self.initializations
+        self.__shared = engine.__shared = True
+        if player_id is not None:
+            assert self.player_id is None
+            engine.__unshare()
+            hand = card_mask(face_down_cards)
+            engine.player_id = player_id
+            engine.hand_sizes[player_id] = len(face_down_cards)
+            engine.__holds(player_id, hand)
+            if engine.possible[player_id] != hand:
+                engine.possible[player_id] = hand
+                engine.version += 1
+            engine.__propagate()
+        return engine
+
+    def __unshare(self) -> None:
+        """Copies the lists that are shared with a fork, before a change."""
+        if self.__shared:
+            self.hand_sizes = list(self.hand_sizes)
+            self.possible = list(self.possible)
+            self.known = list(self.known)
+            self.clauses = list(self.clauses)
+            self.wrong_accusations = list(self.wrong_accusations)
+            self.__shared = False
+
+    ###########################################################################
+    # Events
+    ###########################################################################
+
+    def observe_suggestion(self,
+                           suggestor_id: int,
+                           suggestion: Suggestion,
+                           blocker_id: Optional[int]) -> None:
+        """Same as PlayerInterface.observe_suggestion()"""
+        self.__unshare()
+        mask = card_mask(suggestion)
+        self.__players_between_lack(suggestor_id, blocker_id, mask)
+        if blocker_id is not None and blocker_id != self.player_id:
+            self.clauses.append(Clause(blocker_id, mask))
+            self.version += 1
+        self.__propagate()
+
+    def receive_suggestion_result(self,
+                                  suggestion: Suggestion,
+                                  result: Optional[Counterevidence]) -> None:
+        """Same as PlayerInterface.receive_suggestion_result()
+
+        Preconditions:
+        self: Was initialized with a player_id.
+        """
+        assert self.player_id is not None
+        self.__unshare()
+        mask = card_mask(suggestion)
+        if result is None:
+            self.__players_between_lack(self.player_id, None, mask)
+        else:
+            self.__players_between_lack(self.player_id, result.refuter_id,
+                                        mask)
+            self.__holds(result.refuter_id, 1 << result.evidence)
+        self.__propagate()
+
+    def observe_accusation(self,
+                           accusor_id: int,
+                           accusation: Accusation) -> None:
+        """Same as PlayerInterface.observe_accusation()"""
+        self.__unshare()
+        self.wrong_accusations.append(Scenario(*accusation))
+        self.version += 1
+        self.__propagate()
+
+    def learn_card(self, owner_id: int, card: Card) -> None:
+        """Records that owner_id is known to hold card, eg. from information
+        outside of the PlayerInterface calls.
+        """
+        self.__unshare()
+        self.__holds(owner_id, 1 << card)
+        self.__propagate()
+
+    ###########################################################################
+    # Queries
+    ###########################################################################
+
+    def envelope(self) -> Optional[Accusation]:
+        """Returns the final solution if it has been deduced, else None."""
+        known = self.known[self.envelope_id]
+        if known.bit_count() != 3:
+            return None
+        who, where, what = CardSet.from_mask(known)
+        return interned_accusation(who, where, what)
+
+    def envelope_candidates(self) -> CardSet:
+        """Returns the cards that might be in the envelope."""
+        return CardSet.from_mask(self.possible[self.envelope_id])
+
+    def possible_cards(self, owner_id: int) -> CardSet:
+        """Returns the cards that owner_id might hold."""
+        return CardSet.from_mask(self.possible[owner_id])
+
+    def known_cards(self, owner_id: int) -> CardSet:
+        """Returns the cards that owner_id definitely holds."""
+        return CardSet.from_mask(self.known[owner_id])
+
+    def possible_owners(self, card: Card) -> list[int]:
+        """Returns the owner ids that might hold card.  Empty for face up
+        cards.
+        """
+        bit = 1 << card
+        return [owner_id for owner_id, possible in enumerate(self.possible)
+                if possible & bit]
+
+    def owner(self, card: Card) -> Optional[int]:
+        """Returns the owner id known to hold card, or None."""
+        bit = 1 << card
+        for owner_id, known in enumerate(self.known):
+            if known & bit:
+                return owner_id
+        return None
+
+    ###########################################################################
+    # Propagation
+    ###########################################################################
+
+    def __players_between_lack(self,
+                               suggestor_id: int,
+                               blocker_id: Optional[int],
+                               mask: int) -> None:
+        """Records that no player strictly between suggestor_id and
+        blocker_id (clockwise) holds any card in mask.  If blocker_id is
+        None, that is every player except the suggestor.
+        """
+        for i in range(self.num_players - 1):
+            player_id = (suggestor_id + i + 1) % self.num_players
+            if player_id == blocker_id:
+                break
+            if self.possible[player_id] & mask:
+                self.possible[player_id] &= ~mask
+                self.version += 1
+
+    def __holds(self, owner_id: int, mask: int) -> None:
+        if self.known[owner_id] & mask != mask:
+            assert self.possible[owner_id] & mask == mask
+            self.known[owner_id] |= mask
+            self.version += 1
+
+    def __propagate(self) -> None:
+        """Applies the deduction rules until nothing new can be deduced.
+
+        1. A card held by one owner is not held by any other.
+        2. A card that only one owner might hold is held by that owner.
+        3. An owner that holds as many cards as its hand size holds nothing
+           else, and an owner that might hold exactly as many cards as its
+           hand size holds all of them.
+        4. The envelope holds exactly one card of each category, and not
+           every card of a wrong accusation.
+        5. A clause whose player holds one of its cards is resolved, and a
+           clause with one card left that the player might hold is held.
+        """
+        possible = self.possible
+        known = self.known
+        owners = range(self.num_players + 1)
+        envelope_id = self.envelope_id
+        all_cards_mask = self.rules.all_cards_mask
+        category_masks = self.rules.category_masks
+        start_version = -1
+        while start_version != self.version:
+            start_version = self.version
+
+            # Rule 1 and rule 2, one bit per card in parallel.
+            once = twice = any_known = 0
+            for owner_id in owners:
+                mask = possible[owner_id]
+                twice |= once & mask
+                once |= mask
+                any_known |= known[owner_id]
+            assert once | self.face_up_cards == all_cards_mask, \
+                "inconsistent observations: a card has no possible owner"
+            unique = once & ~twice
+            for owner_id in owners:
+                others_known = any_known & ~known[owner_id]
+                if possible[owner_id] & others_known:
+                    possible[owner_id] &= ~others_known
+                    self.version += 1
+                new_known = unique & possible[owner_id] & ~known[owner_id]
+                if new_known:
+                    known[owner_id] |= new_known
+                    self.version += 1
+
+            # Rule 3
+            for owner_id in owners:
+                size = self.hand_sizes[owner_id]
+                num_known = known[owner_id].bit_count()
+                assert num_known <= size <= possible[owner_id].bit_count(), \
+                    "inconsistent observations: hand size violated"
+                if num_known == size and possible[owner_id] != known[owner_id]:
+                    possible[owner_id] = known[owner_id]
+                    self.version += 1
+                elif (possible[owner_id].bit_count() == size
+                      and possible[owner_id] != known[owner_id]):
+                    known[owner_id] = possible[owner_id]
+                    self.version += 1
+
+            # Rule 4
+            for category in category_masks:
+                in_envelope = known[envelope_id] & category
+                candidates = possible[envelope_id] & category
+                assert candidates, "inconsistent observations: no envelope"
+                if in_envelope and candidates != in_envelope:
+                    possible[envelope_id] &= ~(category & ~in_envelope)
+                    self.version += 1
+                elif not in_envelope and candidates.bit_count() == 1:
+                    known[envelope_id] |= candidates
+                    self.version += 1
+            for accusation in self.wrong_accusations:
+                mask = card_mask(accusation)
+                missing = mask & ~known[envelope_id]
+                if (missing.bit_count() == 1
+                        and possible[envelope_id] & missing):
+                    possible[envelope_id] &= ~missing
+                    self.version += 1
+
+            # Rule 5
+            unresolved = []
+            for clause in self.clauses:
+                player_known = known[clause.player_id]
+                if player_known & clause.mask:
+                    continue
+                remaining = clause.mask & possible[clause.player_id]
+                assert remaining, "inconsistent observations: clause failed"
+                if remaining.bit_count() == 1:
+                    known[clause.player_id] |= remaining
+                    self.version += 1
+                    continue
+                if remaining != clause.mask:
+                    clause = Clause(clause.player_id, remaining)
+                unresolved.append(clause)
+            self.clauses = unresolved
@@ -0,0 +1,122 @@
+"""Module deduction_bot provides the "DeductionBot" class, a reference
+implementation of the clue AI interface built on the DeductionEngine.
+"""
+from random import choice
+from typing import Union, Optional
+from clue_game import *
+from deduction import DeductionEngine
+
+
+class DeductionBot(PlayerInterface):
+    """Accuses as soon as the envelope has been deduced.  Until then, it
+    suggests cards that might still be in the envelope, using its own
+    cards for categories that are already solved.
+
+    With shared_knowledge, the bot does not deduce the public facts itself:
+    it forks the game's public knowledge and adds the cards shown to it.
+    """
+
+    def __init__(self, shared_knowledge: bool = False) -> None:
+        self.player_id = None
+        self.face_down_cards = None
+        self.rules = CLASSIC_RULES
+        self.engine = DeductionEngine()
+        # The cards already shown to each player, as bitmasks.
+        self.shown: dict[int, int] = {}
+        self.shared_knowledge = shared_knowledge
+        self.public: Optional[DeductionEngine] = None
+        # The cards shown to this player, as (refuter_id, card).
+        self.evidence: list[tuple[int, Card]] = []
+        self.__fork_key = None
+
+    def receive_rules(self, rules: Rules) -> None:
+        if rules is not self.rules:
+            self.rules = rules
+            self.engine = DeductionEngine(rules)
+
+    def initialize(self,
+                   player_id: int,
+                   num_players: int,
+                   face_up_cards: list[Card],
+                   face_down_cards: list[Card]) -> None:
+        self.player_id = player_id
+        self.face_down_cards = face_down_cards
+        self.engine.initialize(player_id, num_players, face_up_cards,
+                               face_down_cards)
+        self.shown = {}
+        self.public = None
+        self.evidence = []
+
+    def wants_public_knowledge(self) -> bool:
+        return self.shared_knowledge
+
+    def receive_public_knowledge(self, knowledge: DeductionEngine) -> None:
+        self.public = knowledge
+        self.__fork_key = None
+
+    def name(self) -> str:
+        return "deduction_bot"
+
+    def take_turn(self) -> Union[Suggestion, Accusation]:
+        if self.public is not None:
+            key = (self.public.version, len(self.evidence))
+            if key != self.__fork_key:
+                self.engine = self.public.fork(self.player_id,
+                                               self.face_down_cards)
+                for refuter_id, card in self.evidence:
+                    self.engine.learn_card(refuter_id, card)
+                self.__fork_key = key
+        envelope = self.engine.envelope()
+        if envelope is not None:
+            return envelope
+        candidates = self.engine.envelope_candidates()
+        hand = CardSet(self.face_down_cards)
+        scenario = []
+        for category in self.rules.categories:
+            category_candidates = [card for card in category
+                                   if card in candidates]
+            if len(category_candidates) == 1:
+                # Solved.  Use one of our own cards, so that any block is
+                # about the other categories.
+                own_cards = [card for card in category if card in hand]
+                if own_cards:
+                    category_candidates = own_cards
+            scenario.append(choice(category_candidates))
+        return interned_suggestion(*scenario)
+
+    def respond_to_suggestion(self,
+                              suggestor_id: int,
+                              suggestion: Suggestion) -> Optional[Card]:
+        matches = [card for card in suggestion
+                   if card in self.face_down_cards]
+        if not matches:
+            return None
+        # Prefer a card this player has already seen.
+        shown = self.shown.get(suggestor_id, 0)
+        for card in matches:
+            if shown >> card & 1:
+                return card
+        self.shown[suggestor_id] = shown | 1 << matches[0]
+        return matches[0]
+
+    def receive_suggestion_result(self,
+                                  suggestion: Suggestion,
+                                  result: Optional[Counterevidence]) -> None:
+        if self.public is None:
+            self.engine.receive_suggestion_result(suggestion, result)
+        elif result is not None:
+            self.evidence.append((result.refuter_id, result.evidence))
+
+    def observe_suggestion(self,
+                           suggestor_id: int,
+                           suggestion: Suggestion,
+                           blocker_id: Optional[int]) -> None:
+        if self.public is None:
+            self.engine.observe_suggestion(suggestor_id, suggestion,
+                                           blocker_id)
+
+    def observe_accusation(self,
+                           accusor_id: int,
+                           accusation: Accusation) -> None:
+        if self.public is None:
+            self.engine.observe_accusation(accusor_id, accusation)
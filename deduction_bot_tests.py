@@ -0,0 +1,100 @@
+import random
+import unittest
+from deduction_bot import DeductionBot
+from clue_game import (Accusation, ClueGame, Counterevidence, Location,
+                       NullSink, Suggestion, Suspect, Weapon)
+
+
+class TestNameMethod(unittest.TestCase):
+    def test_name(self):
+        deduction_bot = DeductionBot()
+        self.assertEqual(deduction_bot.name(), 'deduction_bot')
+
+
+class TestObserveSuggestionResult(unittest.TestCase):
+    def test_observe_suggestion_result(self):
+        deduction_bot = DeductionBot()
+        deduction_bot.initialize(0, 6, [], [])
+        deduction_bot.receive_suggestion_result(
+            Suggestion(Suspect.MISS_SCARLETT,
+                       Location.BALLROOM,
+                       Weapon.CANDLESTICK),
+            None)
+        expected_turn = Accusation(Suspect.MISS_SCARLETT,
+                                   Location.BALLROOM,
+                                   Weapon.CANDLESTICK)
+        self.assertEqual(deduction_bot.take_turn(), expected_turn)
+
+    def test_suggestion_avoids_known_cards(self):
+        deduction_bot = DeductionBot()
+        deduction_bot.initialize(0, 3, [],
+                                 [Suspect.MRS_WHITE, Location.HALL])
+        deduction_bot.receive_suggestion_result(
+            Suggestion(Suspect.MISS_SCARLETT,
+                       Location.BALLROOM,
+                       Weapon.CANDLESTICK),
+            Counterevidence(1, Weapon.CANDLESTICK))
+        for _ in range(20):
+            turn = deduction_bot.take_turn()
+            self.assertIsInstance(turn, Suggestion)
+            self.assertNotIn(turn.who, [Suspect.MRS_WHITE])
+            self.assertNotIn(turn.where, [Location.HALL])
+            self.assertNotEqual(turn.what, Weapon.CANDLESTICK)
+
+
+class TestRespondToSuggestionMethod(unittest.TestCase):
+    def test_prefers_card_already_shown(self):
+        deduction_bot = DeductionBot()
+        deduction_bot.initialize(0, 3, [], [Suspect.MRS_WHITE,
+                                            Location.HALL,
+                                            Weapon.ROPE])
+        first = deduction_bot.respond_to_suggestion(
+            1, Suggestion(Suspect.MRS_PEACOCK, Location.HALL, Weapon.DAGGER))
+        self.assertEqual(first, Location.HALL)
+        second = deduction_bot.respond_to_suggestion(
+            1, Suggestion(Suspect.MRS_WHITE, Location.HALL, Weapon.DAGGER))
+        self.assertEqual(second, Location.HALL)
+        self.assertIsNone(deduction_bot.respond_to_suggestion(
+            1, Suggestion(Suspect.MRS_PEACOCK, Location.STUDY,
+                          Weapon.DAGGER)))
+
+
+class TestSharedKnowledge(unittest.TestCase):
+    def test_same_choices_as_private_deduction(self):
+        for seed in range(20):
+            random.seed(seed)
+            expected = ClueGame([DeductionBot() for _ in range(5)],
+                                NullSink(), seed=seed).execute()
+            random.seed(seed)
+            players = [DeductionBot(shared_knowledge=True)
+                       for _ in range(5)]
+            game = ClueGame(players, NullSink(), seed=seed)
+            self.assertIsNotNone(game.public_knowledge)
+            self.assertTrue(all(player.public is game.public_knowledge
+                                for player in players))
+            self.assertEqual(game.execute(), expected)
+
+    def test_falls_back_without_shared_knowledge(self):
+        random.seed(1)
+        expected = ClueGame([DeductionBot() for _ in range(3)], NullSink(),
+                            seed=1).execute()
+        random.seed(1)
+        game = ClueGame([DeductionBot(True), DeductionBot(),
+                         DeductionBot()], NullSink(), seed=1)
+        self.assertEqual(game.execute(), expected)
+        game = ClueGame([DeductionBot() for _ in range(3)], NullSink())
+        self.assertIsNone(game.public_knowledge)
+
+
+class TestFullGame(unittest.TestCase):
+    def test_deduction_bots_never_accuse_wrongly(self):
+        for seed in range(20):
+            game = ClueGame([DeductionBot() for _ in range(4)], NullSink(),
+                            seed=seed)
+            result = game.execute()
+            self.assertIsNotNone(result.winner_id)
+            self.assertEqual(result.eliminations, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
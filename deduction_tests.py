@@ -0,0 +1,113 @@
+import unittest
+from clue_game import (Accusation, CardSet, Counterevidence, Location,
+                       Suggestion, Suspect, Weapon)
+from deduction import DeductionEngine
+
+
+class TestDeductionEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = DeductionEngine()
+        self.engine.initialize(0, 3, [],
+                               [Suspect.MRS_WHITE, Location.HALL,
+                                Weapon.ROPE, Suspect.MRS_PEACOCK,
+                                Location.STUDY, Weapon.DAGGER])
+
+    def test_own_hand_is_known(self):
+        self.assertEqual(self.engine.owner(Location.HALL), 0)
+        self.assertNotIn(Location.HALL, self.engine.envelope_candidates())
+        self.assertEqual(self.engine.possible_owners(Location.LOUNGE),
+                         [1, 2, 3])
+
+    def test_players_between_lack_cards(self):
+        suggestion = Suggestion(Suspect.COLONEL_MUSTARD, Location.LOUNGE,
+                                Weapon.SPANNER)
+        self.engine.observe_suggestion(0, suggestion, 2)
+        self.assertEqual(self.engine.possible_owners(Location.LOUNGE), [2, 3])
+        self.assertEqual(self.engine.clauses[0].player_id, 2)
+        self.assertEqual(CardSet.from_mask(self.engine.clauses[0].mask),
+                         CardSet(suggestion))
+
+    def test_clause_resolves_to_single_card(self):
+        self.engine.observe_suggestion(
+            1, Suggestion(Suspect.MRS_WHITE, Location.LOUNGE, Weapon.ROPE), 2)
+        self.assertEqual(self.engine.owner(Location.LOUNGE), 2)
+        self.assertEqual(self.engine.clauses, [])
+
+    def test_envelope_by_elimination(self):
+        self.assertIsNone(self.engine.envelope())
+        self.engine.receive_suggestion_result(
+            Suggestion(Suspect.COLONEL_MUSTARD, Location.LOUNGE,
+                       Weapon.SPANNER), None)
+        self.assertEqual(self.engine.envelope(),
+                         Accusation(Suspect.COLONEL_MUSTARD, Location.LOUNGE,
+                                    Weapon.SPANNER))
+
+    def test_shown_card_and_wrong_accusation(self):
+        self.engine.receive_suggestion_result(
+            Suggestion(Suspect.COLONEL_MUSTARD, Location.LOUNGE,
+                       Weapon.SPANNER),
+            Counterevidence(1, Weapon.SPANNER))
+        self.assertEqual(self.engine.owner(Weapon.SPANNER), 1)
+        version = self.engine.version
+        self.engine.observe_accusation(
+            2, Accusation(Suspect.COLONEL_MUSTARD, Location.LOUNGE,
+                          Weapon.CANDLESTICK))
+        self.assertGreater(self.engine.version, version)
+        self.assertEqual(len(self.engine.wrong_accusations), 1)
+
+    def test_reinitialize_keeps_version_increasing(self):
+        # A cache keyed on the version, like those of Posterior.
+        cache = {self.engine.version: self.engine.owner(Location.HALL)}
+        initializations = self.engine.initializations
+        self.engine.initialize(1, 3, [],
+                               [Suspect.MRS_WHITE, Location.LOUNGE,
+                                Weapon.ROPE, Suspect.MRS_PEACOCK,
+                                Location.STUDY, Weapon.DAGGER])
+        self.assertNotIn(self.engine.version, cache)
+        self.assertGreater(self.engine.version, max(cache))
+        self.assertEqual(self.engine.initializations, initializations + 1)
+        self.assertEqual(self.engine.owner(Location.LOUNGE), 1)
+        self.assertIsNone(self.engine.owner(Location.HALL))
+
+    def test_public_only(self):
+        engine = DeductionEngine()
+        engine.initialize(None, 4, [Location.HALL, Weapon.ROPE], [])
+        self.assertEqual(engine.hand_sizes, [4, 4, 4, 4, 3])
+        self.assertEqual(engine.possible_owners(Location.HALL), [])
+
+    def test_fork_is_copy_on_write(self):
+        public = DeductionEngine()
+        public.initialize(None, 3, [], [])
+        suggestion = Suggestion(Suspect.COLONEL_MUSTARD, Location.LOUNGE,
+                                Weapon.SPANNER)
+        public.observe_suggestion(0, suggestion, 2)
+        fork = public.fork()
+        self.assertIs(fork.possible, public.possible)
+        fork.observe_suggestion(1, Suggestion(Suspect.MRS_WHITE,
+                                              Location.HALL, Weapon.ROPE),
+                                None)
+        self.assertEqual(public.possible_owners(Location.HALL), [0, 1, 2, 3])
+        self.assertEqual(fork.possible_owners(Location.HALL), [1, 3])
+        public.observe_accusation(1, Accusation(Suspect.MRS_WHITE,
+                                                Location.HALL, Weapon.ROPE))
+        self.assertEqual(fork.wrong_accusations, [])
+
+    def test_fork_with_hand_matches_private_engine(self):
+        hand = [Suspect.MRS_WHITE, Location.HALL, Weapon.ROPE,
+                Suspect.MRS_PEACOCK, Location.STUDY, Weapon.DAGGER]
+        public = DeductionEngine()
+        public.initialize(None, 3, [], [])
+        suggestion = Suggestion(Suspect.COLONEL_MUSTARD, Location.LOUNGE,
+                                Weapon.ROPE)
+        public.observe_suggestion(1, suggestion, 2)
+        self.engine.observe_suggestion(1, suggestion, 2)
+        fork = public.fork(0, hand)
+        self.assertEqual(fork.player_id, 0)
+        self.assertEqual(fork.possible, self.engine.possible)
+        self.assertEqual(fork.known, self.engine.known)
+        self.assertEqual(public.player_id, None)
+        self.assertEqual(public.possible_owners(Location.HALL), [0, 1, 2, 3])
+
+
+if __name__ == '__main__':
+    unittest.main()
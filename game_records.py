@@ -0,0 +1,323 @@
+"""Module game_records stores games in a compact fixed width binary format,
+and reads millions of them back as NumPy structured arrays.
+
+A record set is two append-only files that start with an 8 byte magic:
+
+    <path>.games  One GAME_DTYPE record per game (39 bytes): the number of
+                  players, the winner (-1 if nobody won), the number of
+                  rounds and turns, the index of the game's first turn in
+                  <path>.turns, and the owner of every card, indexed like
+                  Rules.all_cards (Card.value - 1 for the classic cards).
+                  The envelope is num_players, face up cards are -1.
+    <path>.turns  One TURN_DTYPE record per suggestion, accusation, turn
+                  forfeited or game budget exceeded (see BudgetEvent), and
+                  player failure (7 bytes): the actor, the kind of record,
+                  the three cards as Card values, the blocker (-1 if nobody
+                  blocked), and the Card value of the shown card (0 if
+                  none).  Other kinds leave the cards at 0, except that a
+                  failure stores the index of the failed method in
+                  FAILURE_METHODS as its first card.  Budget times and
+                  failure messages are not recorded.
+
+GameRecordWriter is an EventSink, so ClueGame writes records as it plays.
+GameRecords memory-maps the files, so opening them costs nothing and
+queries only touch the columns they read.
+
+A record set holds the games of one Rules, which sets the width of the
+game records, and must be opened with the Rules it was written with.  The
+sizes above are for the classic cards.
+"""
+from typing import BinaryIO, Optional
+import os
+import struct
+
+import numpy as np
+
+from clue_game import (CLASSIC_RULES, AccusationEvent, BlockEvent,
+                       BudgetEvent, DealEvent, EventSink, GameEvent,
+                       PlayerFailureEvent, RoundEvent, Rules, WinEvent)
+
+GAMES_MAGIC = b"CLUEGMS\x02"
+TURNS_MAGIC = b"CLUETRN\x01"
+HEADER_SIZE = 8
+
+# The kind of a turn record.
+SUGGESTION = 0
+ACCUSATION = 1
+FORFEIT = 2
+OVER_BUDGET = 3
+FAILURE = 4
+
+# The PlayerInterface methods that a FAILURE record can name.  Only append
+# to this, the index is stored in the records.
+FAILURE_METHODS = ("initialize", "reset", "receive_rules",
+                   "wants_public_knowledge", "receive_public_knowledge",
+                   "name", "take_turn", "respond_to_suggestion",
+                   "receive_suggestion_result", "observe_suggestion",
+                   "observe_accusation")
+# Failures that ClueGame reports before the DealEvent of their game.
+START_METHODS = frozenset(FAILURE_METHODS[:6])
+# Failures that ClueGame reports between a SuggestionEvent and its
+# BlockEvent.
+SUGGESTION_METHODS = frozenset(("respond_to_suggestion",
+                                "receive_suggestion_result"))
+
+# The owner of face up cards.
+FACE_UP = -1
+
+
+def game_dtype(rules: Rules) -> np.dtype:
+    """Returns the dtype of the game records of rules."""
+    return np.dtype([("num_players", "u1"),
+                     ("winner", "i1"),
+                     ("rounds", "<u4"),
+                     ("num_turns", "<u4"),
+                     ("turn_offset", "<u8"),
+                     ("owners", "i1", (len(rules.all_cards),))])
+
+
+def _game_struct(rules: Rules) -> struct.Struct:
+    return struct.Struct("<BbIIQ" + str(len(rules.all_cards)) + "b")
+
+
+NUM_CARDS = len(CLASSIC_RULES.all_cards)
+GAME_DTYPE = game_dtype(CLASSIC_RULES)
+TURN_DTYPE = np.dtype([("actor", "u1"),
+                       ("kind", "u1"),
+                       ("who", "u1"),
+                       ("where", "u1"),
+                       ("what", "u1"),
+                       ("blocker", "i1"),
+                       ("shown", "u1")])
+_TURN_STRUCT = struct.Struct("<BBBBBbB")
+assert _game_struct(CLASSIC_RULES).size == GAME_DTYPE.itemsize
+assert _TURN_STRUCT.size == TURN_DTYPE.itemsize
+
+
+def _open_append(path: str, magic: bytes, record_size: int
+                 ) -> tuple[BinaryIO, int]:
+    """Opens a record file for appending, writing the header if the file
+    is new.
+
+    Returns:
+    The file, and the number of records already in it.
+    """
+    file = open(path, "ab", buffering=1 << 20)
+    size = file.tell()
+    if size == 0:
+        file.write(magic)
+        return file, 0
+    with open(path, "rb") as existing:
+        if existing.read(HEADER_SIZE) != magic:
+            file.close()
+            raise ValueError(path + " is not a game record file")
+    return file, (size - HEADER_SIZE) // record_size
+
+
+class GameRecordWriter(EventSink):
+    """Appends the games it receives events for to a record set.  A game's
+    record is written when the next game is dealt, or on close().
+    """
+
+    def __init__(self, path: str, rules: Rules = CLASSIC_RULES) -> None:
+        """Opens, or creates, the record set at path.
+
+        Preconditions:
+        rules: rules.max_players < 128, and every card value < 256.
+
+        Parameters:
+        path: The record set writes path + ".games" and path + ".turns".
+        rules: The cards of the games.
+        """
+        assert rules.max_players < 128 and max(rules.all_cards) < 256
+        self.__game_struct = _game_struct(rules)
+        self.__card_indices = {card: index
+                               for index, card in enumerate(rules.all_cards)}
+        self.__games, self.games_written = _open_append(
+            path + ".games", GAMES_MAGIC, self.__game_struct.size)
+        self.__turns, self.__turn_offset = _open_append(
+            path + ".turns", TURNS_MAGIC, _TURN_STRUCT.size)
+        self.__num_players = 0
+        self.__owners: Optional[list[int]] = None
+        self.__winner = -1
+        self.__rounds = 0
+        self.__num_turns = 0
+        # Failure records waiting for the DealEvent of their game, or for
+        # the BlockEvent of their suggestion.
+        self.__before_deal: list[bytes] = []
+        self.__in_suggestion: list[bytes] = []
+
+    def __owners_of(self, deal: DealEvent) -> list[int]:
+        """Returns the owner of every card of deal, in record order.  Raises
+        ValueError if deal is not a deal of the record set's rules.
+        """
+        card_indices = self.__card_indices
+        owners = [FACE_UP] * len(card_indices)
+        dealt = len(deal.face_up_cards)
+        for owner_id, cards in enumerate(deal.hands + [deal.envelope]):
+            for card in cards:
+                if card not in card_indices:
+                    raise ValueError(repr(card) + " is not a card of the "
+                                     "record set's rules")
+                owners[card_indices[card]] = owner_id
+                dealt += 1
+        if dealt != len(owners):
+            raise ValueError("the game was not dealt with the record set's "
+                             "rules")
+        return owners
+
+    def __write_game(self) -> None:
+        if self.__owners is None:
+            return
+        self.__games.write(self.__game_struct.pack(
+            self.__num_players, self.__winner, self.__rounds,
+            self.__num_turns, self.__turn_offset, *self.__owners))
+        self.games_written += 1
+        self.__turn_offset += self.__num_turns
+        self.__owners = None
+
+    def __write_turns(self, records: list[bytes]) -> None:
+        for record in records:
+            self.__turns.write(record)
+        self.__num_turns += len(records)
+
+    def emit(self, event: GameEvent) -> None:
+        if isinstance(event, BlockEvent):
+            suggestion = event.suggestion
+            self.__write_turns([_TURN_STRUCT.pack(
+                event.suggestor_id, SUGGESTION, suggestion.who,
+                suggestion.where, suggestion.what,
+                -1 if event.blocker_id is None else event.blocker_id,
+                0 if event.card is None else event.card)])
+            self.__write_turns(self.__in_suggestion)
+            self.__in_suggestion = []
+        elif isinstance(event, RoundEvent):
+            self.__rounds = event.round_number + 1
+        elif isinstance(event, AccusationEvent):
+            accusation = event.accusation
+            self.__write_turns([_TURN_STRUCT.pack(
+                event.accusor_id, ACCUSATION, accusation.who,
+                accusation.where, accusation.what, -1, 0)])
+        elif isinstance(event, WinEvent):
+            self.__winner = event.winner_id
+        elif isinstance(event, BudgetEvent):
+            self.__write_turns([_TURN_STRUCT.pack(
+                event.player_id, OVER_BUDGET if event.eliminated
+                else FORFEIT, 0, 0, 0, -1, 0)])
+        elif isinstance(event, PlayerFailureEvent):
+            if event.method not in FAILURE_METHODS:
+                raise ValueError(event.method + " is not a PlayerInterface "
+                                 "method")
+            record = _TURN_STRUCT.pack(
+                event.player_id, FAILURE,
+                FAILURE_METHODS.index(event.method), 0, 0, -1, 0)
+            if event.method in START_METHODS:
+                self.__before_deal.append(record)
+            elif event.method in SUGGESTION_METHODS:
+                self.__in_suggestion.append(record)
+            else:
+                self.__write_turns([record])
+        elif isinstance(event, DealEvent):
+            owners = self.__owners_of(event)
+            self.__write_game()
+            self.__num_players = len(event.hands)
+            self.__owners = owners
+            self.__winner = -1
+            self.__rounds = 0
+            self.__num_turns = 0
+            self.__write_turns(self.__before_deal)
+            self.__before_deal = []
+
+    def flush(self) -> None:
+        """Writes the current game and flushes both files."""
+        self.__write_game()
+        self.__games.flush()
+        self.__turns.flush()
+
+    def close(self) -> None:
+        """Writes the current game and closes both files."""
+        self.flush()
+        self.__games.close()
+        self.__turns.close()
+
+    def __enter__(self) -> 'GameRecordWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _map(path: str, magic: bytes, dtype: np.dtype) -> np.ndarray:
+    with open(path, "rb") as file:
+        if file.read(HEADER_SIZE) != magic:
+            raise ValueError(path + " is not a game record file")
+    count = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype)
+    return np.memmap(path, dtype, "r", HEADER_SIZE, (count,))
+
+
+class GameRecords():
+    """A record set opened for reading.  The arrays are read-only views of
+    the memory-mapped files.
+
+    Members:
+    rules: The cards of the games.
+    games: game_dtype(rules) array, one record per game.
+    turns: TURN_DTYPE array, one record per turn of every game.
+    """
+
+    def __init__(self, path: str, rules: Rules = CLASSIC_RULES) -> None:
+        """Memory-maps the record set written by
+        GameRecordWriter(path, rules).
+        """
+        self.rules = rules
+        self.games: np.ndarray = _map(path + ".games", GAMES_MAGIC,
+                                      game_dtype(rules))
+        self.turns: np.ndarray = _map(path + ".turns", TURNS_MAGIC,
+                                      TURN_DTYPE)
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    def game_turns(self, game_index: int) -> np.ndarray:
+        """Returns the turn records of one game, in order."""
+        game = self.games[game_index]
+        start = int(game["turn_offset"])
+        return self.turns[start:start + int(game["num_turns"])]
+
+    def envelopes(self) -> np.ndarray:
+        """Returns (num_games, 3) Card values of every game's envelope."""
+        owners = self.games["owners"]
+        in_envelope = owners == self.games["num_players"][:, None]
+        card_values = np.array(self.rules.all_cards)[
+            np.nonzero(in_envelope)[1]]
+        return card_values.reshape(-1, 3)
+
+    def win_rate_by_seat(self, num_players: Optional[int] = None
+                         ) -> np.ndarray:
+        """Returns the fraction of games won from each seat.
+
+        Parameters:
+        num_players: Only count games with this many players.  Defaults to
+        all games, with rates for rules.max_players seats.
+        """
+        winners = self.games["winner"]
+        if num_players is not None:
+            winners = winners[self.games["num_players"] == num_players]
+        else:
+            num_players = self.rules.max_players
+        if len(winners) == 0:
+            return np.zeros(num_players)
+        won = winners[winners >= 0].astype(np.intp)
+        return np.bincount(won, minlength=num_players) / len(winners)
+
+    def win_rate_by_round(self) -> np.ndarray:
+        """Returns, for each round number r, the fraction of games that were
+        won in round r (rounds are numbered from 0).
+        """
+        if len(self.games) == 0:
+            return np.zeros(0)
+        won = self.games["winner"] >= 0
+        rounds = self.games["rounds"][won].astype(np.intp) - 1
+        return np.bincount(rounds) / len(self.games)
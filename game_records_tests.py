@@ -0,0 +1,133 @@
+import os
+import random
+import tempfile
+import unittest
+import numpy as np
+from clue_game import (BlockEvent, BufferedSink, ClueGame, DealEvent,
+                       RoundEvent, Rules, Suggestion)
+from deduction_bot import DeductionBot
+from game_records import (ACCUSATION, SUGGESTION, GameRecords,
+                          GameRecordWriter)
+from sample_bot import SampleBot
+
+
+class TestGameRecords(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "games")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def play(self, writer, num_games, num_players=4):
+        results = []
+        for seed in range(num_games):
+            random.seed(seed)
+            game = ClueGame([SampleBot() for _ in range(num_players)],
+                            writer, seed=seed)
+            results.append((game, game.execute()))
+        return results
+
+    def test_round_trip(self):
+        with GameRecordWriter(self.path) as writer:
+            results = self.play(writer, 20)
+        records = GameRecords(self.path)
+        self.assertEqual(len(records), 20)
+        for index, (game, result) in enumerate(results):
+            record = records.games[index]
+            self.assertEqual(record["num_players"], 4)
+            self.assertEqual(record["winner"],
+                             -1 if result.winner_id is None
+                             else result.winner_id)
+            self.assertEqual(record["rounds"], result.rounds)
+            self.assertEqual(sorted(records.envelopes()[index]),
+                             sorted(game.envelope))
+            for player_id, info in enumerate(game.player_infos):
+                for card in info.face_down_cards:
+                    self.assertEqual(record["owners"][card - 1], player_id)
+            turns = records.game_turns(index)
+            self.assertEqual(len(turns), record["num_turns"])
+            accusations = turns[turns["kind"] == ACCUSATION]
+            self.assertEqual(len(accusations),
+                             len(result.eliminations) +
+                             (result.winner_id is not None))
+
+    def test_turns_match_events(self):
+        sink = BufferedSink()
+        random.seed(5)
+        ClueGame([SampleBot() for _ in range(3)], sink, seed=5).execute()
+        with GameRecordWriter(self.path) as writer:
+            for event in sink.events:
+                writer.emit(event)
+        turns = GameRecords(self.path).game_turns(0)
+        blocks = [event for event in sink.events
+                  if isinstance(event, BlockEvent)]
+        suggestions = turns[turns["kind"] == SUGGESTION]
+        self.assertEqual(len(suggestions), len(blocks))
+        for turn, block in zip(suggestions, blocks):
+            self.assertEqual(turn["actor"], block.suggestor_id)
+            self.assertEqual(Suggestion(*block.suggestion),
+                             tuple(turn[["who", "where", "what"]].item()))
+            self.assertEqual(turn["blocker"], -1 if block.blocker_id is None
+                             else block.blocker_id)
+            self.assertEqual(turn["shown"],
+                             0 if block.card is None else block.card)
+
+    def test_rounds_beyond_16_bits(self):
+        sink = BufferedSink()
+        ClueGame([SampleBot() for _ in range(3)], sink, seed=6)
+        [deal] = [event for event in sink.events
+                  if isinstance(event, DealEvent)]
+        with GameRecordWriter(self.path) as writer:
+            writer.emit(deal)
+            writer.emit(RoundEvent(70000))
+        self.assertEqual(GameRecords(self.path).games["rounds"][0], 70001)
+
+    def test_append_and_queries(self):
+        with GameRecordWriter(self.path) as writer:
+            first = self.play(writer, 10)
+        with GameRecordWriter(self.path) as writer:
+            self.assertEqual(writer.games_written, 10)
+            second = self.play(writer, 10, num_players=3)
+        records = GameRecords(self.path)
+        self.assertEqual(len(records), 20)
+        self.assertEqual(records.games[10]["turn_offset"],
+                         records.games["num_turns"][:10].sum())
+        results = [result for _, result in first + second]
+        wins = [result.winner_id for result in results[10:]]
+        expected = [wins.count(seat) / 10 for seat in range(3)]
+        np.testing.assert_allclose(records.win_rate_by_seat(3), expected)
+        by_round = records.win_rate_by_round()
+        self.assertAlmostEqual(by_round.sum(),
+                               sum(result.winner_id is not None
+                                   for result in results) / 20)
+
+    def test_generated_rules(self):
+        rules = Rules.generate(4, 5, 4)
+        games = []
+        with GameRecordWriter(self.path, rules) as writer:
+            for seed in range(5):
+                random.seed(seed)
+                game = ClueGame([DeductionBot() for _ in range(7)], writer,
+                                seed=seed, rules=rules)
+                game.execute()
+                games.append(game)
+            with self.assertRaises(ValueError):
+                ClueGame([SampleBot() for _ in range(3)], writer,
+                         seed=0).execute()
+        records = GameRecords(self.path, rules)
+        self.assertEqual(len(records), 5)
+        for index, game in enumerate(games):
+            self.assertEqual(sorted(records.envelopes()[index]),
+                             sorted(game.envelope))
+        self.assertEqual(len(records.win_rate_by_seat()), rules.max_players)
+
+    def test_rejects_other_files(self):
+        with open(self.path + ".games", "wb") as file:
+            file.write(b"not a record file")
+        with self.assertRaises(ValueError):
+            GameRecordWriter(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
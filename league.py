@@ -0,0 +1,291 @@
+"""Module league keeps ratings of bots across many games, so that a new bot
+can join without replaying every earlier match.
+
+Ratings are TrueSkill style Gaussians (mu, sigma) of each bot's skill.  A
+game of Clue has one winner, so it is decomposed into pairwise results: the
+winner beat each of the other players, and the losers tie with each other,
+which is ignored.  Games without a winner carry no information about skill.
+
+Tables are scheduled where they reduce uncertainty the most: the least
+certain bot is seated first, and the table is filled with the bots whose
+games against it are the least predictable.  Bots whose ratings are
+already certain and far apart are rarely paired, so ratings converge in
+far fewer games than a round-robin.
+
+The league is checkpointed to a JSON file, so runs can be stopped and
+resumed, eg. `python league.py league.json`.
+"""
+from math import exp, sqrt
+from statistics import NormalDist
+from typing import NamedTuple, Optional
+import json
+import os
+import random
+
+from clue_game import ClueGame, NullSink, derive_seed
+from tournament import BotFactory
+
+# The default TrueSkill parameters, in rating points.
+INITIAL_MU = 25.0
+INITIAL_SIGMA = INITIAL_MU / 3
+BETA = INITIAL_SIGMA / 2
+TAU = INITIAL_SIGMA / 100
+
+_STANDARD_NORMAL = NormalDist()
+
+
+class Rating(NamedTuple):
+    """The belief about the skill of a bot.
+
+    Members:
+    mu: The mean skill.
+    sigma: The standard deviation of the skill.
+    """
+    mu: float = INITIAL_MU
+    sigma: float = INITIAL_SIGMA
+
+    def conservative(self) -> float:
+        """Returns mu - 3 sigma, a skill the bot has with ~99% confidence.
+        """
+        return self.mu - 3 * self.sigma
+
+
+def rate_win(winner: Rating, loser: Rating) -> tuple[Rating, Rating]:
+    """Returns the ratings of two bots after the first beat the second.
+    This is the two player TrueSkill update without draws.
+    """
+    c = sqrt(2 * BETA ** 2 + winner.sigma ** 2 + loser.sigma ** 2)
+    t = (winner.mu - loser.mu) / c
+    # Clamp the cdf, so that very surprising results stay finite.
+    v = _STANDARD_NORMAL.pdf(t) / max(_STANDARD_NORMAL.cdf(t), 1e-300)
+    w = v * (v + t)
+    winner_variance = winner.sigma ** 2
+    loser_variance = loser.sigma ** 2
+    return (Rating(winner.mu + winner_variance / c * v,
+                   sqrt(winner_variance * max(1 - winner_variance / c ** 2
+                                              * w, 1e-6))),
+            Rating(loser.mu - loser_variance / c * v,
+                   sqrt(loser_variance * max(1 - loser_variance / c ** 2
+                                             * w, 1e-6))))
+
+
+def pair_information(first: Rating, second: Rating) -> float:
+    """Returns how much a game between two bots is expected to reduce their
+    uncertainty: their combined variance, weighted by how close to even
+    the game is expected to be (the TrueSkill match quality).
+    """
+    c_squared = 2 * BETA ** 2 + first.sigma ** 2 + second.sigma ** 2
+    quality = (sqrt(2 * BETA ** 2 / c_squared) *
+               exp(-(first.mu - second.mu) ** 2 / (2 * c_squared)))
+    return (first.sigma ** 2 + second.sigma ** 2) * quality
+
+
+class LeagueEntry():
+    """The record of one bot in the league.
+
+    Members:
+    rating: The current rating.
+    games: The number of games played.
+    wins: The number of games won.
+    """
+
+    def __init__(self,
+                 rating: Rating = Rating(),
+                 games: int = 0,
+                 wins: int = 0) -> None:
+        self.rating = rating
+        self.games = games
+        self.wins = wins
+
+
+class League():
+    """Ratings of bots, updated after every game.
+
+    Members:
+    bot_factories: Creates each bot, by name.
+    num_players: The number of players at each table.
+    seed: The base seed.  Game i is dealt with derive_seed(seed, i).
+    games_played: The number of games played so far.
+    entries: The record of each bot, by name.
+    path: The checkpoint file, or None.
+    """
+
+    def __init__(self,
+                 bot_factories: dict[str, BotFactory],
+                 num_players: int = 4,
+                 seed: Optional[int] = None,
+                 path: Optional[str] = None) -> None:
+        """Constructs the League, resuming from the checkpoint at path if
+        it exists.  Bots in the checkpoint keep their ratings, and bots
+        that are new to it start with the default rating.
+
+        Preconditions:
+        num_players: 3 <= num_players <= min(6, len(bot_factories))
+
+        Parameters:
+        bot_factories: Creates each bot, by name.
+        num_players: The number of players at each table.
+        seed: The base seed of new leagues.  Defaults to a random seed.
+        A resumed league keeps its seed.
+        path: The checkpoint file.
+        """
+        self.bot_factories = dict(bot_factories)
+        self.num_players = num_players
+        self.path = path
+        self.games_played = 0
+        self.entries: dict[str, LeagueEntry] = {}
+        if path is not None and os.path.exists(path):
+            self.__load(path)
+        else:
+            self.seed = (random.SystemRandom().getrandbits(64)
+                         if seed is None else seed)
+        for name in self.bot_factories:
+            self.entries.setdefault(name, LeagueEntry())
+        assert 3 <= num_players <= min(6, len(self.bot_factories))
+
+    def add_bot(self, name: str, factory: BotFactory) -> None:
+        """Adds a bot to the league.  Other ratings are kept."""
+        self.bot_factories[name] = factory
+        self.entries.setdefault(name, LeagueEntry())
+
+    ###########################################################################
+    # Ratings
+    ###########################################################################
+
+    def update(self, seats: list[str], winner_id: Optional[int]) -> None:
+        """Records the result of one game.
+
+        Parameters:
+        seats: The name of the bot in each seat.
+        winner_id: The seat that won, or None.
+        """
+        self.games_played += 1
+        for name in seats:
+            entry = self.entries[name]
+            entry.games += 1
+            # Skills may drift, so uncertainty grows a little every game.
+            entry.rating = Rating(entry.rating.mu,
+                                  sqrt(entry.rating.sigma ** 2 + TAU ** 2))
+        if winner_id is None:
+            return
+        winner = self.entries[seats[winner_id]]
+        winner.wins += 1
+        for seat, name in enumerate(seats):
+            if seat == winner_id or name == seats[winner_id]:
+                continue
+            loser = self.entries[name]
+            winner.rating, loser.rating = rate_win(winner.rating,
+                                                   loser.rating)
+
+    def leaderboard(self) -> list[tuple[str, Rating]]:
+        """Returns the bots and their ratings, best conservative rating
+        first.
+        """
+        return sorted(((name, self.entries[name].rating)
+                       for name in self.bot_factories),
+                      key=lambda item: -item[1].conservative())
+
+    def report(self) -> str:
+        """Returns a human readable leaderboard."""
+        lines = [str(self.games_played) + " games (seed " + str(self.seed) +
+                 ")."]
+        for name, rating in self.leaderboard():
+            entry = self.entries[name]
+            lines.append(f"   {name:24} {rating.mu:7.2f} +- "
+                         f"{rating.sigma:5.2f}  ({entry.wins}/"
+                         f"{entry.games} won)")
+        return "\n".join(lines)
+
+    ###########################################################################
+    # Scheduling
+    ###########################################################################
+
+    def schedule(self) -> list[str]:
+        """Returns the bots for the next table, in seat order."""
+        names = sorted(self.bot_factories)
+        ratings = {name: self.entries[name].rating for name in names}
+        table = [max(names, key=lambda name: (ratings[name].sigma,
+                                              -self.entries[name].games))]
+        while len(table) < self.num_players:
+            table.append(max(
+                (name for name in names if name not in table),
+                key=lambda name: sum(pair_information(ratings[name],
+                                                      ratings[other])
+                                     for other in table)))
+        # Rotate seats, so that no bot keeps the advantage of a seat.
+        random.Random(derive_seed(self.seed, self.games_played, 2)
+                      ).shuffle(table)
+        return table
+
+    def play(self, num_games: int, checkpoint_every: int = 100) -> None:
+        """Schedules and plays num_games headless games, updating the
+        ratings after each one, and checkpointing every checkpoint_every
+        games and at the end.  The global random module is reseeded for
+        each game, and restored afterwards.
+        """
+        random_state = random.getstate()
+        try:
+            for _ in range(num_games):
+                seats = self.schedule()
+                game_index = self.games_played
+                random.seed(derive_seed(self.seed, game_index, 1))
+                game = ClueGame(
+                    [self.bot_factories[name]() for name in seats],
+                    NullSink(), seed=derive_seed(self.seed, game_index))
+                self.update(seats, game.execute().winner_id)
+                if self.games_played % checkpoint_every == 0:
+                    self.checkpoint()
+        finally:
+            random.setstate(random_state)
+        self.checkpoint()
+
+    ###########################################################################
+    # Checkpoints
+    ###########################################################################
+
+    def checkpoint(self) -> None:
+        """Writes the league to self.path atomically, if it has one."""
+        if self.path is None:
+            return
+        state = {"seed": self.seed,
+                 "num_players": self.num_players,
+                 "games_played": self.games_played,
+                 "bots": {name: {"mu": entry.rating.mu,
+                                 "sigma": entry.rating.sigma,
+                                 "games": entry.games,
+                                 "wins": entry.wins}
+                          for name, entry in self.entries.items()}}
+        temporary = self.path + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump(state, file, indent=2)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.path)
+
+    def __load(self, path: str) -> None:
+        with open(path) as file:
+            state = json.load(file)
+        assert state["num_players"] == self.num_players
+        self.seed = state["seed"]
+        self.games_played = state["games_played"]
+        for name, bot in state["bots"].items():
+            self.entries[name] = LeagueEntry(Rating(bot["mu"],
+                                                    bot["sigma"]),
+                                             bot["games"], bot["wins"])
+
+
+def main():
+    import sys
+    from deduction_bot import DeductionBot
+    from sample_bot import SampleBot
+    league = League({"sample_bot": SampleBot,
+                     "deduction_bot": DeductionBot,
+                     "sample_bot_2": SampleBot,
+                     "deduction_bot_2": DeductionBot},
+                    path=sys.argv[1] if len(sys.argv) > 1 else None)
+    league.play(500)
+    print(league.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import os
+import random
+import tempfile
+import unittest
+from deduction_bot import DeductionBot
+from league import League, Rating, rate_win
+from sample_bot import SampleBot
+
+BOTS = {"sample_1": SampleBot, "sample_2": SampleBot, "sample_3": SampleBot,
+        "deduction": DeductionBot}
+
+
+class TestRatings(unittest.TestCase):
+    def test_win_moves_means_and_shrinks_uncertainty(self):
+        winner, loser = rate_win(Rating(), Rating())
+        self.assertGreater(winner.mu, Rating().mu)
+        self.assertLess(loser.mu, Rating().mu)
+        self.assertLess(winner.sigma, Rating().sigma)
+        self.assertLess(loser.sigma, Rating().sigma)
+
+    def test_expected_win_moves_less_than_upset(self):
+        strong, weak = Rating(35, 2), Rating(15, 2)
+        expected = rate_win(strong, weak)[0].mu - strong.mu
+        upset = rate_win(weak, strong)[0].mu - weak.mu
+        self.assertLess(expected, upset)
+
+    def test_game_without_winner_only_counts(self):
+        league = League(BOTS, 3, seed=0)
+        league.update(["sample_1", "sample_2", "deduction"], None)
+        self.assertEqual(league.games_played, 1)
+        self.assertEqual(league.entries["sample_1"].games, 1)
+        self.assertAlmostEqual(league.entries["sample_1"].rating.mu,
+                               Rating().mu)
+
+    def test_stronger_bot_is_rated_higher(self):
+        league = League(BOTS, 3, seed=1)
+        league.play(60)
+        self.assertEqual(league.leaderboard()[0][0], "deduction")
+
+    def test_play_keeps_random_state(self):
+        random.seed(5)
+        expected = random.random()
+        random.seed(5)
+        League(BOTS, 3, seed=2).play(3)
+        self.assertEqual(random.random(), expected)
+
+
+class TestScheduling(unittest.TestCase):
+    def test_new_bot_is_scheduled(self):
+        league = League(BOTS, 3, seed=2)
+        league.play(40)
+        league.add_bot("newcomer", SampleBot)
+        self.assertIn("newcomer", league.schedule())
+
+    def test_table_has_distinct_bots(self):
+        league = League(BOTS, 4, seed=3)
+        self.assertEqual(sorted(league.schedule()), sorted(BOTS))
+
+
+class TestCheckpoint(unittest.TestCase):
+    def test_resume_matches_uninterrupted_run(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "league.json")
+            League(BOTS, 3, seed=4, path=path).play(15, checkpoint_every=4)
+            resumed = League(BOTS, 3, seed=99, path=path)
+            self.assertEqual(resumed.seed, 4)
+            self.assertEqual(resumed.games_played, 15)
+            resumed.play(15)
+            self.assertEqual(os.listdir(directory), ["league.json"])
+        uninterrupted = League(BOTS, 3, seed=4)
+        uninterrupted.play(30)
+        for name in BOTS:
+            self.assertEqual(resumed.entries[name].rating,
+                             uninterrupted.entries[name].rating)
+            self.assertEqual(resumed.entries[name].wins,
+                             uninterrupted.entries[name].wins)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,389 @@
+"""Module posterior computes the exact probability of every possible
+envelope, and of where every card is, given what a DeductionEngine knows.
+
+Every consistent deal of the hidden cards is equally likely, so the
+probability of a scenario is the number of consistent deals with that
+envelope divided by the number of consistent deals.  Deals are counted
+with dynamic programming over the unresolved cards, one card at a time.
+The state after each card is the remaining hand size of every player,
+which envelope slots are still empty, and which blocker clauses are not
+yet satisfied, packed into a single int.  Identical states are merged, so
+the work grows with the number of distinct states rather than the number
+of deals.
+"""
+from collections import OrderedDict, defaultdict
+from random import Random
+from typing import Optional
+
+from clue_game import (Accusation, Card, CardSet, card_mask,
+                       interned_accusation)
+from deduction import DeductionEngine
+
+
+class DealModel():
+    """The layered counting DP for one knowledge state.
+
+    Members:
+    cards: The unresolved cards, in the order they are processed.
+    counts: counts[i] maps each reachable state before cards[i] is dealt to
+    the number of ways to reach it.
+    completions: completions[i] maps each state before cards[i] is dealt
+    to the number of ways to deal cards[i:] consistently from it.
+    total: The number of consistent deals of the unresolved cards.
+    """
+
+    def __init__(self,
+                 engine: DeductionEngine,
+                 envelope_possible: Optional[int] = None) -> None:
+        """Builds and runs the DP.
+
+        Parameters:
+        engine: The knowledge to count deals for.
+        envelope_possible: If given, further restricts the cards that might
+        be in the envelope.  Used to count the deals of one scenario.
+        """
+        self.num_players = engine.num_players
+        self.envelope_id = engine.envelope_id
+        rules = self.rules = engine.rules
+        possible = list(engine.possible)
+        if envelope_possible is not None:
+            possible[self.envelope_id] &= envelope_possible
+        known = engine.known
+        self.known = list(known)
+
+        any_known = 0
+        any_possible = 0
+        for owner_id in range(self.num_players + 1):
+            any_known |= known[owner_id]
+            any_possible |= possible[owner_id]
+        unknown = any_possible & ~any_known
+        # The largest category goes last, so that fewer partial envelopes
+        # are tracked while counting scenarios.
+        category_order = sorted(range(3),
+                                key=lambda index: len(rules.categories[index]))
+        self.cards: list[Card] = [
+            card
+            for category in category_order
+            for card in rules.categories[category]
+            if unknown >> card & 1]
+
+        # Pack the start state, with enough bits per hand for the largest.
+        bits_per_hand = self.bits_per_hand = max(
+            engine.hand_sizes[:self.num_players]).bit_length()
+        envelope_shift = bits_per_hand * self.num_players
+        clause_shift = envelope_shift + 3
+        start = 0
+        for player_id in range(self.num_players):
+            remaining = (engine.hand_sizes[player_id] -
+                         known[player_id].bit_count())
+            start |= remaining << (bits_per_hand * player_id)
+        envelope_known = known[self.envelope_id]
+        for index, category in enumerate(rules.category_masks):
+            if not envelope_known & category:
+                start |= 1 << (envelope_shift + index)
+        self.envelope_need_mask = 0b111 << envelope_shift
+        feasible = True
+        clauses = []
+        for clause in engine.clauses:
+            mask = clause.mask & unknown & possible[clause.player_id]
+            if mask == 0:
+                feasible = False
+            clauses.append((clause.player_id, mask))
+            start |= 1 << (clause_shift + len(clauses) - 1)
+        self.start = start
+
+        # For each card, the transitions (owner, subtract, clear) and the
+        # bits that must be clear once it has been dealt.
+        position = {card: i for i, card in enumerate(self.cards)}
+        self.options: list[list[tuple[int, int, int]]] = []
+        self.closing: list[int] = [0] * len(self.cards)
+        for i, card in enumerate(self.cards):
+            bit = 1 << card
+            options = []
+            for player_id in range(self.num_players):
+                if possible[player_id] & bit:
+                    clear = 0
+                    for j, (clause_player, mask) in enumerate(clauses):
+                        if clause_player == player_id and mask & bit:
+                            clear |= 1 << (clause_shift + j)
+                    options.append(
+                        (player_id, 1 << (bits_per_hand * player_id),
+                         clear))
+            category = rules.category_of(card)
+            envelope_bit = 1 << (envelope_shift + category)
+            if possible[self.envelope_id] & bit:
+                options.append((self.envelope_id, 0, envelope_bit))
+            self.options.append(options)
+            if all(rules.category_of(other) != category
+                   for other in self.cards[i + 1:]):
+                self.closing[i] |= envelope_bit
+        for j, (clause_player, mask) in enumerate(clauses):
+            if mask:
+                last = max(position[card] for card in self.cards
+                           if mask >> card & 1)
+                self.closing[last] |= 1 << (clause_shift + j)
+
+        self.counts: list[dict[int, int]] = []
+        self.completions: list[dict[int, int]] = []
+        self.total = 0
+        if feasible:
+            self.__count()
+
+    def __successors(self, i: int, state: int):
+        """Yields (owner, next state) for every way to deal cards[i]."""
+        closing = self.closing[i]
+        hand_mask = (1 << self.bits_per_hand) - 1
+        for owner_id, subtract, clear in self.options[i]:
+            if subtract:
+                if not (state // subtract) & hand_mask:
+                    continue
+                next_state = (state - subtract) & ~clear
+            else:
+                if not state & clear:
+                    continue
+                next_state = state & ~clear
+            if not next_state & closing:
+                yield owner_id, next_state
+
+    def __count(self) -> None:
+        """Fills in counts (forwards) and completions (backwards)."""
+        layer: dict[int, int] = {self.start: 1}
+        for i in range(len(self.cards)):
+            self.counts.append(layer)
+            next_layer: dict[int, int] = defaultdict(int)
+            for state, count in layer.items():
+                for _, next_state in self.__successors(i, state):
+                    next_layer[next_state] += count
+            layer = next_layer
+        self.counts.append(layer)
+
+        completion: dict[int, int] = {0: 1} if 0 in layer else {}
+        self.completions = [completion]
+        for i in range(len(self.cards) - 1, -1, -1):
+            previous = {}
+            for state in self.counts[i]:
+                ways = 0
+                for _, next_state in self.__successors(i, state):
+                    ways += completion.get(next_state, 0)
+                if ways:
+                    previous[state] = ways
+            completion = previous
+            self.completions.append(completion)
+        self.completions.reverse()
+        self.total = completion.get(self.start, 0)
+
+    def owner_counts(self) -> dict[Card, list[int]]:
+        """Returns, for every unresolved card, the number of consistent
+        deals in which each owner holds it.
+        """
+        result = {}
+        for i, card in enumerate(self.cards):
+            owner_counts = [0] * (self.num_players + 1)
+            completion = self.completions[i + 1]
+            for state, count in self.counts[i].items():
+                if state not in self.completions[i]:
+                    continue
+                for owner_id, next_state in self.__successors(i, state):
+                    owner_counts[owner_id] += (
+                        count * completion.get(next_state, 0))
+            result[card] = owner_counts
+        return result
+
+    def scenario_counts(self) -> dict[Accusation, int]:
+        """Returns the number of consistent deals with each envelope.
+        Partial envelopes are tracked while dealing, until the last empty
+        envelope slot is filled.  From there, the completions are known.
+        """
+        envelope_known = list(CardSet.from_mask(self.known[self.envelope_id]))
+        result: dict[Accusation, int] = defaultdict(int)
+        if self.start & self.envelope_need_mask == 0:
+            if self.total:
+                result[self.__scenario(envelope_known)] = self.total
+            return result
+
+        layer: dict[tuple[tuple[Card, ...], int], int] = {
+            ((), self.start): 1}
+        for i, card in enumerate(self.cards):
+            completion = self.completions[i + 1]
+            next_layer: dict[tuple[tuple[Card, ...], int], int] = (
+                defaultdict(int))
+            for (chosen, state), count in layer.items():
+                for owner_id, next_state in self.__successors(i, state):
+                    if owner_id != self.envelope_id:
+                        if next_state in completion:
+                            next_layer[(chosen, next_state)] += count
+                        continue
+                    if next_state & self.envelope_need_mask:
+                        if next_state in completion:
+                            next_layer[(chosen + (card,), next_state)] += (
+                                count)
+                        continue
+                    ways = completion.get(next_state, 0)
+                    if ways:
+                        scenario = self.__scenario(
+                            envelope_known + list(chosen) + [card])
+                        result[scenario] += count * ways
+            layer = next_layer
+        return result
+
+    def sample(self, rng: Random) -> list[int]:
+        """Returns a uniformly random consistent deal of the unresolved
+        cards, as the owner of each card in self.cards.
+
+        Preconditions:
+        self: self.total > 0
+        """
+        owners = []
+        state = self.start
+        for i in range(len(self.cards)):
+            completion = self.completions[i + 1]
+            pick = rng.randrange(self.completions[i][state])
+            for owner_id, next_state in self.__successors(i, state):
+                ways = completion.get(next_state, 0)
+                if pick < ways:
+                    break
+                pick -= ways
+            owners.append(owner_id)
+            state = next_state
+        return owners
+
+    @staticmethod
+    def __scenario(cards: list[Card]) -> Accusation:
+        # Categories are in the order of the card values.
+        return interned_accusation(*sorted(cards))
+
+
+###############################################################################
+# Posterior
+###############################################################################
+
+
+def knowledge_key(engine: DeductionEngine) -> tuple:
+    """Returns a hashable key that identifies everything the posterior
+    depends on.  Engines with equal keys have equal posteriors.
+    """
+    return (engine.num_players,
+            tuple(engine.possible),
+            tuple(engine.known),
+            tuple(engine.hand_sizes),
+            tuple(sorted(engine.clauses)),
+            tuple(sorted(set(engine.wrong_accusations))))
+
+
+class PosteriorResult():
+    """The exact posterior for one knowledge state.
+
+    Members:
+    num_deals: The number of consistent deals of the unresolved cards.
+    scenarios: The probability of each possible envelope.  Scenarios that
+    are not included have probability 0.
+    cards: For every card, the probability that each owner (players, then
+    the envelope at index num_players) holds it.  All zeros for face up
+    cards.
+    """
+
+    def __init__(self, engine: DeductionEngine) -> None:
+        model = deal_model(engine)
+        num_deals = model.total
+        scenario_counts = model.scenario_counts()
+        owner_counts = model.owner_counts()
+
+        # Deals whose envelope is a known wrong accusation don't count.
+        for accusation in set(engine.wrong_accusations):
+            if scenario_counts.pop(accusation, 0) == 0:
+                continue
+            excluded = DealModel(engine, card_mask(accusation))
+            num_deals -= excluded.total
+            for card, counts in excluded.owner_counts().items():
+                owner_counts[card] = [total - count for total, count
+                                      in zip(owner_counts[card], counts)]
+        assert num_deals > 0, "inconsistent observations: no possible deal"
+
+        self.num_deals: int = num_deals
+        self.scenarios: dict[Accusation, float] = {
+            scenario: count / num_deals
+            for scenario, count in scenario_counts.items()}
+        self.cards: dict[Card, list[float]] = {}
+        for card in engine.rules.all_cards:
+            if card in owner_counts:
+                self.cards[card] = [count / num_deals
+                                    for count in owner_counts[card]]
+            else:
+                bit = 1 << card
+                self.cards[card] = [1.0 if known & bit else 0.0
+                                    for known in engine.known]
+
+
+_posterior_cache: 'OrderedDict[tuple, PosteriorResult]' = OrderedDict()
+_model_cache: 'OrderedDict[tuple, DealModel]' = OrderedDict()
+
+
+def _cached(cache: OrderedDict, size: int, engine: DeductionEngine, make):
+    """Returns make(engine), kept in an LRU cache of the given size keyed by
+    knowledge_key(engine).
+    """
+    key = knowledge_key(engine)
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+        return value
+    value = make(engine)
+    cache[key] = value
+    if len(cache) > size:
+        cache.popitem(last=False)
+    return value
+
+
+def deal_model(engine: DeductionEngine) -> DealModel:
+    """Returns the DealModel for the knowledge of engine, from a small LRU
+    cache shared by the posterior and the deal sampler.
+    """
+    return _cached(_model_cache, 32, engine, DealModel)
+
+
+def compute_posterior(engine: DeductionEngine) -> PosteriorResult:
+    """Returns the exact posterior for the knowledge of engine.  Results
+    are kept in a small LRU cache keyed by knowledge_key(), so repeated
+    calls, and bots with identical knowledge, share the work.
+    """
+    return _cached(_posterior_cache, 256, engine, PosteriorResult)
+
+
+class Posterior():
+    """Tracks the posterior of a DeductionEngine as it receives events.
+    It is only recomputed when the engine has deduced something new or
+    started a new game (DeductionEngine.version never repeats), and the
+    counting only covers cards whose owner is still unresolved, so it
+    gets cheaper as the game goes on.
+    """
+
+    def __init__(self, engine: DeductionEngine) -> None:
+        self.engine = engine
+        self.__version: Optional[int] = None
+        self.__result: Optional[PosteriorResult] = None
+
+    def result(self) -> PosteriorResult:
+        """Returns the posterior for the current knowledge of the engine."""
+        if (self.__result is None
+                or self.engine.version != self.__version):
+            self.__result = compute_posterior(self.engine)
+            self.__version = self.engine.version
+        return self.__result
+
+    def scenario_probabilities(self) -> dict[Accusation, float]:
+        """Returns the probability of each envelope with a non zero
+        probability.
+        """
+        return self.result().scenarios
+
+    def card_probabilities(self, card: Card) -> list[float]:
+        """Returns the probability that each owner holds card, with the
+        envelope at index num_players.
+        """
+        return self.result().cards[card]
+
+    def most_likely_scenario(self) -> tuple[Accusation, float]:
+        """Returns the most likely envelope and its probability."""
+        scenarios = self.result().scenarios
+        best = max(scenarios, key=scenarios.get)
+        return best, scenarios[best]
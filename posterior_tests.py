@@ -0,0 +1,172 @@
+import itertools
+import random
+import unittest
+from collections import Counter
+from clue_game import (ALL_CARDS, Accusation, Counterevidence, Location,
+                       Rules, Suggestion, Suspect, Weapon, deal_cards)
+from deduction import DeductionEngine
+from posterior import Posterior, PosteriorResult
+
+
+def brute_force(num_players, player_id, hand, face_up, history, wrong):
+    """Enumerates every deal consistent with the observations."""
+    hidden = [card for card in ALL_CARDS
+              if card not in hand and card not in face_up]
+    hand_size = len(hand)
+    others = [p for p in range(num_players) if p != player_id]
+    scenarios = Counter()
+    cards = {card: [0] * (num_players + 1) for card in ALL_CARDS}
+
+    def consistent(hands):
+        for suggestor_id, suggestion, blocker_id, shown in history:
+            blocker = None
+            for i in range(1, num_players):
+                maybe_blocker = (suggestor_id + i) % num_players
+                if hands[maybe_blocker] & set(suggestion):
+                    blocker = maybe_blocker
+                    break
+            if blocker != blocker_id:
+                return False
+            if shown is not None and shown not in hands[blocker]:
+                return False
+        return True
+
+    def deal(i, remaining, hands, envelope):
+        if i == len(others):
+            if consistent(hands):
+                scenarios[envelope] += 1
+                for owner, held in hands.items():
+                    for card in held:
+                        cards[card][owner] += 1
+                for card in envelope:
+                    cards[card][num_players] += 1
+            return
+        for held in itertools.combinations(remaining, hand_size):
+            hands[others[i]] = set(held)
+            deal(i + 1, [c for c in remaining if c not in held], hands,
+                 envelope)
+
+    for envelope in itertools.product(Suspect, Location, Weapon):
+        if set(envelope) - set(hidden) or envelope in wrong:
+            continue
+        deal(0, [c for c in hidden if c not in envelope],
+             {player_id: set(hand)}, envelope)
+    return scenarios, cards
+
+
+class TestPosterior(unittest.TestCase):
+    def test_matches_brute_force(self):
+        num_players = 3
+        deal = deal_cards(num_players, 2)
+        hands = [set(hand) for hand in deal.hands]
+        engine = DeductionEngine()
+        engine.initialize(0, num_players, deal.face_up_cards, deal.hands[0])
+        rng = random.Random(0)
+        history = []
+        for turn in range(7):
+            suggestor_id = turn % num_players
+            suggestion = Suggestion(rng.choice(list(Suspect)),
+                                    rng.choice(list(Location)),
+                                    rng.choice(list(Weapon)))
+            blocker_id = None
+            for i in range(1, num_players):
+                if hands[(suggestor_id + i) % num_players] & set(suggestion):
+                    blocker_id = (suggestor_id + i) % num_players
+                    break
+            shown = None
+            if suggestor_id == 0:
+                if blocker_id is not None:
+                    shown = [card for card in suggestion
+                             if card in hands[blocker_id]][0]
+                    result = Counterevidence(blocker_id, shown)
+                else:
+                    result = None
+                engine.receive_suggestion_result(suggestion, result)
+            engine.observe_suggestion(suggestor_id, suggestion, blocker_id)
+            history.append((suggestor_id, suggestion, blocker_id, shown))
+        envelope = deal.envelope
+        wrong = (envelope.who, envelope.where,
+                 [w for w in Weapon if w != envelope.what][0])
+        engine.observe_accusation(1, Accusation(*wrong))
+
+        result = PosteriorResult(engine)
+        scenarios, cards = brute_force(num_players, 0, deal.hands[0],
+                                       deal.face_up_cards, history, {wrong})
+        total = sum(scenarios.values())
+        self.assertEqual(result.num_deals, total)
+        self.assertEqual(set(result.scenarios),
+                         {Accusation(*s) for s in scenarios})
+        for scenario, count in scenarios.items():
+            self.assertAlmostEqual(result.scenarios[Accusation(*scenario)],
+                                   count / total)
+        for card in ALL_CARDS:
+            for owner in range(num_players + 1):
+                self.assertAlmostEqual(result.cards[card][owner],
+                                       cards[card][owner] / total)
+
+    def test_determined_envelope(self):
+        engine = DeductionEngine()
+        engine.initialize(0, 3, [], [Suspect.MRS_WHITE, Location.HALL,
+                                     Weapon.ROPE, Suspect.MRS_PEACOCK,
+                                     Location.STUDY, Weapon.DAGGER])
+        suggestion = Suggestion(Suspect.MISS_SCARLETT, Location.BALLROOM,
+                                Weapon.CANDLESTICK)
+        engine.receive_suggestion_result(suggestion, None)
+        posterior = Posterior(engine)
+        self.assertEqual(posterior.most_likely_scenario(),
+                         (Accusation(*suggestion), 1.0))
+        self.assertEqual(posterior.card_probabilities(Location.BALLROOM),
+                         [0.0] * 3 + [1.0])
+        self.assertAlmostEqual(
+            sum(posterior.card_probabilities(Location.LOUNGE)[1:3]), 1.0)
+
+    def test_result_is_cached_until_knowledge_changes(self):
+        engine = DeductionEngine()
+        engine.initialize(0, 4, [Location.HALL, Weapon.ROPE],
+                          [Suspect.MRS_WHITE, Location.STUDY,
+                           Weapon.DAGGER, Location.LOUNGE])
+        posterior = Posterior(engine)
+        first = posterior.result()
+        self.assertIs(posterior.result(), first)
+        self.assertAlmostEqual(sum(first.scenarios.values()), 1.0)
+        engine.observe_suggestion(1, Suggestion(Suspect.MRS_PEACOCK,
+                                                Location.KITCHEN,
+                                                Weapon.SPANNER), 2)
+        self.assertIsNot(posterior.result(), first)
+
+    def test_reused_engine_is_recomputed(self):
+        engine = DeductionEngine()
+        engine.initialize(0, 4, [Location.HALL, Weapon.ROPE],
+                          [Suspect.MRS_WHITE, Location.STUDY,
+                           Weapon.DAGGER, Location.LOUNGE])
+        posterior = Posterior(engine)
+        first = posterior.result()
+        # A new game on the same engine, as after ClueGame.reset().
+        engine.initialize(0, 4, [Location.STUDY, Weapon.DAGGER],
+                          [Suspect.MRS_PEACOCK, Location.HALL,
+                           Weapon.ROPE, Location.KITCHEN])
+        second = posterior.result()
+        self.assertIsNot(second, first)
+        self.assertEqual(second.scenarios, PosteriorResult(engine).scenarios)
+        self.assertEqual(posterior.card_probabilities(Location.HALL),
+                         [1.0] + [0.0] * 4)
+
+    def test_generated_rules(self):
+        rules = Rules.generate(3, 4, 3)
+        deal = deal_cards(3, 5, rules)
+        engine = DeductionEngine(rules)
+        engine.initialize(0, 3, deal.face_up_cards, deal.hands[0])
+        result = PosteriorResult(engine)
+        unseen = [[card for card in category
+                   if card not in deal.hands[0]
+                   and card not in deal.face_up_cards]
+                  for category in rules.categories]
+        self.assertEqual(set(result.scenarios),
+                         {Accusation(*scenario)
+                          for scenario in itertools.product(*unseen)})
+        self.assertAlmostEqual(sum(result.scenarios.values()), 1.0)
+        self.assertIn(Accusation(*deal.envelope), result.scenarios)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,224 @@
+"""Module profiling finds out where the time of games goes, per bot.
+
+SamplingProfiler samples the stack of the thread that plays the games from
+a background thread, at a fixed interval.  Each sample is attributed to the
+bot method that was running, found as the outermost frame of a
+PlayerInterface method on the stack, or to the engine if no bot was
+running.  The bot is named by its class, so that samples of many games and
+seats add up.  Nothing is installed until the profiler is started, so the
+games run at full speed when profiling is off.
+
+Eg. to profile one game:
+
+    with SamplingProfiler() as profiler:
+        ClueGame(players, NullSink()).execute()
+    print(profiler.profile.report())
+    profiler.profile.write_collapsed("game.folded")
+
+run_tournament(profile=True) profiles every worker and merges the results.
+The collapsed stack file has one "frame;frame;frame count" line per stack,
+as read by flamegraph.pl, speedscope and inferno.
+"""
+from collections import Counter
+from typing import Optional
+import os
+import sys
+import threading
+import time
+
+from clue_game import PlayerInterface
+
+# The methods that a sample can be attributed to.
+PLAYER_METHODS = frozenset(
+    name for name, value in vars(PlayerInterface).items()
+    if callable(value) and not name.startswith("_"))
+ENGINE = "engine"
+
+
+class Profile():
+    """Stack samples, attributed to bots.  Profiles of separate threads or
+    processes can be combined with merge().
+
+    Members:
+    interval: The seconds between samples.
+    stacks: Maps a stack to its number of samples.  A stack is a tuple of
+    frame labels, outermost first, that starts with its attribution: ENGINE
+    or "BotClass.method".
+    """
+
+    def __init__(self, interval: float = 0.001) -> None:
+        self.interval = interval
+        self.stacks: Counter[tuple[str, ...]] = Counter()
+
+    def merge(self, other: 'Profile') -> None:
+        """Adds the samples of other into self."""
+        self.stacks.update(other.stacks)
+
+    def samples(self) -> int:
+        """Returns the number of samples."""
+        return sum(self.stacks.values())
+
+    def by_attribution(self) -> Counter[str]:
+        """Returns the number of samples of each bot method, and of the
+        engine.
+        """
+        result: Counter[str] = Counter()
+        for stack, count in self.stacks.items():
+            result[stack[0]] += count
+        return result
+
+    def write_collapsed(self, path: str) -> None:
+        """Writes the samples as a collapsed stack file, for flamegraph
+        tools.
+        """
+        with open(path, "w") as file:
+            for stack, count in sorted(self.stacks.items()):
+                file.write(";".join(label.replace(";", ":")
+                                    for label in stack) +
+                           " " + str(count) + "\n")
+
+    def report(self, top: int = 10) -> str:
+        """Returns the share of samples of each bot, of each of its methods,
+        and its top functions by self time.
+
+        Parameters:
+        top: The number of functions listed per bot.
+        """
+        total = self.samples()
+        lines = [str(total) + " samples every " +
+                 format(self.interval * 1e3, "g") + "ms."]
+        if not total:
+            return "\n".join(lines)
+        bots: dict[str, Counter[str]] = {}
+        functions: dict[str, Counter[str]] = {}
+        for stack, count in self.stacks.items():
+            bot, _, method = stack[0].rpartition(".")
+            if not bot:
+                bot = stack[0]
+            bots.setdefault(bot, Counter())[method] += count
+            leaf = stack[-1] if len(stack) > 1 else stack[0]
+            functions.setdefault(bot, Counter())[leaf] += count
+        for bot, methods in sorted(bots.items(),
+                                   key=lambda item: -item[1].total()):
+            bot_total = methods.total()
+            lines.append(bot + ": " + format(bot_total / total, ".1%"))
+            if bot != ENGINE:
+                lines.append("   " + ", ".join(
+                    method + " " + format(count / total, ".1%")
+                    for method, count in methods.most_common()))
+            for function, count in functions[bot].most_common(top):
+                lines.append("      " + format(count / total, "6.1%") +
+                             "  " + function)
+        return "\n".join(lines)
+
+
+def _label(frame) -> str:
+    """Returns module:function, or module:Class.method for a method.  The
+    class is that of self, since code.co_qualname needs python 3.11.
+    """
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    if code.co_argcount and code.co_varnames[0] == "self":
+        instance = frame.f_locals.get("self")
+        if instance is not None:
+            return (module + ":" + type(instance).__name__ + "." +
+                    code.co_name)
+    return module + ":" + code.co_name
+
+
+def _attribution(frames: list) -> str:
+    """Returns the bot method of the outermost frame that is a method of a
+    PlayerInterface outside of this package's proxies, or ENGINE.
+
+    Parameters:
+    frames: The stack, outermost first.
+    """
+    for frame in frames:
+        if frame.f_code.co_name not in PLAYER_METHODS:
+            continue
+        player = frame.f_locals.get("self")
+        if (isinstance(player, PlayerInterface)
+                and type(player).__module__ != "clue_game"):
+            return type(player).__name__ + "." + frame.f_code.co_name
+    return ENGINE
+
+
+class SamplingProfiler():
+    """Samples the stack of one thread into a Profile.
+
+    The sampling thread needs the GIL to take a sample, so while running,
+    the interpreter's switch interval is lowered to the sampling interval.
+
+    Members:
+    profile: The samples taken so far.
+    """
+
+    def __init__(self,
+                 interval: float = 0.001,
+                 profile: Optional[Profile] = None) -> None:
+        """Constructs the SamplingProfiler.
+
+        Parameters:
+        interval: The seconds between samples.
+        profile: Adds the samples to this Profile.  Defaults to a new one.
+        """
+        self.interval = interval
+        self.profile = Profile(interval) if profile is None else profile
+        self.__thread: Optional[threading.Thread] = None
+        self.__stopping = threading.Event()
+        self.__switch_interval = 0.0
+
+    def start(self, thread_id: Optional[int] = None) -> None:
+        """Starts sampling.
+
+        Parameters:
+        thread_id: The thread to sample.  Defaults to the calling thread.
+        """
+        assert self.__thread is None
+        if thread_id is None:
+            thread_id = threading.get_ident()
+        self.__stopping.clear()
+        self.__switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self.__switch_interval, self.interval))
+        self.__thread = threading.Thread(target=self.__sample,
+                                         args=(thread_id,), daemon=True,
+                                         name="SamplingProfiler")
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """Stops sampling."""
+        if self.__thread is None:
+            return
+        self.__stopping.set()
+        self.__thread.join()
+        self.__thread = None
+        sys.setswitchinterval(self.__switch_interval)
+
+    def __enter__(self) -> 'SamplingProfiler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def __sample(self, thread_id: int) -> None:
+        stacks = self.profile.stacks
+        next_sample = time.perf_counter()
+        while not self.__stopping.is_set():
+            frame = sys._current_frames().get(thread_id)
+            frames = []
+            while frame is not None:
+                frames.append(frame)
+                frame = frame.f_back
+            del frame
+            if frames:
+                frames.reverse()
+                stacks[(_attribution(frames),) +
+                       tuple(_label(frame) for frame in frames)] += 1
+            del frames
+            next_sample += self.interval
+            delay = next_sample - time.perf_counter()
+            if delay > 0:
+                self.__stopping.wait(delay)
+            else:
+                next_sample = time.perf_counter()
@@ -0,0 +1,74 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from clue_game import ClueGame, NullSink
+from profiling import ENGINE, Profile, SamplingProfiler
+from sample_bot import SampleBot
+from tournament import run_tournament
+
+
+class BusyBot(SampleBot):
+    def take_turn(self):
+        end = time.perf_counter() + 0.002
+        while time.perf_counter() < end:
+            pass
+        return super().take_turn()
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_samples_are_attributed_to_the_running_bot(self):
+        profile = Profile()
+        ClueGame([BusyBot(), SampleBot(), SampleBot()], NullSink(), seed=1,
+                 profile=profile).execute()
+        attributions = profile.by_attribution()
+        self.assertGreater(profile.samples(), 0)
+        self.assertEqual(attributions.most_common(1)[0][0],
+                         "BusyBot.take_turn")
+        self.assertIn("BusyBot", profile.report())
+
+    def test_engine_samples(self):
+        with SamplingProfiler(0.0005) as profiler:
+            end = time.perf_counter() + 0.02
+            while time.perf_counter() < end:
+                pass
+        self.assertEqual(set(profiler.profile.by_attribution()), {ENGINE})
+
+    def test_switch_interval_is_restored(self):
+        before = sys.getswitchinterval()
+        with SamplingProfiler(0.0001):
+            self.assertLessEqual(sys.getswitchinterval(), 0.0001)
+        self.assertEqual(sys.getswitchinterval(), before)
+
+
+class TestProfile(unittest.TestCase):
+    def test_merge_and_collapsed_stacks(self):
+        first, second = Profile(), Profile()
+        first.stacks[(ENGINE, "main:main", "clue_game:f")] += 2
+        second.stacks[(ENGINE, "main:main", "clue_game:f")] += 1
+        second.stacks[("SampleBot.take_turn", "main:main")] += 4
+        first.merge(second)
+        self.assertEqual(first.samples(), 7)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profile.folded")
+            first.write_collapsed(path)
+            with open(path) as file:
+                lines = file.read().splitlines()
+        self.assertEqual(lines, ["SampleBot.take_turn;main:main 4",
+                                 "engine;main:main;clue_game:f 3"])
+
+    def test_tournament(self):
+        result = run_tournament([BusyBot, SampleBot, SampleBot], 3,
+                                max_workers=1, seed=2, profile=True)
+        self.assertIn("BusyBot.take_turn",
+                      result.profile.by_attribution())
+        labels = {label for stack in result.profile.stacks
+                  for label in stack[1:]}
+        self.assertIn("profiling_tests:BusyBot.take_turn", labels)
+        self.assertIsNone(run_tournament([SampleBot] * 3, 3, max_workers=1,
+                                         seed=2).profile)
+
+
+if __name__ == '__main__':
+    unittest.main()
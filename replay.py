@@ -0,0 +1,273 @@
+"""Module replay feeds a recorded game to one bot, and checks whether the
+bot still makes the same choices as in the record.
+
+Only the replayed seat is instantiated.  Everything the other players did
+comes from the record, so their randomness cannot break the comparison,
+and a game replays in well under a millisecond for simple bots.  When the
+bot's choice diverges from the record, the divergence is reported and the
+replay carries on with the recorded choice, so the bot keeps seeing the
+game that was actually played.
+
+Eg. to check that a change to MyBot does not alter its behavior:
+
+    corpus = [record_game([MyBot(), SampleBot(), SampleBot()], seed=i)
+              for i in range(1000)]
+    ... change MyBot ...
+    for game in corpus:
+        assert not game.replay(MyBot(), 0).divergences
+
+ReplayTestCase wraps that in a unittest assertion.
+"""
+from typing import Callable, NamedTuple, Optional, Union
+import unittest
+
+from clue_game import (CLASSIC_RULES, Accusation, AccusationEvent,
+                       BlockEvent, BudgetEvent, BufferedSink, Card, ClueGame,
+                       Counterevidence, DealEvent, EliminationEvent,
+                       GameEvent, PlayerFailureEvent, PlayerInterface, Rules,
+                       Scenario, Seed, Suggestion, SuggestionEvent, WinEvent,
+                       card_from_value, interned_accusation,
+                       interned_suggestion)
+from game_records import (ACCUSATION, FAILURE, FAILURE_METHODS, FORFEIT,
+                          OVER_BUDGET, SUGGESTION_METHODS, GameRecords)
+
+
+class Divergence(NamedTuple):
+    """A choice of the replayed bot that differs from the record.
+
+    Members:
+    event_index: The index of the recorded event of the choice.
+    method: "take_turn" or "respond_to_suggestion".
+    recorded: The choice in the record.
+    replayed: The choice made by the bot.
+    """
+    event_index: int
+    method: str
+    recorded: Union[Suggestion, Accusation, Card]
+    replayed: Union[Suggestion, Accusation, Card, None]
+
+
+class ReplayResult(NamedTuple):
+    """The outcome of replaying one seat of a game.
+
+    Members:
+    player_id: The replayed seat.
+    decisions: The number of choices compared with the record.
+    divergences: The choices that differed, in game order.
+    """
+    player_id: int
+    decisions: int
+    divergences: list[Divergence]
+
+
+class RecordedGame():
+    """The event stream of one game, as emitted by ClueGame.
+
+    Members:
+    events: The events, starting with the DealEvent.
+    num_players: The number of players.
+    rules: The cards of the game.
+    """
+
+    def __init__(self,
+                 events: list[GameEvent],
+                 rules: Rules = CLASSIC_RULES) -> None:
+        """Constructs the RecordedGame.
+
+        Preconditions:
+        events: Starts with a DealEvent, and has every SuggestionEvent
+        followed by its BlockEvent.
+        """
+        assert isinstance(events[0], DealEvent)
+        self.events = events
+        self.num_players: int = len(events[0].hands)
+        self.rules = rules
+
+    @staticmethod
+    def from_records(records: GameRecords,
+                     game_index: int) -> 'RecordedGame':
+        """Rebuilds the events of a game stored in a game_records file.
+        Hands are in the order of the card values, and player names,
+        budget times and failure messages are not recorded.  Failures
+        during the start of the game follow the DealEvent.
+        """
+        game = records.games[game_index]
+        num_players = int(game["num_players"])
+        hands: list[list[Card]] = [[] for _ in range(num_players)]
+        envelope: list[Card] = []
+        face_up_cards: list[Card] = []
+        for card, owner_id in zip(records.rules.all_cards,
+                                  game["owners"].tolist()):
+            if owner_id < 0:
+                face_up_cards.append(card)
+            elif owner_id == num_players:
+                envelope.append(card)
+            else:
+                hands[owner_id].append(card)
+        events: list[GameEvent] = [DealEvent(Scenario(*envelope),
+                                             [""] * num_players, hands,
+                                             face_up_cards)]
+        players_remaining = num_players
+        winner_id = int(game["winner"])
+        for actor, kind, who, where, what, blocker_id, shown \
+                in records.game_turns(game_index).tolist():
+            if kind == FORFEIT:
+                events.append(BudgetEvent(actor, "take_turn", 0.0, False))
+                continue
+            if kind == OVER_BUDGET:
+                events.append(BudgetEvent(actor, "game", 0.0, True))
+                continue
+            if kind == FAILURE:
+                method = FAILURE_METHODS[who]
+                failure = PlayerFailureEvent(actor, method, "")
+                if method in SUGGESTION_METHODS:
+                    # It happened before the BlockEvent of the suggestion.
+                    events.insert(len(events) - 1, failure)
+                else:
+                    events.append(failure)
+                continue
+            who, where, what = (card_from_value(who),
+                                card_from_value(where),
+                                card_from_value(what))
+            if kind == ACCUSATION:
+                accusation = interned_accusation(who, where, what)
+                events.append(AccusationEvent(actor, accusation))
+                if actor == winner_id and accusation == events[0].envelope:
+                    events.append(WinEvent(actor))
+                else:
+                    players_remaining -= 1
+                    events.append(EliminationEvent(actor, players_remaining))
+            else:
+                suggestion = interned_suggestion(who, where, what)
+                events.append(SuggestionEvent(actor, suggestion))
+                events.append(BlockEvent(
+                    actor, suggestion,
+                    None if blocker_id < 0 else blocker_id,
+                    None if shown == 0 else card_from_value(shown)))
+        return RecordedGame(events, records.rules)
+
+    def replay(self,
+               player: PlayerInterface,
+               player_id: int,
+               stop_at_divergence: bool = False) -> ReplayResult:
+        """Plays the recorded game with player in seat player_id.
+
+        Preconditions:
+        player: Freshly constructed, initialize() has not been called.
+        player_id: 0 <= player_id < self.num_players
+
+        Parameters:
+        player: The bot to replay.
+        player_id: The seat of the bot.
+        stop_at_divergence: Whether to stop at the first divergence.
+
+        Returns:
+        The choices where the bot diverged from the record.
+        """
+        deal = self.events[0]
+        player.receive_rules(self.rules)
+        player.initialize(player_id, self.num_players,
+                          list(deal.face_up_cards),
+                          list(deal.hands[player_id]))
+        decisions = 0
+        divergences: list[Divergence] = []
+        suggestion: Optional[Suggestion] = None
+        for event_index, event in enumerate(self.events):
+            replayed = recorded = method = None
+            if isinstance(event, SuggestionEvent):
+                suggestion = event.suggestion
+                if event.suggestor_id == player_id:
+                    method = "take_turn"
+                    recorded = event.suggestion
+                    replayed = player.take_turn()
+            elif isinstance(event, BlockEvent):
+                # SuggestionEvent compared the suggestion itself.
+                if (event.blocker_id == player_id
+                        and event.suggestor_id != player_id):
+                    method = "respond_to_suggestion"
+                    recorded = event.card
+                    replayed = player.respond_to_suggestion(
+                        event.suggestor_id, suggestion)
+                if event.suggestor_id == player_id:
+                    player.receive_suggestion_result(
+                        suggestion, None if event.blocker_id is None
+                        else Counterevidence(event.blocker_id, event.card))
+                player.observe_suggestion(event.suggestor_id, suggestion,
+                                          event.blocker_id)
+            elif isinstance(event, AccusationEvent):
+                if event.accusor_id == player_id:
+                    method = "take_turn"
+                    recorded = event.accusation
+                    replayed = player.take_turn()
+            elif isinstance(event, EliminationEvent):
+                accusation = self.events[event_index - 1].accusation
+                player.observe_accusation(event.player_id, accusation)
+            elif isinstance(event, BudgetEvent):
+                if event.player_id == player_id and not event.eliminated:
+                    # The turn was taken but forfeited.
+                    player.take_turn()
+            elif isinstance(event, PlayerFailureEvent):
+                if event.player_id == player_id:
+                    break
+            if method is None:
+                continue
+            decisions += 1
+            if (type(replayed) is not type(recorded)
+                    or replayed != recorded):
+                divergences.append(Divergence(event_index, method, recorded,
+                                              replayed))
+                if stop_at_divergence:
+                    break
+        return ReplayResult(player_id, decisions, divergences)
+
+
+def record_game(players: list[PlayerInterface],
+                seed: Seed = None,
+                rules: Rules = CLASSIC_RULES) -> RecordedGame:
+    """Plays a headless game and returns its record."""
+    sink = BufferedSink()
+    ClueGame(players, sink, seed=seed, rules=rules).execute()
+    return RecordedGame(sink.events, rules)
+
+
+def load_corpus(path: str,
+                rules: Rules = CLASSIC_RULES) -> list[RecordedGame]:
+    """Returns every game of the game_records file set at path, written
+    with rules.
+    """
+    records = GameRecords(path, rules)
+    return [RecordedGame.from_records(records, game_index)
+            for game_index in range(len(records))]
+
+
+class ReplayTestCase(unittest.TestCase):
+    """A TestCase with an assertion that a bot replays recorded games
+    without diverging.
+    """
+
+    def assertReplays(self,
+                      make_player: Callable[[], PlayerInterface],
+                      games: list[RecordedGame],
+                      player_ids: Optional[list[int]] = None) -> None:
+        """Fails at the first game where a fresh player from make_player
+        makes a different choice than recorded.
+
+        Parameters:
+        make_player: Creates the bot to replay.
+        games: The recorded games.
+        player_ids: The seats to replay.  Defaults to every seat.
+        """
+        for game_index, game in enumerate(games):
+            seats = (range(game.num_players) if player_ids is None
+                     else player_ids)
+            for player_id in seats:
+                result = game.replay(make_player(), player_id,
+                                     stop_at_divergence=True)
+                if result.divergences:
+                    divergence = result.divergences[0]
+                    self.fail("game " + str(game_index) + ", player " +
+                              str(player_id) + ", event " +
+                              str(divergence.event_index) + ": " +
+                              divergence.method + " returned " +
+                              repr(divergence.replayed) + ", recorded " +
+                              repr(divergence.recorded))
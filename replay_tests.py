@@ -0,0 +1,156 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+from clue_game import (BufferedSink, BudgetEvent, ClueGame, DealEvent,
+                       PlayerFailure, PlayerFailureEvent, RoundEvent, Rules,
+                       TimeoutEvent)
+from deduction_bot import DeductionBot
+from game_records import GameRecordWriter
+from replay import ReplayTestCase, load_corpus, record_game
+
+
+def first(sequence):
+    return sequence[0]
+
+
+class StubbornBot(DeductionBot):
+    """Shows the last matching card instead of the first."""
+
+    def respond_to_suggestion(self, suggestor_id, suggestion):
+        matches = [card for card in suggestion
+                   if card in self.face_down_cards]
+        return matches[-1] if matches else None
+
+
+class SlowBot(DeductionBot):
+    """Takes too long for every other turn."""
+
+    def take_turn(self):
+        self.turns = getattr(self, "turns", 0) + 1
+        if self.turns % 2:
+            time.sleep(0.003)
+        return super().take_turn()
+
+
+class FailsToInitialize(DeductionBot):
+    def initialize(self, *args):
+        raise PlayerFailure("initialize")
+
+
+class FailsToRespond(DeductionBot):
+    def respond_to_suggestion(self, suggestor_id, suggestion):
+        raise PlayerFailure("respond_to_suggestion")
+
+
+class FailsToReceiveResult(DeductionBot):
+    def receive_suggestion_result(self, suggestion, result):
+        raise PlayerFailure("receive_suggestion_result")
+
+
+class FailsToObserve(DeductionBot):
+    def observe_suggestion(self, suggestor_id, suggestion, blocker_id):
+        raise PlayerFailure("observe_suggestion")
+
+
+def comparable(events):
+    """Returns events as a game record rebuilds them."""
+    deal = next(event for event in events if isinstance(event, DealEvent))
+    start = events.index(deal)
+    result = [DealEvent(deal.envelope, [""] * len(deal.hands),
+                        [sorted(hand) for hand in deal.hands],
+                        sorted(deal.face_up_cards))]
+    # Failures during the start of a game are recorded after the deal.
+    for event in events[:start] + events[start + 1:]:
+        if isinstance(event, BudgetEvent):
+            event = event._replace(seconds=0.0)
+        elif isinstance(event, PlayerFailureEvent):
+            event = event._replace(message="")
+        elif isinstance(event, (RoundEvent, TimeoutEvent)):
+            continue
+        result.append(event)
+    return result
+
+
+@mock.patch("deduction_bot.choice", first)
+class TestReplay(ReplayTestCase):
+    def record(self, num_games, num_players=4):
+        return [record_game([DeductionBot() for _ in range(num_players)],
+                            seed=seed)
+                for seed in range(num_games)]
+
+    def test_same_bot_does_not_diverge(self):
+        games = self.record(10)
+        for game in games:
+            for player_id in range(4):
+                result = game.replay(DeductionBot(), player_id)
+                self.assertEqual(result.divergences, [])
+        self.assertGreater(games[0].replay(DeductionBot(), 0).decisions, 0)
+        self.assertReplays(DeductionBot, games)
+
+    def test_changed_bot_diverges(self):
+        games = self.record(10)
+        divergences = [divergence for game in games
+                       for player_id in range(4)
+                       for divergence in game.replay(StubbornBot(),
+                                                     player_id).divergences]
+        self.assertTrue(divergences)
+        self.assertIn("respond_to_suggestion",
+                      [divergence.method for divergence in divergences])
+        with self.assertRaises(AssertionError):
+            self.assertReplays(StubbornBot, games)
+
+    def test_replays_binary_records(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "games")
+            with GameRecordWriter(path) as writer:
+                for seed in range(10):
+                    ClueGame([DeductionBot() for _ in range(3)], writer,
+                             seed=seed).execute()
+            corpus = load_corpus(path)
+        self.assertEqual(len(corpus), 10)
+        self.assertReplays(DeductionBot, corpus)
+
+    def test_binary_records_keep_budgets_and_failures(self):
+        tables = [[FailsToInitialize(), SlowBot(), DeductionBot()],
+                  [SlowBot(), FailsToRespond(), DeductionBot(),
+                   FailsToReceiveResult()],
+                  [DeductionBot(), FailsToObserve(), SlowBot()]]
+        sink = BufferedSink()
+        kinds = set()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "games")
+            with GameRecordWriter(path) as writer:
+                for seed, players in enumerate(tables):
+                    sink.events = []
+                    ClueGame(players, sink, seed=seed, call_budget=0.002,
+                             game_budget=0.01).execute()
+                    for event in sink.events:
+                        writer.emit(event)
+                    expected = comparable(sink.events)
+                    kinds.update(event.method for event in expected
+                                 if isinstance(event, (BudgetEvent,
+                                                       PlayerFailureEvent)))
+                    writer.flush()
+                    [game] = load_corpus(path)[seed:]
+                    self.assertEqual(comparable(game.events), expected)
+        self.assertEqual(kinds, {"initialize", "take_turn", "game",
+                                 "respond_to_suggestion",
+                                 "receive_suggestion_result",
+                                 "observe_suggestion"})
+
+    def test_replays_generated_rules(self):
+        rules = Rules.generate(4, 5, 4)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "games")
+            with GameRecordWriter(path, rules) as writer:
+                for seed in range(5):
+                    ClueGame([DeductionBot() for _ in range(5)], writer,
+                             seed=seed, rules=rules).execute()
+            corpus = load_corpus(path, rules)
+        self.assertReplays(DeductionBot, corpus)
+
+
+if __name__ == '__main__':
+    unittest.main()
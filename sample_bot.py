@@ -14,6 +14,10 @@ class SampleBot(PlayerInterface):
         self.num_players = None
         self.face_up_cards = None
         self.face_down_cards = None
+        self.rules = CLASSIC_RULES
+
+    def receive_rules(self, rules: Rules) -> None:
+        self.rules = rules
 
     def initialize(self,
                    player_id: int,
@@ -29,14 +33,14 @@ class SampleBot(PlayerInterface):
         return "sample_bot"
 
     def take_turn(self) -> Union[Suggestion, Accusation]:
-        who = choice([suspect for suspect in Suspect])
-        where = choice([location for location in Location])
-        what = choice([weapon for weapon in Weapon])
+        who = choice(self.rules.suspects)
+        where = choice(self.rules.locations)
+        what = choice(self.rules.weapons)
         # 1 in 20 chance of accusing.  Otherwise just makes a suggestion.
         if randint(1, 20) == 20:
-            return Accusation(who, where, what)
+            return interned_accusation(who, where, what)
         else:
-            return Suggestion(who, where, what)
+            return interned_suggestion(who, where, what)
 
     def respond_to_suggestion(self,
                               suggestor_id: int,
@@ -0,0 +1,196 @@
+"""Module suggestion_optimizer scores every possible Suggestion by how much
+it is expected to reveal about the envelope.
+
+The probability model is a set of (weighted) full deals, eg. drawn by a
+deal_sampler.DealSampler.  For each deal and each possible suggestion (324
+with the classic cards), the outcome the suggestor would see is computed
+in one vectorized pass: the first player clockwise who holds a suggested
+card blocks, and shows one of their matching cards (assumed uniformly at
+random).  The expected
+information gain of a suggestion is the mutual information between that
+outcome and the envelope, in bits.
+"""
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from clue_game import CLASSIC_RULES, SUGGESTIONS, Rules, Suggestion
+from deal_sampler import DealSampler
+from deduction import DeductionEngine
+
+
+class _SuggestionTable(NamedTuple):
+    """The suggestions of one Rules, and their cards as arrays.
+
+    Members:
+    suggestions: Every suggestion, in scenario order.
+    cards: The card values of every suggestion, one row per suggestion.
+    categories: The card values of each category.
+    """
+    suggestions: list[Suggestion]
+    cards: np.ndarray
+    categories: list[np.ndarray]
+
+
+_suggestion_tables: dict[Rules, _SuggestionTable] = {}
+
+
+def _suggestion_table(rules: Rules) -> _SuggestionTable:
+    table = _suggestion_tables.get(rules)
+    if table is None:
+        suggestions = (SUGGESTIONS if rules is CLASSIC_RULES
+                       else [Suggestion(who, where, what)
+                             for who in rules.suspects
+                             for where in rules.locations
+                             for what in rules.weapons])
+        table = _suggestion_tables[rules] = _SuggestionTable(
+            suggestions,
+            np.array([list(suggestion) for suggestion in suggestions]),
+            [np.array(category) for category in rules.categories])
+    return table
+
+
+def _entropy(probabilities: np.ndarray, axis=None) -> np.ndarray:
+    """Returns -sum(p * log2(p)), treating 0 * log(0) as 0."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        terms = np.where(probabilities > 0,
+                         probabilities * np.log2(probabilities), 0.0)
+    return -terms.sum(axis=axis)
+
+
+def information_gain(owners: np.ndarray,
+                     player_id: int,
+                     num_players: int,
+                     weights: Optional[np.ndarray] = None,
+                     rules: Rules = CLASSIC_RULES) -> np.ndarray:
+    """Returns the expected information gain about the envelope of each
+    suggestion, if made by player_id.
+
+    Parameters:
+    owners: (N, max card value + 1) int array with the owner id of every
+    card of N deals, indexed by Card.value.  The envelope is num_players,
+    face up cards are negative.
+    player_id: The player making the suggestion.
+    num_players: The number of players.
+    weights: (N,) probabilities of the deals.  Defaults to equal weights.
+    rules: The cards of the deals.
+
+    Returns:
+    (rules.num_scenarios,) float array of bits, indexed like SUGGESTIONS
+    for the classic cards, and in the same (who, where, what) order for
+    other rules.
+    """
+    table = _suggestion_table(rules)
+    num_deals = len(owners)
+    if weights is None:
+        weights = np.full(num_deals, 1.0 / num_deals)
+    else:
+        weights = weights / weights.sum()
+    num_suggestions = rules.num_scenarios
+
+    # The envelope of every deal, numbered densely among the envelopes of
+    # the deals, so that the joint distribution stays small for large decks.
+    envelope = owners == num_players
+    suspects, locations, weapons = table.categories
+    scenario = (np.argmax(envelope[:, suspects], axis=1)
+                * (len(locations) * len(weapons)) +
+                np.argmax(envelope[:, locations], axis=1) * len(weapons) +
+                np.argmax(envelope[:, weapons], axis=1))
+    scenario = np.unique(scenario, return_inverse=True)[1].reshape(-1)
+    num_envelopes = int(scenario.max()) + 1
+
+    # (N, suggestions, 3): how many seats clockwise of player_id each
+    # suggested card is, or num_players if nobody else holds it.
+    card_owners = owners[:, table.cards]
+    held_by_other = ((card_owners >= 0) & (card_owners < num_players)
+                     & (card_owners != player_id))
+    distance = np.where(held_by_other,
+                        (card_owners - player_id) % num_players, num_players)
+    blocker_distance = distance.min(axis=2)
+    shows = (distance == blocker_distance[:, :, None]) & held_by_other
+    num_shown = shows.sum(axis=2)
+
+    # Outcome 0 is "nobody blocked", otherwise it identifies the blocker
+    # and which of the three suggested cards was shown.
+    num_outcomes = 1 + 3 * (num_players - 1)
+    base = (np.arange(num_suggestions) * num_outcomes)[None, :]
+    joint = np.zeros(num_suggestions * num_outcomes * num_envelopes)
+    unblocked = num_shown == 0
+    keys = (base * num_envelopes + scenario[:, None])
+    joint += np.bincount(keys[unblocked],
+                         np.broadcast_to(weights[:, None],
+                                         keys.shape)[unblocked],
+                         minlength=joint.size)
+    share = np.where(unblocked, 0.0,
+                     weights[:, None] / np.maximum(num_shown, 1))
+    for position in range(3):
+        outcome = 1 + (blocker_distance - 1) * 3 + position
+        shown = shows[:, :, position]
+        keys = (base + outcome) * num_envelopes + scenario[:, None]
+        joint += np.bincount(keys[shown], share[shown], minlength=joint.size)
+    joint = joint.reshape(num_suggestions, num_outcomes, num_envelopes)
+
+    envelope_entropy = _entropy(np.bincount(scenario, weights,
+                                            minlength=num_envelopes))
+    outcome_entropy = _entropy(joint.sum(axis=2), axis=1)
+    joint_entropy = _entropy(joint.reshape(num_suggestions, -1), axis=1)
+    # I(S; O) = H(S) + H(O) - H(S, O)
+    return envelope_entropy + outcome_entropy - joint_entropy
+
+
+def rank_suggestions(owners: np.ndarray,
+                     player_id: int,
+                     num_players: int,
+                     weights: Optional[np.ndarray] = None,
+                     rules: Rules = CLASSIC_RULES
+                     ) -> list[tuple[Suggestion, float]]:
+    """Returns every suggestion with its expected information gain, best
+    first.  Parameters are the same as information_gain().
+    """
+    gains = information_gain(owners, player_id, num_players, weights, rules)
+    order = np.argsort(-gains, kind="stable")
+    suggestions = _suggestion_table(rules).suggestions
+    return [(suggestions[i], float(gains[i])) for i in order]
+
+
+class SuggestionOptimizer():
+    """Ranks the suggestions of a player using deals sampled from its
+    DeductionEngine.  The ranking is cached until the engine learns
+    something new or starts a new game, so repeated calls within a turn
+    are free.
+    """
+
+    def __init__(self,
+                 engine: DeductionEngine,
+                 num_samples: int = 1000,
+                 sampler: Optional[DealSampler] = None) -> None:
+        """Constructs the SuggestionOptimizer.
+
+        Parameters:
+        engine: The knowledge of the player making suggestions.
+        num_samples: The number of deals to score the suggestions against.
+        sampler: Draws the deals.  Defaults to a new DealSampler of engine.
+        """
+        self.engine = engine
+        self.num_samples = num_samples
+        self.sampler = DealSampler(engine) if sampler is None else sampler
+        self.__version: Optional[int] = None
+        self.__ranking: list[tuple[Suggestion, float]] = []
+
+    def ranking(self) -> list[tuple[Suggestion, float]]:
+        """Returns every suggestion with its expected information gain,
+        best first.
+        """
+        if self.__version != self.engine.version:
+            owners = np.array(self.sampler.draw(self.num_samples))
+            self.__ranking = rank_suggestions(owners, self.engine.player_id,
+                                              self.engine.num_players,
+                                              rules=self.engine.rules)
+            self.__version = self.engine.version
+        return self.__ranking
+
+    def best(self) -> Suggestion:
+        """Returns the suggestion with the highest expected information
+        gain.
+        """
+        return self.ranking()[0][0]
@@ -0,0 +1,90 @@
+import math
+import random
+import unittest
+from collections import defaultdict
+import numpy as np
+from clue_game import (Location, Rules, Suggestion, Suspect, Weapon,
+                       deal_cards)
+from deal_sampler import DealSampler, observe_random_suggestions
+from deduction import DeductionEngine
+from suggestion_optimizer import (SUGGESTIONS, SuggestionOptimizer,
+                                  information_gain)
+
+
+def slow_information_gain(deals, player_id, num_players, suggestion):
+    """Computes the gain of one suggestion with plain loops."""
+    joint = defaultdict(float)
+    for owners in deals:
+        envelope = tuple(c for c in range(1, 22) if owners[c] == num_players)
+        blocker = None
+        for i in range(1, num_players):
+            seat = (player_id + i) % num_players
+            if any(owners[card] == seat for card in suggestion):
+                blocker = seat
+                break
+        if blocker is None:
+            joint[None, envelope] += 1 / len(deals)
+            continue
+        shown = [card for card in suggestion if owners[card] == blocker]
+        for card in shown:
+            joint[(blocker, card), envelope] += 1 / len(deals) / len(shown)
+    outcomes = defaultdict(float)
+    envelopes = defaultdict(float)
+    for (outcome, envelope), p in joint.items():
+        outcomes[outcome] += p
+        envelopes[envelope] += p
+    return sum(p * math.log2(p / outcomes[o] / envelopes[e])
+               for (o, e), p in joint.items())
+
+
+class TestInformationGain(unittest.TestCase):
+    def setUp(self):
+        deal = deal_cards(4, 6)
+        self.engine = DeductionEngine()
+        self.engine.initialize(1, 4, deal.face_up_cards, deal.hands[1])
+        observe_random_suggestions(self.engine,
+                                   [set(hand) for hand in deal.hands], 6,
+                                   random.Random(4))
+        self.deals = DealSampler(self.engine, 5).draw(300)
+
+    def test_matches_loops(self):
+        gains = information_gain(np.array(self.deals), 1, 4)
+        for index in random.Random(0).sample(range(len(SUGGESTIONS)), 25):
+            self.assertAlmostEqual(
+                gains[index],
+                slow_information_gain(self.deals, 1, 4, SUGGESTIONS[index]))
+
+    def test_ranking_is_cached(self):
+        optimizer = SuggestionOptimizer(self.engine, 200)
+        ranking = optimizer.ranking()
+        self.assertIs(optimizer.ranking(), ranking)
+        self.assertEqual(len(ranking), 324)
+        self.assertEqual(optimizer.best(), ranking[0][0])
+        self.assertGreaterEqual(ranking[0][1], ranking[-1][1])
+
+    def test_reused_engine_is_reranked(self):
+        optimizer = SuggestionOptimizer(self.engine, 200)
+        first = dict(optimizer.ranking())
+        # A new game on the same engine, as after ClueGame.reset().
+        own = Suggestion(Suspect.MRS_WHITE, Location.HALL, Weapon.ROPE)
+        self.engine.initialize(1, 3, [], list(own) + [Suspect.MRS_PEACOCK,
+                                                      Location.STUDY,
+                                                      Weapon.DAGGER])
+        second = dict(optimizer.ranking())
+        # Nobody else can show a card of the player's own hand.
+        self.assertGreater(first[own], 0)
+        self.assertAlmostEqual(second[own], 0)
+
+    def test_generated_rules(self):
+        rules = Rules.generate(4, 5, 4)
+        deal = deal_cards(5, 2, rules)
+        engine = DeductionEngine(rules)
+        engine.initialize(0, 5, deal.face_up_cards, deal.hands[0])
+        ranking = SuggestionOptimizer(engine, 100).ranking()
+        self.assertEqual(len(ranking), rules.num_scenarios)
+        self.assertIn(ranking[0][0].who, rules.suspects)
+        self.assertGreater(ranking[0][1], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
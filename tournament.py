@@ -0,0 +1,615 @@
+"""Module tournament runs many games of Clue in parallel and aggregates
+how often each bot, and each seat, wins.
+
+Eg. `python tournament.py` plays a tournament between SampleBots.
+
+compare_bots() runs an A/B comparison of two bots that stops as soon as
+the result is significant.
+"""
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from math import log, sqrt
+from statistics import NormalDist
+from typing import Callable, Iterator, NamedTuple, Optional
+import os
+import random
+import time
+
+from clue_game import (CallStats, ClueGame, NullSink, PlayerInterface,
+                       derive_seed)
+from profiling import Profile, SamplingProfiler
+
+BotFactory = Callable[[], PlayerInterface]
+
+
+class Histogram():
+    """Counts of small non-negative integers, eg. the number of rounds of
+    each game.  Memory grows with the largest value, not with the number of
+    values, and histograms are merged by adding their counts.
+
+    Members:
+    counts: counts[value] is the number of times value was added.
+    """
+    __slots__ = ("counts",)
+
+    def __init__(self) -> None:
+        self.counts: list[int] = []
+
+    def add(self, value: int) -> None:
+        """Counts one more value."""
+        if value >= len(self.counts):
+            self.counts.extend([0] * (value + 1 - len(self.counts)))
+        self.counts[value] += 1
+
+    def merge(self, other: 'Histogram') -> None:
+        """Adds the counts of other into self."""
+        if len(other.counts) > len(self.counts):
+            self.counts.extend([0] * (len(other.counts) - len(self.counts)))
+        for value, count in enumerate(other.counts):
+            self.counts[value] += count
+
+    def total(self) -> int:
+        """Returns the number of values counted."""
+        return sum(self.counts)
+
+    def quantile(self, q: float) -> int:
+        """Returns the smallest value that at least a fraction q of the
+        values are at most, or 0 if the histogram is empty.
+
+        Preconditions:
+        q: 0 <= q <= 1
+        """
+        rank = q * self.total()
+        seen = 0
+        for value, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return value
+        return 0
+
+    def summary(self) -> str:
+        """Returns the p10, p50, p90 and largest value as a string."""
+        return ("p10 " + str(self.quantile(0.1)) + ", p50 " +
+                str(self.quantile(0.5)) + ", p90 " +
+                str(self.quantile(0.9)) + ", max " +
+                str(self.quantile(1.0)))
+
+
+class TournamentResult():
+    """Aggregated results of many games.  Results of partial tournaments
+    (eg. from separate worker processes) can be combined with merge().
+    Memory does not grow with the number of games.
+
+    Members:
+    bot_names: A label for each bot factory, indexed like the factories.
+    num_players: The number of players at each table.
+    seed: The base seed of the tournament.  Rerunning with it reproduces
+    the same deals.
+    games: The number of games played.
+    games_without_winner: The number of games that nobody won.
+    total_rounds: The number of rounds summed over all games.
+    total_turns: The number of turns summed over all games.
+    total_eliminations: The number of incorrect accusations over all games.
+    rounds: The number of games that lasted each number of rounds.
+    bot_games: The number of seats each bot occupied, summed over games.
+    bot_wins: The number of games each bot won.
+    bot_eliminations: The number of incorrect accusations of each bot.
+    seat_wins: The number of games won from each seat.
+    call_stats: If the games were timed, the latency of each bot's calls,
+    by method name.  Empty dicts otherwise.
+    profile: If the games were profiled, the stack samples of all workers.
+    None otherwise.
+    """
+
+    def __init__(self,
+                 bot_names: list[str],
+                 num_players: int,
+                 seed: Optional[int] = None) -> None:
+        self.bot_names = bot_names
+        self.num_players = num_players
+        self.seed = seed
+        self.games = 0
+        self.games_without_winner = 0
+        self.total_rounds = 0
+        self.total_turns = 0
+        self.total_eliminations = 0
+        self.rounds = Histogram()
+        self.bot_games = [0] * len(bot_names)
+        self.bot_wins = [0] * len(bot_names)
+        self.bot_eliminations = [0] * len(bot_names)
+        self.seat_wins = [0] * num_players
+        self.call_stats: list[dict[str, CallStats]] = [
+            {} for _ in bot_names]
+        self.profile: Optional[Profile] = None
+
+    def merge(self, other: 'TournamentResult') -> None:
+        """Adds the results of other into self.
+
+        Preconditions:
+        other: Has the same bots and number of players as self.
+        """
+        assert other.bot_names == self.bot_names
+        assert other.num_players == self.num_players
+        assert other.seed == self.seed
+        self.games += other.games
+        self.games_without_winner += other.games_without_winner
+        self.total_rounds += other.total_rounds
+        self.total_turns += other.total_turns
+        self.total_eliminations += other.total_eliminations
+        self.rounds.merge(other.rounds)
+        for i in range(len(self.bot_names)):
+            self.bot_games[i] += other.bot_games[i]
+            self.bot_wins[i] += other.bot_wins[i]
+            self.bot_eliminations[i] += other.bot_eliminations[i]
+            for method, stats in other.call_stats[i].items():
+                self.call_stats[i].setdefault(method,
+                                              CallStats()).merge(stats)
+        for seat in range(self.num_players):
+            self.seat_wins[seat] += other.seat_wins[seat]
+        if other.profile is not None:
+            if self.profile is None:
+                self.profile = Profile(other.profile.interval)
+            self.profile.merge(other.profile)
+
+    def bot_win_rates(self) -> list[float]:
+        """Returns the fraction of seats occupied by each bot that won."""
+        return [wins / games if games else 0.0
+                for wins, games in zip(self.bot_wins, self.bot_games)]
+
+    def seat_win_rates(self) -> list[float]:
+        """Returns the fraction of games won from each seat."""
+        return [wins / self.games if self.games else 0.0
+                for wins in self.seat_wins]
+
+    def report(self) -> str:
+        """Returns a human readable summary of the tournament."""
+        lines = [str(self.games) + " games of " + str(self.num_players) +
+                 " players, " + str(self.games_without_winner) +
+                 " without a winner (seed " + str(self.seed) + ")."]
+        if self.games:
+            lines.append("Average rounds: " +
+                         format(self.total_rounds / self.games, ".2f") +
+                         ", average turns: " +
+                         format(self.total_turns / self.games, ".2f") +
+                         ", wrong accusations per game: " +
+                         format(self.total_eliminations / self.games, ".2f"))
+            lines.append("Rounds: " + self.rounds.summary())
+        lines.append("Win rate by bot:")
+        for i, rate in enumerate(self.bot_win_rates()):
+            lines.append("   " + str(i) + ": " + self.bot_names[i] + " " +
+                         format(rate, ".3f") + " (" + str(self.bot_wins[i]) +
+                         "/" + str(self.bot_games[i]) + "), " +
+                         str(self.bot_eliminations[i]) +
+                         " wrong accusations")
+        lines.append("Win rate by seat:")
+        for seat, rate in enumerate(self.seat_win_rates()):
+            lines.append("   " + str(seat) + ": " + format(rate, ".3f"))
+        if any(self.call_stats):
+            lines.append("Call latency by bot:")
+            for i, methods in enumerate(self.call_stats):
+                lines.append("   " + str(i) + ": " + self.bot_names[i])
+                for method in sorted(methods):
+                    lines.append("      " + method + ": " +
+                                 methods[method].summary())
+        if self.profile is not None:
+            lines.append("Profile: " + self.profile.report(5))
+        return "\n".join(lines)
+
+
+def seating(num_factories: int,
+            num_players: int,
+            game_index: int) -> list[int]:
+    """Returns which bot factory sits in each seat for a game.  Bots are
+    rotated one seat per game, so over num_factories consecutive games every
+    bot occupies every seat equally often.
+
+    Returns:
+    The index of a bot factory for each seat.
+    """
+    return [(seat + game_index) % num_factories
+            for seat in range(num_players)]
+
+
+def _play_games(bot_factories: list[BotFactory],
+                bot_names: list[str],
+                num_players: int,
+                seed: int,
+                game_indices: range,
+                timing: bool = False,
+                call_budget: Optional[float] = None,
+                game_budget: Optional[float] = None,
+                profile_interval: Optional[float] = None
+                ) -> TournamentResult:
+    """Plays a chunk of the games of a tournament, headless.
+    Runs inside of a worker process.
+
+    Game i is dealt with derive_seed(seed, i).  The global random module,
+    which bots commonly use, is reseeded with derive_seed(seed, i, 1)
+    before the bots are created, so that results do not depend on how the
+    games were split over workers.  Its state is restored afterwards, for
+    when the games are played in the caller's process.  The timing and
+    budget parameters are passed on to ClueGame.  If profile_interval is
+    given, the chunk is profiled with a SamplingProfiler.
+    """
+    result = TournamentResult(bot_names, num_players, seed)
+    random_state = random.getstate()
+    try:
+        if profile_interval is None:
+            _play_chunk(result, bot_factories, num_players, seed,
+                        game_indices, timing, call_budget, game_budget)
+            return result
+        with SamplingProfiler(profile_interval) as profiler:
+            _play_chunk(result, bot_factories, num_players, seed,
+                        game_indices, timing, call_budget, game_budget)
+    finally:
+        random.setstate(random_state)
+    result.profile = profiler.profile
+    return result
+
+
+def _play_chunk(result: TournamentResult,
+                bot_factories: list[BotFactory],
+                num_players: int,
+                seed: int,
+                game_indices: range,
+                timing: bool,
+                call_budget: Optional[float],
+                game_budget: Optional[float]) -> None:
+    """Plays the games of _play_games() into result."""
+    for game_index in game_indices:
+        seats = seating(len(bot_factories), num_players, game_index)
+        random.seed(derive_seed(seed, game_index, 1))
+        game = ClueGame([bot_factories[i]() for i in seats], NullSink(),
+                        seed=derive_seed(seed, game_index),
+                        timing=timing, call_budget=call_budget,
+                        game_budget=game_budget)
+        game_result = game.execute()
+        result.games += 1
+        result.total_rounds += game_result.rounds
+        result.total_turns += game_result.turns
+        result.total_eliminations += len(game_result.eliminations)
+        result.rounds.add(game_result.rounds)
+        for i in seats:
+            result.bot_games[i] += 1
+        for seat in game_result.eliminations:
+            result.bot_eliminations[seats[seat]] += 1
+        if game_result.winner_id is None:
+            result.games_without_winner += 1
+        else:
+            result.seat_wins[game_result.winner_id] += 1
+            result.bot_wins[seats[game_result.winner_id]] += 1
+        if game_result.call_stats is not None:
+            for seat, methods in enumerate(game_result.call_stats):
+                bot_stats = result.call_stats[seats[seat]]
+                for method, stats in methods.items():
+                    bot_stats.setdefault(method, CallStats()).merge(stats)
+
+
+def _chunks(num_games: int, chunk_size: int) -> Iterator[range]:
+    for start in range(0, num_games, chunk_size):
+        yield range(start, min(start + chunk_size, num_games))
+
+
+def run_tournament(bot_factories: list[BotFactory],
+                   num_games: int,
+                   num_players: Optional[int] = None,
+                   max_workers: Optional[int] = None,
+                   chunk_size: Optional[int] = None,
+                   seed: Optional[int] = None,
+                   timing: bool = False,
+                   call_budget: Optional[float] = None,
+                   game_budget: Optional[float] = None,
+                   on_snapshot: Optional[
+                       Callable[[TournamentResult], None]] = None,
+                   snapshot_interval: float = 10.0,
+                   profile: bool = False,
+                   profile_interval: float = 0.001) -> TournamentResult:
+    """Plays num_games headless games and aggregates the results.
+    Games are submitted to a ProcessPoolExecutor in chunks, so that each
+    task sent to a worker covers many games and only one aggregated
+    TournamentResult is sent back per chunk.  Only a few chunks per worker
+    are in flight at a time, so memory stays constant however many games
+    are played.
+
+    Preconditions:
+    bot_factories: Must be picklable, eg. classes or module level functions.
+    num_players: 3 <= num_players <= 6
+
+    Parameters:
+    bot_factories: Callables that each create a new bot.
+    num_games: The number of games to play.
+    num_players: The number of players at each table.  Defaults to the
+    number of factories, clamped to 3..6.
+    max_workers: The number of worker processes.  Defaults to the number of
+    cores.  With 1 worker, games are played in the current process.
+    chunk_size: The number of games per task.  Defaults to splitting the
+    games into 4 chunks per worker, of at most 1000 games.
+    seed: The base seed that every game's seed is derived from.  Defaults
+    to a random seed, which is recorded in the result.
+    timing: Whether to record the latency of every bot call, see
+    TournamentResult.call_stats.
+    call_budget: See ClueGame.
+    game_budget: See ClueGame.
+    on_snapshot: Called with the results so far at most every
+    snapshot_interval seconds, after a chunk has been merged, eg. to watch
+    a long run.  The result must not be changed.
+    snapshot_interval: Seconds between calls to on_snapshot.
+    profile: Whether to sample the stacks of the games, see
+    TournamentResult.profile.
+    profile_interval: Seconds between stack samples.
+
+    Returns:
+    The aggregated results.
+    """
+    if num_players is None:
+        num_players = min(max(len(bot_factories), 3), 6)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = min(max(1, -(-num_games // (max_workers * 4))), 1000)
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    bot_names = [getattr(factory, "__name__", repr(factory))
+                 for factory in bot_factories]
+
+    if not profile:
+        profile_interval = None
+    result = TournamentResult(bot_names, num_players, seed)
+    last_snapshot = time.monotonic()
+
+    def merge(chunk_result: TournamentResult) -> None:
+        nonlocal last_snapshot
+        result.merge(chunk_result)
+        if (on_snapshot is not None
+                and time.monotonic() - last_snapshot >= snapshot_interval):
+            on_snapshot(result)
+            last_snapshot = time.monotonic()
+
+    chunks = _chunks(num_games, chunk_size)
+    if max_workers == 1:
+        for chunk in chunks:
+            merge(_play_games(bot_factories, bot_names, num_players, seed,
+                              chunk, timing, call_budget, game_budget,
+                              profile_interval))
+        return result
+
+    with ProcessPoolExecutor(max_workers) as executor:
+        pending = set()
+        for chunk in chunks:
+            if len(pending) >= 2 * max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    merge(future.result())
+            pending.add(executor.submit(_play_games, bot_factories,
+                                        bot_names, num_players, seed, chunk,
+                                        timing, call_budget, game_budget,
+                                        profile_interval))
+        for future in pending:
+            merge(future.result())
+    return result
+
+
+###############################################################################
+# A/B comparison
+###############################################################################
+
+class ComparisonResult(NamedTuple):
+    """The outcome of compare_bots().
+
+    A pair is two games on the same deal, with the same seed for the global
+    random module and the same opponents, that only differ in whether the
+    candidate or the baseline sits in the tested seat.  A pair is
+    discordant when exactly one of the two won.
+
+    Members:
+    decision: "candidate" if the candidate is better by the configured
+    effect, "baseline" if it is not, or None if max_pairs ran out first.
+    pairs: The number of pairs the test used, up to the one that decided.
+    candidate_wins: The discordant pairs the candidate won.
+    baseline_wins: The discordant pairs the baseline won.
+    log_likelihood_ratio: The final statistic of the test.
+    fixed_sample_pairs: The estimated number of pairs that a fixed sample
+    test with the same error rates would need.
+    seed: The base seed.  Rerunning with it reproduces the same deals.
+    pairs_played: The number of pairs actually played.  Pairs are played
+    in batches, so this includes the rest of the last batch, which the
+    test ignores, and depends on max_workers and batch_size.
+    """
+    decision: Optional[str]
+    pairs: int
+    candidate_wins: int
+    baseline_wins: int
+    log_likelihood_ratio: float
+    fixed_sample_pairs: int
+    seed: int
+    pairs_played: int
+
+    def report(self) -> str:
+        """Returns a human readable summary of the comparison."""
+        verdict = {"candidate": "The candidate is better.",
+                   "baseline": "The candidate is not better.",
+                   None: "Inconclusive."}[self.decision]
+        discordant = self.candidate_wins + self.baseline_wins
+        return (verdict + "  " + str(self.pairs) + " pairs (" +
+                str(2 * self.pairs) + " games, " + str(self.pairs_played) +
+                " pairs played), " + str(discordant) +
+                " discordant: candidate " + str(self.candidate_wins) +
+                ", baseline " + str(self.baseline_wins) + ".  A fixed " +
+                "sample test would need ~" + str(self.fixed_sample_pairs) +
+                " pairs (" + str(2 * self.fixed_sample_pairs) +
+                " games).  (seed " + str(self.seed) + ")")
+
+
+def _play_pairs(candidate: BotFactory,
+                baseline: BotFactory,
+                opponents: list[BotFactory],
+                seed: int,
+                pair_indices: range,
+                call_budget: Optional[float] = None,
+                game_budget: Optional[float] = None) -> list[int]:
+    """Plays pairs of games for compare_bots().
+    Runs inside of a worker process.
+
+    Pair i is dealt with derive_seed(seed, i), and the tested seat rotates
+    with i.  Both games reseed the global random module with
+    derive_seed(seed, i, 1), and its state is restored afterwards.
+
+    Returns:
+    For each pair, 1 if only the candidate won, -1 if only the baseline
+    won, and 0 otherwise.
+    """
+    num_players = len(opponents) + 1
+    outcomes = []
+    random_state = random.getstate()
+    try:
+        for pair_index in pair_indices:
+            seat = pair_index % num_players
+            won = []
+            for tested in (candidate, baseline):
+                factories = opponents[:seat] + [tested] + opponents[seat:]
+                random.seed(derive_seed(seed, pair_index, 1))
+                game = ClueGame([factory() for factory in factories],
+                                NullSink(),
+                                seed=derive_seed(seed, pair_index),
+                                call_budget=call_budget,
+                                game_budget=game_budget)
+                won.append(game.execute().winner_id == seat)
+            outcomes.append(won[0] - won[1])
+    finally:
+        random.setstate(random_state)
+    return outcomes
+
+
+def fixed_sample_pairs(alpha: float, beta: float, effect: float) -> int:
+    """Returns the number of discordant pairs that a one-sided binomial
+    test of p = 0.5 against p = 0.5 + effect needs, with a false positive
+    rate of alpha and a false negative rate of beta (normal approximation).
+    """
+    p1 = 0.5 + effect
+    z = NormalDist().inv_cdf
+    root_n = ((z(1 - alpha) * 0.5 + z(1 - beta) * sqrt(p1 * (1 - p1)))
+              / effect)
+    return int(root_n ** 2) + 1
+
+
+def compare_bots(candidate: BotFactory,
+                 baseline: BotFactory,
+                 opponents: Optional[list[BotFactory]] = None,
+                 num_players: int = 4,
+                 alpha: float = 0.05,
+                 beta: float = 0.05,
+                 effect: float = 0.1,
+                 max_pairs: int = 100000,
+                 max_workers: Optional[int] = None,
+                 batch_size: Optional[int] = None,
+                 seed: Optional[int] = None,
+                 call_budget: Optional[float] = None,
+                 game_budget: Optional[float] = None) -> ComparisonResult:
+    """Compares two bots with paired games and a sequential probability
+    ratio test, stopping as soon as either hypothesis is accepted.
+
+    Only discordant pairs carry information.  Among them, the test
+    compares H0: the candidate wins half, against H1: the candidate wins
+    0.5 + effect of them.  Pairs are played in batches, but the test is
+    applied to the outcomes in pair order and stops at the first pair that
+    crosses a boundary, so the result does not depend on max_workers.
+
+    Preconditions:
+    candidate, baseline, opponents: Must be picklable if max_workers > 1.
+    0 < alpha < 1, 0 < beta < 1, 0 < effect < 0.5
+
+    Parameters:
+    candidate: Creates the bot under test.
+    baseline: Creates the bot to compare it with, eg. the champion.
+    opponents: Creates the bots in the other seats, in seat order.
+    Defaults to num_players - 1 baselines.
+    num_players: The number of players, if opponents is None.
+    alpha: The probability of accepting a candidate that is not better.
+    beta: The probability of rejecting a candidate that is better by effect.
+    effect: The smallest improvement worth detecting, as the fraction of
+    discordant pairs over one half that the candidate wins.
+    max_pairs: The most pairs to play before giving up.
+    max_workers: The number of worker processes.  Defaults to the number of
+    cores.  With 1 worker, games are played in the current process.
+    batch_size: The number of pairs per task.  Defaults to 8 per worker.
+    seed: The base seed.  Defaults to a random seed, which is recorded in
+    the result.
+    call_budget: See ClueGame.
+    game_budget: See ClueGame.
+    """
+    assert 0 < alpha < 1 and 0 < beta < 1 and 0 < effect < 0.5
+    if opponents is None:
+        opponents = [baseline] * (num_players - 1)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if batch_size is None:
+        batch_size = 8 * max_workers
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(64)
+    p1 = 0.5 + effect
+    win_step = log(p1 / 0.5)
+    loss_step = log((1 - p1) / 0.5)
+    upper = log((1 - beta) / alpha)
+    lower = log(beta / (1 - alpha))
+
+    pairs = pairs_played = candidate_wins = baseline_wins = 0
+    llr = 0.0
+    decision = None
+    executor = (ProcessPoolExecutor(max_workers) if max_workers > 1
+                else None)
+    try:
+        while decision is None and pairs < max_pairs:
+            batch = range(pairs, min(pairs + batch_size, max_pairs))
+            if executor is None:
+                outcomes = _play_pairs(candidate, baseline, opponents, seed,
+                                       batch, call_budget, game_budget)
+            else:
+                futures = [executor.submit(_play_pairs, candidate, baseline,
+                                           opponents, seed, chunk,
+                                           call_budget, game_budget)
+                           for chunk in _chunks_of(batch, max_workers)]
+                outcomes = [outcome for future in futures
+                            for outcome in future.result()]
+            pairs_played += len(batch)
+            for outcome in outcomes:
+                pairs += 1
+                if outcome > 0:
+                    candidate_wins += 1
+                    llr += win_step
+                elif outcome < 0:
+                    baseline_wins += 1
+                    llr += loss_step
+                if llr >= upper:
+                    decision = "candidate"
+                elif llr <= lower:
+                    decision = "baseline"
+                if decision is not None:
+                    break
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    # Scale the discordant pairs the fixed test needs by the observed
+    # fraction of pairs that were discordant.
+    discordant = candidate_wins + baseline_wins
+    needed = fixed_sample_pairs(alpha, beta, effect)
+    if discordant:
+        needed = -(-needed * pairs // discordant)
+    return ComparisonResult(decision, pairs, candidate_wins, baseline_wins,
+                            llr, needed, seed, pairs_played)
+
+
+def _chunks_of(indices: range, count: int) -> Iterator[range]:
+    """Splits indices into count nearly equal consecutive ranges."""
+    size = -(-len(indices) // count)
+    for start in range(indices.start, indices.stop, size):
+        yield range(start, min(start + size, indices.stop))
+
+
+def main():
+    from sample_bot import SampleBot
+    result = run_tournament([SampleBot] * 4, 10000)
+    print(result.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+import random
+import unittest
+from deduction_bot import DeductionBot
+from sample_bot import SampleBot
+from tournament import (Histogram, TournamentResult, compare_bots,
+                        fixed_sample_pairs, run_tournament, seating)
+
+
+class TestSeating(unittest.TestCase):
+    def test_every_bot_sits_in_every_seat(self):
+        seats = [seating(4, 4, game) for game in range(4)]
+        for seat in range(4):
+            self.assertEqual(sorted(s[seat] for s in seats), [0, 1, 2, 3])
+
+
+class TestRunTournament(unittest.TestCase):
+    def test_in_process_keeps_random_state(self):
+        random.seed(5)
+        expected = random.random()
+        random.seed(5)
+        run_tournament([SampleBot] * 3, 4, max_workers=1, seed=1)
+        compare_bots(SampleBot, SampleBot, num_players=3, max_pairs=2,
+                     max_workers=1, seed=1)
+        self.assertEqual(random.random(), expected)
+
+    def test_in_process(self):
+        result = run_tournament([SampleBot] * 3, 30, max_workers=1)
+        self.assertEqual(result.games, 30)
+        self.assertEqual(sum(result.bot_games), 90)
+        self.assertEqual(sum(result.seat_wins) + result.games_without_winner,
+                         30)
+        self.assertEqual(sum(result.bot_wins), sum(result.seat_wins))
+
+    def test_worker_processes(self):
+        result = run_tournament([SampleBot] * 4, 20, max_workers=2,
+                                chunk_size=3)
+        self.assertEqual(result.games, 20)
+        self.assertEqual(sum(result.bot_games), 80)
+
+    def test_seed_is_reproducible_across_workers(self):
+        in_process = run_tournament([SampleBot] * 4, 40, max_workers=1,
+                                    seed=7)
+        in_workers = run_tournament([SampleBot] * 4, 40, max_workers=2,
+                                    chunk_size=7, seed=7)
+        self.assertEqual(in_process.seat_wins, in_workers.seat_wins)
+        self.assertEqual(in_process.total_turns, in_workers.total_turns)
+
+    def test_timing_is_reported_per_bot(self):
+        result = run_tournament([SampleBot] * 3, 6, max_workers=2,
+                                chunk_size=2, seed=3, timing=True)
+        self.assertEqual(sum(stats["initialize"].count
+                             for stats in result.call_stats), 18)
+        self.assertEqual(sum(stats["take_turn"].count
+                             for stats in result.call_stats),
+                         result.total_turns)
+        self.assertIn("Call latency by bot:", result.report())
+
+    def test_merge(self):
+        first = TournamentResult(['a', 'b'], 3)
+        first.games = 2
+        first.bot_wins = [1, 0]
+        second = TournamentResult(['a', 'b'], 3)
+        second.games = 3
+        second.bot_wins = [1, 2]
+        first.merge(second)
+        self.assertEqual(first.games, 5)
+        self.assertEqual(first.bot_wins, [2, 2])
+
+
+class TestHistogram(unittest.TestCase):
+    def test_quantiles(self):
+        histogram = Histogram()
+        for value in [3, 1, 4, 1, 5, 9, 2, 6]:
+            histogram.add(value)
+        self.assertEqual(histogram.total(), 8)
+        self.assertEqual(histogram.quantile(0.0), 1)
+        self.assertEqual(histogram.quantile(0.5), 3)
+        self.assertEqual(histogram.quantile(1.0), 9)
+        self.assertEqual(Histogram().quantile(0.5), 0)
+
+    def test_merge(self):
+        first, second = Histogram(), Histogram()
+        first.add(2)
+        second.add(7)
+        second.add(2)
+        first.merge(second)
+        self.assertEqual(first.counts, [0, 0, 2, 0, 0, 0, 0, 1])
+
+
+class TestStreamingAggregation(unittest.TestCase):
+    def test_rounds_and_wrong_accusations(self):
+        result = run_tournament([SampleBot, DeductionBot, SampleBot], 30,
+                                max_workers=2, chunk_size=4, seed=5)
+        self.assertEqual(result.rounds.total(), 30)
+        self.assertEqual(sum(result.bot_eliminations),
+                         result.total_eliminations)
+        self.assertEqual(result.bot_eliminations[1], 0)
+
+    def test_snapshots(self):
+        snapshots = []
+        result = run_tournament([SampleBot] * 3, 20, max_workers=1,
+                                chunk_size=5, seed=6,
+                                on_snapshot=lambda partial:
+                                snapshots.append(partial.games),
+                                snapshot_interval=0)
+        self.assertEqual(snapshots, [5, 10, 15, 20])
+        self.assertEqual(result.games, 20)
+
+
+class TestCompareBots(unittest.TestCase):
+    def test_stronger_candidate_is_accepted_early(self):
+        result = compare_bots(DeductionBot, SampleBot, max_workers=1, seed=1)
+        self.assertEqual(result.decision, "candidate")
+        self.assertLess(result.pairs, result.fixed_sample_pairs)
+
+    def test_weaker_candidate_is_rejected(self):
+        result = compare_bots(SampleBot, DeductionBot, max_workers=1, seed=2)
+        self.assertEqual(result.decision, "baseline")
+
+    def test_identical_bots_never_disagree(self):
+        result = compare_bots(SampleBot, SampleBot, num_players=3,
+                              max_pairs=12, max_workers=1, seed=3)
+        self.assertIsNone(result.decision)
+        self.assertEqual(result.pairs, 12)
+        self.assertEqual(result.pairs_played, 12)
+        self.assertEqual(result.candidate_wins + result.baseline_wins, 0)
+
+    def test_result_does_not_depend_on_workers(self):
+        in_process = compare_bots(DeductionBot, SampleBot, max_workers=1,
+                                  seed=4)
+        in_workers = compare_bots(DeductionBot, SampleBot, max_workers=2,
+                                  batch_size=5, seed=4)
+        self.assertEqual(in_process[:-1], in_workers[:-1])
+        for result in (in_process, in_workers):
+            self.assertLessEqual(result.pairs, result.pairs_played)
+        self.assertEqual(in_workers.pairs_played % 5, 0)
+
+    def test_fixed_sample_size_grows_with_confidence(self):
+        self.assertLess(fixed_sample_pairs(0.05, 0.05, 0.1),
+                        fixed_sample_pairs(0.01, 0.01, 0.1))
+        self.assertLess(fixed_sample_pairs(0.05, 0.05, 0.1),
+                        fixed_sample_pairs(0.05, 0.05, 0.05))
+
+
+if __name__ == '__main__':
+    unittest.main()